@@ -0,0 +1,206 @@
+# analysis_log.py
+
+import os
+import glob
+import time
+import queue
+import threading
+import numpy as np
+from engagement import EMOTION_LABELS, STATUS_LABELS
+
+# One row per analysed face per frame. Chunks are saved with np.save so the
+# reader can open them with mmap_mode='r' and never copy more than it scans.
+ROW_DTYPE = np.dtype([
+    ('frame', np.int64),
+    ('timestamp', np.float64),
+    ('track_id', np.int64),
+    ('bbox', np.int32, (4,)),
+    ('emotion_probs', np.float32, (len(EMOTION_LABELS),)),
+    ('yaw', np.float32),
+    ('pitch', np.float32),
+    ('roll', np.float32),
+    ('status', np.uint8),
+])
+
+CHUNK_PATTERN = 'chunk_{:06d}.npy'
+
+
+def status_code(status):
+    """Maps an engagement status string to the code stored in the log."""
+    try:
+        return STATUS_LABELS.index(status)
+    except ValueError:
+        return 0
+
+
+def session_log_dir(base_dir):
+    """Returns a new per-session directory under `base_dir` (one log per analysis run)."""
+    return os.path.join(base_dir, time.strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}')
+
+
+class AnalysisLogWriter:
+    """
+    Append-only, chunked columnar writer for per-frame analysis results.
+
+    Rows are handed to a background thread through a queue so the analysis loop
+    never waits on disk. The thread packs them into a NumPy structured array and
+    flushes a new chunk file every `chunk_rows` rows (and on close). A directory
+    holds exactly one session's log, so the writer refuses one that already has
+    chunks (see `session_log_dir`).
+    """
+    def __init__(self, log_dir, chunk_rows=4096, max_pending=100000):
+        """
+        Initializes the writer and starts its background flush thread.
+
+        Args:
+            log_dir (str): Directory the chunk files are written to.
+            chunk_rows (int): Number of rows per chunk file.
+            max_pending (int): Maximum number of queued rows before `append` blocks.
+        """
+        self.log_dir = log_dir
+        self.chunk_rows = chunk_rows
+        os.makedirs(log_dir, exist_ok=True)
+
+        # Frames restart at 1 every session, so appending to an old log would
+        # break the frame order the reader's range scans rely on.
+        if glob.glob(os.path.join(log_dir, 'chunk_*.npy')):
+            raise FileExistsError(f"{log_dir} already contains an analysis log; use a new directory per session")
+        self._next_chunk = 0
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._error = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def append(self, frame, timestamp, track_id, bbox, emotion_probs, yaw, pitch, roll, status):
+        """Queues one result row. Cheap enough to call from the hot path."""
+        if self._closed:
+            raise RuntimeError("AnalysisLogWriter is closed")
+        self._raise_error()
+        self._queue.put((frame, timestamp, track_id, bbox, emotion_probs, yaw, pitch, roll, status))
+
+    def close(self):
+        """Flushes any pending rows and stops the background thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError(f"Analysis log writer failed: {self._error}") from self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _run(self):
+        try:
+            self._write_rows()
+        except Exception as e:
+            # Recorded for append()/close() to re-raise; keep draining the queue
+            # so neither of them blocks on a writer that is gone.
+            self._error = e
+            print(f"Analysis log writer failed: {e}")
+            while not self._stopped and self._queue.get() is not None:
+                pass
+
+    def _write_rows(self):
+        buffer = np.empty(self.chunk_rows, dtype=ROW_DTYPE)
+        filled = 0
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._stopped = True
+                break
+            frame, timestamp, track_id, bbox, emotion_probs, yaw, pitch, roll, status = item
+            row = buffer[filled]
+            row['frame'] = frame
+            row['timestamp'] = timestamp
+            row['track_id'] = int(track_id)
+            row['bbox'] = bbox
+            row['emotion_probs'] = emotion_probs
+            row['yaw'] = yaw
+            row['pitch'] = pitch
+            row['roll'] = roll
+            row['status'] = status if isinstance(status, (int, np.integer)) else status_code(status)
+            filled += 1
+            if filled == self.chunk_rows:
+                self._flush(buffer)
+                filled = 0
+        if filled:
+            self._flush(buffer[:filled])
+
+    def _flush(self, rows):
+        path = os.path.join(self.log_dir, CHUNK_PATTERN.format(self._next_chunk))
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, rows)
+        # Readers only ever see complete chunks.
+        os.replace(tmp_path, path)
+        self._next_chunk += 1
+
+
+class AnalysisLogReader:
+    """
+    Reader for logs produced by AnalysisLogWriter.
+
+    Chunks are memory-mapped, and since frames are appended in order a range
+    scan only touches the chunks (and rows) that overlap the requested range.
+    """
+    def __init__(self, log_dir):
+        """
+        Args:
+            log_dir (str): Directory containing the chunk files.
+        """
+        self.log_dir = log_dir
+        self.refresh()
+
+    def refresh(self):
+        """Picks up chunks written since the reader was opened."""
+        paths = sorted(glob.glob(os.path.join(self.log_dir, 'chunk_*.npy')))
+        self._chunks = [np.load(path, mmap_mode='r') for path in paths]
+        self._chunks = [chunk for chunk in self._chunks if len(chunk)]
+        self._first_frames = np.array([chunk['frame'][0] for chunk in self._chunks], dtype=np.int64)
+        self._last_frames = np.array([chunk['frame'][-1] for chunk in self._chunks], dtype=np.int64)
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self._chunks)
+
+    def read_all(self):
+        """Returns every row in the log as one structured array."""
+        if not self._chunks:
+            return np.empty(0, dtype=ROW_DTYPE)
+        return np.concatenate(self._chunks)
+
+    def scan(self, start_frame, end_frame, track_id=None):
+        """
+        Returns rows with start_frame <= frame < end_frame.
+
+        Args:
+            start_frame (int): First frame of the range (inclusive).
+            end_frame (int): End of the range (exclusive).
+            track_id (int, optional): Restrict the result to a single track.
+
+        Returns:
+            np.ndarray: Structured array with dtype ROW_DTYPE.
+        """
+        parts = []
+        candidates = np.nonzero((self._last_frames >= start_frame) & (self._first_frames < end_frame))[0]
+        for idx in candidates:
+            frames = self._chunks[idx]['frame']
+            lo = np.searchsorted(frames, start_frame, side='left')
+            hi = np.searchsorted(frames, end_frame, side='left')
+            if hi > lo:
+                parts.append(self._chunks[idx][lo:hi])
+
+        rows = np.concatenate(parts) if parts else np.empty(0, dtype=ROW_DTYPE)
+        if track_id is not None:
+            rows = rows[rows['track_id'] == int(track_id)]
+        return rows
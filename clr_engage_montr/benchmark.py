@@ -0,0 +1,306 @@
+# benchmark.py
+
+"""
+Benchmark suite for the engagement inference engines.
+
+Usage:
+    python benchmark.py profiles                       # all runtime profiles, synthetic frame
+    python benchmark.py profiles --profiles latency throughput --image classroom.jpg
+    python benchmark.py tracker-soak --hours 3               # appearance gallery over a long lecture
+    python benchmark.py tracker-selective                    # embedder calls saved by selective embedding
+"""
+
+import argparse
+import time
+import numpy as np
+from runtime_profiles import PROFILES, get_profile
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(np.asarray(samples) * 1000.0, q)) if samples else 0.0
+
+
+def load_frame(image_path=None, width=1920, height=1080):
+    """Returns a BGR test frame: the given image, or deterministic noise."""
+    if image_path:
+        import cv2
+        frame = cv2.imread(image_path)
+        if frame is None:
+            raise FileNotFoundError(f"Could not read image {image_path}")
+        return frame
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+
+def validate_profile(profile, compiled_model):
+    """
+    Reads the settings back from a compiled OpenVINO model and checks that the
+    profile was applied.
+
+    Returns:
+        list: Human-readable mismatches (empty when the profile was applied).
+    """
+    problems = []
+    expected = {
+        "PERFORMANCE_HINT": profile.performance_hint,
+        "NUM_STREAMS": profile.num_streams,
+        "ENABLE_CPU_PINNING": profile.cpu_pinning,
+    }
+    if profile.inference_threads:
+        expected["INFERENCE_NUM_THREADS"] = profile.inference_threads
+    for key, value in expected.items():
+        if value is None or value == "AUTO":
+            continue
+        try:
+            actual = compiled_model.get_property(key)
+        except Exception as e:
+            problems.append(f"{key}: could not read back ({e})")
+            continue
+        # Enum-valued properties stringify as e.g. "PerformanceMode.LATENCY"
+        if str(actual).split('.')[-1].upper() != str(value).upper():
+            problems.append(f"{key}: expected {value}, got {actual}")
+    return problems
+
+
+def benchmark_profile(name, frame, iterations, faces):
+    from models.face_detection import YoloV8FaceDetector
+    from models.face_expression import EmotionRecognizer
+    from models.face_direction import HeadPoseEstimator
+
+    profile = get_profile(name)
+    detector = YoloV8FaceDetector(profile=profile)
+    emotion_recognizer = EmotionRecognizer(profile=profile)
+    pose_estimator = HeadPoseEstimator(profile=profile)
+
+    problems = []
+    if detector.net is None:
+        problems += [f"detector {p}" for p in validate_profile(profile, detector.compiled_model)]
+    problems += [f"emotion {p}" for p in validate_profile(profile, emotion_recognizer.compiled_emotion_model)]
+    problems += [f"head-pose {p}" for p in validate_profile(profile, pose_estimator.compiled_model)]
+
+    crop = np.ascontiguousarray(frame[:96, :96])
+
+    # Warm up every engine once
+    detector.detect(frame)
+    emotion_recognizer.infer(crop)
+    pose_estimator.predict_angles(crop)
+
+    detect_times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        detector.detect(frame)
+        detect_times.append(time.perf_counter() - start)
+
+    # Per-face latency: one face, both models, blocking calls
+    face_times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        emotion_recognizer.infer(crop)
+        pose_estimator.predict_angles(crop)
+        face_times.append(time.perf_counter() - start)
+
+    # Throughput: `faces` crops in flight at once through submit()/wait()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        requests = [(emotion_recognizer.submit(crop), pose_estimator.submit(crop)) for _ in range(faces)]
+        for emotion_request, pose_request in requests:
+            emotion_recognizer.wait(emotion_request)
+            pose_estimator.wait(pose_request)
+    faces_per_second = iterations * faces / (time.perf_counter() - start)
+
+    return {
+        "profile": name,
+        "detector_backend": profile.detector_backend,
+        "detect_p50_ms": percentile_ms(detect_times, 50),
+        "detect_p95_ms": percentile_ms(detect_times, 95),
+        "face_p50_ms": percentile_ms(face_times, 50),
+        "face_p95_ms": percentile_ms(face_times, 95),
+        "faces_per_second": faces_per_second,
+        "problems": problems,
+    }
+
+
+def run_profiles(args):
+    frame = load_frame(args.image)
+    failed = False
+    print(f"{'profile':<12}{'backend':<10}{'detect p50/p95 ms':>20}{'face p50/p95 ms':>20}{'faces/s':>10}")
+    for name in args.profiles:
+        result = benchmark_profile(name, frame, args.iterations, args.faces)
+        print(f"{result['profile']:<12}{result['detector_backend']:<10}"
+              f"{result['detect_p50_ms']:>10.1f}/{result['detect_p95_ms']:<9.1f}"
+              f"{result['face_p50_ms']:>10.2f}/{result['face_p95_ms']:<9.2f}"
+              f"{result['faces_per_second']:>10.0f}")
+        for problem in result["problems"]:
+            failed = True
+            print(f"    ! {problem}")
+    return 1 if failed else 0
+
+
+def process_memory_mb():
+    """Resident memory of this process (peak RSS where psutil is unavailable)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def gallery_stats(metric):
+    """Total samples and bytes held in a DeepSORT metric's appearance galleries."""
+    samples = sum(len(s) for s in metric.samples.values())
+    nbytes = getattr(metric, 'nbytes', None)
+    if nbytes is None:
+        nbytes = sum(np.asarray(f).nbytes for s in metric.samples.values() for f in s)
+    return samples, nbytes
+
+
+def soak_tracker(policy, faces, frames, fps, dim, window_frames, selective=True, walker=False, seed=0):
+    """
+    Feeds a synthetic classroom to DeepSortFaceTracker for `frames` frames:
+    `faces` students on a grid with small jitter, occasional missed detections,
+    and embeddings that wander between a few appearance modes per student.
+    With `walker`, one extra person walks back and forth along the first row,
+    crossing in front of the students there.
+
+    Yields one dict per window of `window_frames` frames.
+    """
+    from models.face_tracking import DeepSortFaceTracker
+
+    rng = np.random.default_rng(seed)
+    people = faces + 1 if walker else faces
+    columns = int(np.ceil(np.sqrt(faces)))
+    seats = np.array([(60 + 150 * (i % columns), 60 + 150 * (i // columns)) for i in range(faces)], dtype=float)
+    modes = rng.normal(size=(people, 4, dim)).astype(np.float32)
+    modes += 2.0 * rng.normal(size=(people, 1, dim)).astype(np.float32)  # identity component
+    current_mode = np.zeros(people, dtype=int)
+
+    # The synthetic embedder looks up the true embedding of each detection it is asked for
+    frame_embeds = {}
+
+    def embed(frame, raw_detections):
+        return [frame_embeds[id(detection)] for detection in raw_detections]
+
+    budget = {"nn_budget": None} if policy == "unbounded" else {"gallery_retention": policy}
+    tracker = DeepSortFaceTracker(max_age=50, n_init=3, embedder=embed, selective_embedding=selective, **budget)
+    metric = tracker.tracker.tracker.metric
+
+    last_track = {}
+    switches = 0
+    times = []
+    for frame in range(1, frames + 1):
+        positions = seats
+        if walker:
+            span = 150 * (columns - 1)
+            x = 60 + abs((frame * 6) % (2 * span) - span)
+            positions = np.vstack([seats, [(x, 60)]])
+
+        switching = rng.random(people) < 0.01
+        current_mode[switching] = rng.integers(0, 4, switching.sum())
+        visible = np.flatnonzero(rng.random(people) > 0.02)
+
+        jitter = rng.normal(0, 2, size=(people, 2))
+        detections = [([positions[i, 0] + jitter[i, 0], positions[i, 1] + jitter[i, 1], 80, 96], 0.9, 'face')
+                      for i in visible]
+        frame_embeds = {id(detection): modes[i, current_mode[i]] + 0.3 * rng.normal(size=dim).astype(np.float32)
+                        for i, detection in zip(visible, detections)}
+
+        start = time.perf_counter()
+        tracked = tracker.update_tracks(detections, frame=None)
+        times.append(time.perf_counter() - start)
+
+        for track_id, (x1, y1, _, _) in tracked:
+            person = int(np.argmin(np.abs(positions - (x1, y1)).sum(axis=1)))
+            if last_track.get(person, track_id) != track_id:
+                switches += 1
+            last_track[person] = track_id
+
+        if frame % window_frames == 0:
+            samples, nbytes = gallery_stats(metric)
+            yield {
+                "policy": policy,
+                "minutes": frame / fps / 60,
+                "assoc_p50_ms": percentile_ms(times, 50),
+                "assoc_p95_ms": percentile_ms(times, 95),
+                "gallery_samples": samples,
+                "gallery_mb": nbytes / 2**20,
+                "rss_mb": process_memory_mb(),
+                "id_switches": switches,
+                "embeddings": tracker.embeddings_computed,
+                "reused": tracker.embeddings_reused,
+            }
+            times = []
+
+
+def run_tracker_soak(args):
+    frames = int(args.hours * 3600 * args.fps)
+    window_frames = max(1, int(args.window_minutes * 60 * args.fps))
+    print(f"Soak: {args.faces} faces, {args.hours:g} h at {args.fps:g} fps ({frames} frames), {args.dim}-d embeddings")
+    print(f"{'policy':<16}{'minutes':>8}{'assoc p50/p95 ms':>20}{'samples':>10}{'gallery MB':>12}{'RSS MB':>10}{'ID sw':>7}")
+    for policy in args.policies:
+        first = last = None
+        for row in soak_tracker(policy, args.faces, frames, args.fps, args.dim, window_frames):
+            first = first or row
+            last = row
+            print(f"{row['policy']:<16}{row['minutes']:>8.0f}"
+                  f"{row['assoc_p50_ms']:>10.2f}/{row['assoc_p95_ms']:<9.2f}"
+                  f"{row['gallery_samples']:>10}{row['gallery_mb']:>12.1f}{row['rss_mb']:>10.0f}{row['id_switches']:>7}")
+        if first and last:
+            print(f"{policy}: association p50 {last['assoc_p50_ms'] / max(first['assoc_p50_ms'], 1e-9):.2f}x, "
+                  f"gallery {last['gallery_mb'] / max(first['gallery_mb'], 1e-9):.2f}x from first to last window")
+    return 0
+
+
+def run_tracker_selective(args):
+    frames = int(args.minutes * 60 * args.fps)
+    print(f"Selective embedding: {args.faces} faces + 1 walking, {args.minutes:g} min at {args.fps:g} fps ({frames} frames)")
+    print(f"{'mode':<12}{'embeddings':>12}{'reused':>10}{'ID switches':>13}{'assoc p50 ms':>14}")
+    results = {}
+    for selective in (False, True):
+        rows = list(soak_tracker('representative', args.faces, frames, args.fps, args.dim, frames,
+                                 selective=selective, walker=True))
+        row = results[selective] = rows[-1]
+        print(f"{'selective' if selective else 'every face':<12}{row['embeddings']:>12}{row['reused']:>10}"
+              f"{row['id_switches']:>13}{row['assoc_p50_ms']:>14.2f}")
+    saved = 1 - results[True]['embeddings'] / max(results[False]['embeddings'], 1)
+    print(f"Embedder calls reduced by {saved:.0%}; ID switches {results[False]['id_switches']} -> {results[True]['id_switches']}")
+    return 0
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(description="Engagement inference benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    profiles_parser = subparsers.add_parser('profiles', help='Compare and validate runtime profiles')
+    profiles_parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    profiles_parser.add_argument('--image', help='Test frame (defaults to a synthetic 1080p frame)')
+    profiles_parser.add_argument('--iterations', type=int, default=50)
+    profiles_parser.add_argument('--faces', type=int, default=8, help='Faces in flight for the throughput run')
+    profiles_parser.set_defaults(func=run_profiles)
+
+    soak_parser = subparsers.add_parser('tracker-soak',
+                                        help='Association time and memory of the appearance gallery over a long session')
+    soak_parser.add_argument('--policies', nargs='+', default=['representative', 'fifo'],
+                             choices=['representative', 'fifo', 'unbounded'],
+                             help="Gallery retention policies ('unbounded' is the old nn_budget=None)")
+    soak_parser.add_argument('--hours', type=float, default=3.0)
+    soak_parser.add_argument('--fps', type=float, default=5.0, help='Analysed frames per second')
+    soak_parser.add_argument('--faces', type=int, default=30)
+    soak_parser.add_argument('--dim', type=int, default=1280, help='Embedding size (1280 for the mobilenet embedder)')
+    soak_parser.add_argument('--window-minutes', type=float, default=15.0, help='Report interval in session minutes')
+    soak_parser.set_defaults(func=run_tracker_soak)
+
+    selective_parser = subparsers.add_parser('tracker-selective',
+                                             help='Embedder calls and ID switches with and without selective embedding')
+    selective_parser.add_argument('--minutes', type=float, default=10.0)
+    selective_parser.add_argument('--fps', type=float, default=5.0, help='Analysed frames per second')
+    selective_parser.add_argument('--faces', type=int, default=30)
+    selective_parser.add_argument('--dim', type=int, default=1280, help='Embedding size (1280 for the mobilenet embedder)')
+    selective_parser.set_defaults(func=run_tracker_selective)
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = create_parser().parse_args()
+    raise SystemExit(args.func(args))
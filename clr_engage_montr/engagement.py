@@ -0,0 +1,179 @@
+# engagement.py
+
+from collections import defaultdict
+import numpy as np
+
+EMOTION_LABELS = ['neutral', 'happy', 'sad', 'surprise', 'anger']
+STATUS_LABELS = ['Unknown', 'Engaged', 'Disengaged']
+UNKNOWN, ENGAGED, DISENGAGED = 0, 1, 2
+
+
+class EngagementRules:
+    """
+    Thresholds used to decide whether a tracked face is disengaged.
+
+    A face is "flagged" on a frame when it looks away (|yaw| or |pitch| above
+    the thresholds) or shows a disengaged emotion. After more than
+    `dissociation_frame_threshold` consecutive flagged frames it is Disengaged;
+    a single unflagged frame makes it Engaged again.
+    """
+    def __init__(self, dissociation_frame_threshold=6, yaw_threshold=33, pitch_threshold=23,
+                 disengaged_emotions=('surprise', 'sad', 'anger')):
+        self.dissociation_frame_threshold = dissociation_frame_threshold
+        self.yaw_threshold = yaw_threshold
+        self.pitch_threshold = pitch_threshold
+        self.disengaged_emotions = frozenset(disengaged_emotions)
+
+    def is_flagged(self, emotion, yaw, pitch):
+        """Returns True if this observation counts towards disengagement."""
+        is_looking_away = abs(yaw) > self.yaw_threshold or abs(pitch) > self.pitch_threshold
+        is_disengaged_emotion = emotion in self.disengaged_emotions
+        return is_looking_away or is_disengaged_emotion
+
+    def as_dict(self):
+        return {
+            "dissociation_frame_threshold": self.dissociation_frame_threshold,
+            "yaw_threshold": self.yaw_threshold,
+            "pitch_threshold": self.pitch_threshold,
+            "disengaged_emotions": sorted(self.disengaged_emotions),
+        }
+
+    def __repr__(self):
+        return f"EngagementRules({self.as_dict()})"
+
+
+class EngagementStateMachine:
+    """
+    Per-track engagement state, updated once per analysed face per frame.
+    """
+    def __init__(self, rules=None):
+        self.rules = rules or EngagementRules()
+        self.trackers = defaultdict(lambda: {'count': 0, 'status': 'Unknown'})
+
+    def update(self, track_id, emotion, yaw, pitch):
+        """
+        Feeds one observation for a track and returns its new status.
+
+        Args:
+            track_id: Tracker id of the face.
+            emotion (str): Lower-case emotion label.
+            yaw (float): Head yaw in degrees.
+            pitch (float): Head pitch in degrees.
+
+        Returns:
+            str: 'Unknown', 'Engaged' or 'Disengaged'.
+        """
+        current_tracker = self.trackers[track_id]
+        if self.rules.is_flagged(emotion, yaw, pitch):
+            current_tracker['count'] += 1
+        else:
+            current_tracker['count'] = 0
+            current_tracker['status'] = 'Engaged'
+
+        if current_tracker['count'] > self.rules.dissociation_frame_threshold:
+            current_tracker['status'] = 'Disengaged'
+
+        return current_tracker['status']
+
+
+EMOTION_INDEX = {label: i for i, label in enumerate(EMOTION_LABELS)}
+
+
+def emotion_index(emotion):
+    """Index of a lower-case emotion label in EMOTION_LABELS, or -1 for anything else."""
+    return EMOTION_INDEX.get(emotion, -1)
+
+
+class EngagementStateArrays:
+    """
+    Struct-of-arrays version of EngagementStateMachine.
+
+    Each track gets a slot; yaw, pitch, emotion index, flagged-frame counter
+    and status live in NumPy arrays indexed by slot, and all faces of a frame
+    are updated in one vectorized pass. Statuses are codes into STATUS_LABELS
+    and match EngagementStateMachine exactly (labels outside EMOTION_LABELS,
+    such as 'unknown' or 'error', never count as disengaged emotions).
+    """
+    def __init__(self, rules=None, capacity=64):
+        """
+        Args:
+            rules (EngagementRules, optional): Thresholds to apply.
+            capacity (int): Initial number of track slots (grows as needed).
+        """
+        self.rules = rules or EngagementRules()
+        self.slots = {}
+        self.yaw = np.zeros(capacity, dtype=np.float32)
+        self.pitch = np.zeros(capacity, dtype=np.float32)
+        self.emotion = np.full(capacity, -1, dtype=np.int8)
+        self.count = np.zeros(capacity, dtype=np.int32)
+        self.status = np.zeros(capacity, dtype=np.uint8)
+        # Indexed by emotion index; the trailing entry stands in for -1 (not an EMOTION_LABELS label)
+        self._disengaged_emotion = np.array(
+            [label in self.rules.disengaged_emotions for label in EMOTION_LABELS] + [False])
+
+    def slots_for(self, track_ids):
+        """Returns the slot of each track id, assigning slots to new tracks."""
+        slots = np.empty(len(track_ids), dtype=np.intp)
+        for i, track_id in enumerate(track_ids):
+            slot = self.slots.get(track_id)
+            if slot is None:
+                slot = self.slots[track_id] = len(self.slots)
+                if slot >= len(self.count):
+                    self._grow(2 * len(self.count))
+            slots[i] = slot
+        return slots
+
+    def update(self, track_ids, emotions, yaws, pitches):
+        """
+        Feeds one frame's observations and returns the new statuses.
+
+        Args:
+            track_ids (list): Tracker id of each face.
+            emotions (list or np.ndarray): Lower-case emotion labels, or their
+                indexes into EMOTION_LABELS (-1 for anything else).
+            yaws (array): Head yaw of each face in degrees.
+            pitches (array): Head pitch of each face in degrees.
+
+        Returns:
+            np.ndarray: Status code (see STATUS_LABELS) of each face.
+        """
+        if len(track_ids) == 0:
+            return np.empty(0, dtype=np.uint8)
+
+        slots = self.slots_for(track_ids)
+        if not isinstance(emotions, np.ndarray) or emotions.dtype.kind not in 'iu':
+            emotions = np.array([emotion_index(emotion) for emotion in emotions], dtype=np.int8)
+        yaws = np.asarray(yaws, dtype=np.float32)
+        pitches = np.asarray(pitches, dtype=np.float32)
+
+        # A track seen twice in one frame must be updated twice, in order
+        if len(np.unique(slots)) < len(slots):
+            statuses = np.empty(len(slots), dtype=np.uint8)
+            for i in range(len(slots)):
+                statuses[i:i + 1] = self._apply(slots[i:i + 1], emotions[i:i + 1], yaws[i:i + 1], pitches[i:i + 1])
+            return statuses
+        return self._apply(slots, emotions, yaws, pitches)
+
+    def _apply(self, slots, emotions, yaws, pitches):
+        self.yaw[slots] = yaws
+        self.pitch[slots] = pitches
+        self.emotion[slots] = emotions
+
+        flagged = ((np.abs(yaws) > self.rules.yaw_threshold)
+                   | (np.abs(pitches) > self.rules.pitch_threshold)
+                   | self._disengaged_emotion[emotions])
+
+        count = np.where(flagged, self.count[slots] + 1, 0)
+        status = np.where(flagged, self.status[slots], ENGAGED).astype(np.uint8)
+        status[count > self.rules.dissociation_frame_threshold] = DISENGAGED
+
+        self.count[slots] = count
+        self.status[slots] = status
+        return status
+
+    def _grow(self, capacity):
+        for name, fill in (('yaw', 0), ('pitch', 0), ('emotion', -1), ('count', 0), ('status', UNKNOWN)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
@@ -0,0 +1,234 @@
+# equivalence.py
+
+"""
+Golden-output equivalence harness for the engagement pipeline.
+
+Runs the same recorded clip through the original analysis loop (synchronous
+per-face inference and EngagementStateMachine, every crop analysed, every
+detection embedded, unbounded appearance galleries, library-default runtime;
+see `run_reference`) and through `run_video_analysis` in the optimized
+configuration, logging every analysed face, and compares the two logs frame
+by frame: faces are paired by box IoU, then track ids, emotions, head-pose
+angles and engagement status are checked within tolerances. Any divergence
+is reported with the frames where it happened.
+
+Usage:
+    python equivalence.py lecture.mp4
+    python equivalence.py lecture.mp4 --profile throughput --angle-tolerance 2 --max-divergence 0.01
+    python equivalence.py --reference-log ref_log/ --candidate-log opt_log/
+
+Exits with status 1 when the divergence rate exceeds --max-divergence.
+"""
+
+import argparse
+import sys
+import time
+import tempfile
+import numpy as np
+from analysis_log import ROW_DTYPE, AnalysisLogReader, status_code
+from engagement import EMOTION_LABELS, STATUS_LABELS, EngagementRules, EngagementStateMachine
+from models.association import iou_matrix
+
+
+def run_reference(video_path, rules=None):
+    """
+    Runs the original analysis loop over a clip and returns its faces as log rows.
+
+    This is the baseline the optimizations replaced, kept independent of them:
+    synchronous per-face emotion and head-pose inference, one
+    EngagementStateMachine update per face and rows collected in memory instead
+    of through AnalysisLogWriter. Every crop is analysed, every detection
+    embedded, appearance galleries are unbounded (nn_budget=None) and the
+    runtime profile is the library default.
+
+    Returns:
+        np.ndarray: Rows in analysis_log.ROW_DTYPE.
+    """
+    import cv2
+    from models.face_detection import YoloV8FaceDetector
+    from models.face_tracking import DeepSortFaceTracker
+    from models.face_expression import EmotionRecognizer
+    from models.face_direction import HeadPoseEstimator
+
+    detector = YoloV8FaceDetector(profile="default")
+    tracker = DeepSortFaceTracker(max_age=50, n_init=3, nn_budget=None, selective_embedding=False)
+    emotion_recognizer = EmotionRecognizer(profile="default")
+    pose_estimator = HeadPoseEstimator(profile="default")
+    engagement_state = EngagementStateMachine(rules or EngagementRules())
+
+    rows = []
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video file {video_path}")
+    frame_num = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        frame_num += 1
+        frame_time = time.time()
+        tracked_faces = tracker.update_tracks(detector.detect(frame), frame)
+        for track_id, bbox in tracked_faces:
+            x1, y1, x2, y2 = map(int, [
+                max(0, bbox[0]),
+                max(0, bbox[1]),
+                min(frame.shape[1], bbox[2]),
+                min(frame.shape[0], bbox[3])
+            ])
+
+            face_crop = frame[y1:y2, x1:x2]
+            if face_crop.size == 0 or face_crop.shape[0] < 20 or face_crop.shape[1] < 20:
+                continue
+
+            emotion, _, emotion_probs = emotion_recognizer.infer_with_probabilities(face_crop)
+            yaw, pitch, roll = pose_estimator.predict_angles(face_crop)
+            status = engagement_state.update(track_id, emotion.lower(), yaw, pitch)
+            rows.append((frame_num, frame_time, int(track_id), (x1, y1, x2, y2),
+                         emotion_probs, yaw, pitch, roll, status_code(status)))
+    cap.release()
+    return np.array(rows, dtype=ROW_DTYPE)
+
+
+def run_configuration(video_path, log_dir, **options):
+    """Runs the pipeline over a clip and returns every logged face (AnalysisLogReader rows)."""
+    from pipeline import run_video_analysis
+    run_video_analysis(video_path, log_dir=log_dir, **options)
+    return AnalysisLogReader(log_dir).read_all()
+
+
+def pair_faces(reference, candidate, min_iou=0.5):
+    """
+    Pairs the faces of one frame by box IoU (greedy, best overlap first).
+
+    Returns:
+        list: (reference index, candidate index) pairs.
+    """
+    iou = iou_matrix(reference['bbox'], candidate['bbox'])
+    pairs = []
+    while iou.size and iou.max() >= min_iou:
+        r, c = np.unravel_index(np.argmax(iou), iou.shape)
+        pairs.append((int(r), int(c)))
+        iou[r, :] = -1
+        iou[:, c] = -1
+    return pairs
+
+
+def compare_logs(reference, candidate, angle_tolerance=1.0, prob_tolerance=0.05, min_iou=0.5, max_examples=10):
+    """
+    Compares two analysis logs of the same clip.
+
+    Args:
+        reference (np.ndarray): Rows of the reference run (analysis_log.ROW_DTYPE).
+        candidate (np.ndarray): Rows of the optimized run.
+        angle_tolerance (float): Largest accepted yaw/pitch/roll difference in degrees.
+        prob_tolerance (float): Largest accepted difference of any emotion probability.
+        min_iou (float): Box IoU for two faces to count as the same face.
+        max_examples (int): Divergent faces listed in the report.
+
+    Returns:
+        dict: Face counts, divergence counts per field, the divergence rate and examples.
+    """
+    counts = {"track_id": 0, "emotion": 0, "emotion_probs": 0, "angles": 0, "status": 0}
+    report = {"frames": 0, "reference_faces": len(reference), "candidate_faces": len(candidate),
+              "paired": 0, "missing": 0, "extra": 0, "divergent": 0, "fields": counts, "examples": []}
+
+    frames = np.union1d(reference['frame'], candidate['frame'])
+    ref_bounds = np.searchsorted(reference['frame'], frames, side='left'), np.searchsorted(reference['frame'], frames, side='right')
+    cand_bounds = np.searchsorted(candidate['frame'], frames, side='left'), np.searchsorted(candidate['frame'], frames, side='right')
+    for i, frame in enumerate(frames):
+        ref = reference[ref_bounds[0][i]:ref_bounds[1][i]]
+        cand = candidate[cand_bounds[0][i]:cand_bounds[1][i]]
+        pairs = pair_faces(ref, cand, min_iou)
+        report["frames"] += 1
+        report["paired"] += len(pairs)
+        report["missing"] += len(ref) - len(pairs)
+        report["extra"] += len(cand) - len(pairs)
+
+        for r, c in pairs:
+            a, b = ref[r], cand[c]
+            fields = []
+            if a['track_id'] != b['track_id']:
+                fields.append("track_id")
+            if np.argmax(a['emotion_probs']) != np.argmax(b['emotion_probs']):
+                fields.append("emotion")
+            if np.max(np.abs(a['emotion_probs'] - b['emotion_probs'])) > prob_tolerance:
+                fields.append("emotion_probs")
+            angles = [abs(float(a[k]) - float(b[k])) for k in ('yaw', 'pitch', 'roll')]
+            if max(angles) > angle_tolerance:
+                fields.append("angles")
+            if a['status'] != b['status']:
+                fields.append("status")
+            if not fields:
+                continue
+
+            report["divergent"] += 1
+            for field in fields:
+                counts[field] += 1
+            if len(report["examples"]) < max_examples:
+                report["examples"].append({
+                    "frame": int(frame),
+                    "track_id": (int(a['track_id']), int(b['track_id'])),
+                    "emotion": (EMOTION_LABELS[int(np.argmax(a['emotion_probs']))],
+                                EMOTION_LABELS[int(np.argmax(b['emotion_probs']))]),
+                    "max_angle_delta": round(max(angles), 2),
+                    "status": (STATUS_LABELS[a['status']], STATUS_LABELS[b['status']]),
+                    "fields": fields,
+                })
+
+    unmatched = report["missing"] + report["extra"]
+    total = report["paired"] + unmatched
+    report["divergence_rate"] = (report["divergent"] + unmatched) / total if total else 0.0
+    return report
+
+
+def print_report(report):
+    print(f"\nCompared {report['frames']} frames: {report['reference_faces']} reference faces, "
+          f"{report['candidate_faces']} candidate faces, {report['paired']} paired")
+    print(f"Missing in candidate: {report['missing']}, extra in candidate: {report['extra']}, "
+          f"divergent pairs: {report['divergent']}")
+    for field, count in report["fields"].items():
+        print(f"  {field:<14}{count}")
+    for example in report["examples"]:
+        print(f"  frame {example['frame']}: {', '.join(example['fields'])} "
+              f"(ids {example['track_id']}, emotion {example['emotion']}, "
+              f"angle delta {example['max_angle_delta']}, status {example['status']})")
+    print(f"Divergence rate: {report['divergence_rate']:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the optimized pipeline against the reference")
+    parser.add_argument("video", nargs="?", help="Recorded clip to run both configurations on")
+    parser.add_argument("--profile", default=None, help="Runtime profile of the optimized run")
+    parser.add_argument("--reference-log", default=None, help="Existing reference log directory (skips the reference run)")
+    parser.add_argument("--candidate-log", default=None, help="Existing candidate log directory (skips the optimized run)")
+    parser.add_argument("--angle-tolerance", type=float, default=1.0)
+    parser.add_argument("--prob-tolerance", type=float, default=0.05)
+    parser.add_argument("--max-divergence", type=float, default=0.0,
+                        help="Highest divergence rate that still passes")
+    args = parser.parse_args()
+
+    if not args.video and not (args.reference_log and args.candidate_log):
+        parser.error("a video is required unless both --reference-log and --candidate-log are given")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.reference_log:
+            reference = AnalysisLogReader(args.reference_log).read_all()
+        else:
+            print("Running the reference configuration...")
+            reference = run_reference(args.video)
+        if args.candidate_log:
+            candidate = AnalysisLogReader(args.candidate_log).read_all()
+        else:
+            print("Running the optimized configuration...")
+            candidate = run_configuration(args.video, f"{scratch}/candidate", profile=args.profile)
+
+        report = compare_logs(np.sort(reference, order=['frame', 'track_id']),
+                              np.sort(candidate, order=['frame', 'track_id']),
+                              args.angle_tolerance, args.prob_tolerance)
+    print_report(report)
+    sys.exit(0 if report["divergence_rate"] <= args.max_divergence else 1)
+
+
+if __name__ == "__main__":
+    main()
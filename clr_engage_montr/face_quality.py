@@ -0,0 +1,80 @@
+# face_quality.py
+
+import cv2
+import numpy as np
+
+
+class CropQualityGate:
+    """
+    Cheap quality score for face crops, used to skip emotion and head-pose
+    inference on crops that would only produce noise (motion blur, heavy
+    occlusion, extreme angles).
+
+    The score is the geometric mean of three components in [0, 1]:
+      - size:      shorter side relative to `good_size`
+      - sharpness: variance of the Laplacian (on a fixed-size grayscale copy)
+                   relative to `good_sharpness`
+      - aspect:    1 inside `aspect_range` (width / height), falling to 0 at
+                   `aspect_tolerance` outside it
+    so any single very poor component rejects the crop.
+    """
+    def __init__(self, threshold=0.5, good_size=64, good_sharpness=50.0, aspect_range=(0.5, 1.5),
+                 aspect_tolerance=0.5, sample_size=64):
+        """
+        Args:
+            threshold (float): Minimum score for a crop to be analysed.
+            good_size (int): Shorter side in pixels that earns a full size score.
+            good_sharpness (float): Laplacian variance that earns a full sharpness score.
+            aspect_range (tuple): Width/height ratios that earn a full aspect score.
+            aspect_tolerance (float): How far outside `aspect_range` the aspect score reaches 0.
+            sample_size (int): Side of the grayscale copy the sharpness is measured on.
+        """
+        self.threshold = threshold
+        self.good_size = good_size
+        self.good_sharpness = good_sharpness
+        self.aspect_range = aspect_range
+        self.aspect_tolerance = aspect_tolerance
+        self.sample_size = sample_size
+
+        self.checked = 0
+        self.skipped = 0
+
+    def score(self, face_crop):
+        """
+        Args:
+            face_crop (np.ndarray): The cropped face region (HWC, BGR).
+
+        Returns:
+            float: Quality score in [0, 1].
+        """
+        height, width = face_crop.shape[:2]
+        if height == 0 or width == 0:
+            return 0.0
+
+        size_score = min(1.0, min(height, width) / self.good_size)
+
+        # Measure sharpness at a fixed resolution so it does not depend on crop size
+        gray = cv2.cvtColor(face_crop, cv2.COLOR_BGR2GRAY) if face_crop.ndim == 3 else face_crop
+        gray = cv2.resize(gray, (self.sample_size, self.sample_size), interpolation=cv2.INTER_AREA)
+        sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+        sharpness_score = min(1.0, sharpness / self.good_sharpness)
+
+        aspect = width / height
+        low, high = self.aspect_range
+        outside = max(low - aspect, aspect - high, 0.0)
+        aspect_score = max(0.0, 1.0 - outside / self.aspect_tolerance)
+
+        return float(np.cbrt(size_score * sharpness_score * aspect_score))
+
+    def accept(self, face_crop):
+        """Scores a crop, counts it, and returns True if it is good enough to analyse."""
+        self.checked += 1
+        if self.score(face_crop) >= self.threshold:
+            return True
+        self.skipped += 1
+        return False
+
+    @property
+    def skip_rate(self):
+        """Fraction of checked crops that were skipped."""
+        return self.skipped / self.checked if self.checked else 0.0
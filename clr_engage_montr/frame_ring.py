@@ -0,0 +1,304 @@
+# frame_ring.py
+
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+# Control words at the start of the shared block
+WRITE_SEQ, READ_SEQ, CLOSED = 0, 1, 2
+CONTROL_WORDS = 8
+ALIGN = 64
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+class FrameRing:
+    """
+    Ring buffer of preallocated frame slots in shared memory.
+
+    One process writes frames, another reads them back as NumPy views into the
+    shared block, so 1080p/4K frames never get pickled or copied between
+    processes. Every frame gets a sequence number. When `drop_oldest` is set the
+    writer never waits and overwrites the oldest slot (live cameras); otherwise
+    it waits for the reader (video files, where every frame matters).
+    """
+    def __init__(self, name=None, slots=8, max_height=1080, max_width=1920, create=False, drop_oldest=True):
+        """
+        Args:
+            name (str): Shared memory block name (generated when creating).
+            slots (int): Number of frame slots.
+            max_height (int): Largest frame height a slot can hold.
+            max_width (int): Largest frame width a slot can hold.
+            create (bool): Allocate the block (owner) instead of attaching to it.
+            drop_oldest (bool): Overwrite unread frames instead of waiting for the reader.
+        """
+        self.slots = slots
+        self.max_height = max_height
+        self.max_width = max_width
+        self.drop_oldest = drop_oldest
+
+        seq_offset = _align(CONTROL_WORDS * 8)
+        time_offset = _align(seq_offset + slots * 8)
+        shape_offset = _align(time_offset + slots * 8)
+        data_offset = _align(shape_offset + slots * 2 * 4)
+        slot_bytes = _align(max_height * max_width * 3)
+        size = data_offset + slots * slot_bytes
+
+        self._owner = create
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self.shm.name
+
+        buf = self.shm.buf
+        self._control = np.ndarray((CONTROL_WORDS,), dtype=np.int64, buffer=buf, offset=0)
+        self._slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=seq_offset)
+        self._slot_time = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=time_offset)
+        self._slot_shape = np.ndarray((slots, 2), dtype=np.int32, buffer=buf, offset=shape_offset)
+        self._slot_data = [
+            np.ndarray((max_height, max_width, 3), dtype=np.uint8, buffer=buf, offset=data_offset + i * slot_bytes)
+            for i in range(slots)
+        ]
+        if create:
+            self._control[:] = 0
+            self._slot_seq[:] = 0
+
+        self._last_seq = 0
+        self.dropped = 0
+
+    # --- writer side ---
+
+    def write(self, frame, timestamp=None):
+        """
+        Copies a BGR frame into the next slot.
+
+        Returns:
+            int: The frame's sequence number, or 0 if the ring was closed while waiting.
+        """
+        height, width = frame.shape[:2]
+        if height > self.max_height or width > self.max_width:
+            raise ValueError(f"Frame {width}x{height} exceeds slot size {self.max_width}x{self.max_height}")
+
+        seq = int(self._control[WRITE_SEQ]) + 1
+        if not self.drop_oldest:
+            # Keep the reader's current slot intact: wait until it has moved on
+            while seq - int(self._control[READ_SEQ]) >= self.slots:
+                if self._control[CLOSED]:
+                    return 0
+                time.sleep(0.001)
+
+        slot = seq % self.slots
+        self._slot_seq[slot] = 0  # slot is being rewritten
+        self._slot_shape[slot] = (height, width)
+        self._slot_time[slot] = time.time() if timestamp is None else timestamp
+        self._slot_data[slot][:height, :width] = frame
+        self._slot_seq[slot] = seq
+        self._control[WRITE_SEQ] = seq
+        return seq
+
+    def close_writer(self):
+        """Marks the stream as finished; `read` returns None once it is drained."""
+        self._control[CLOSED] = 1
+
+    # --- reader side ---
+
+    @property
+    def closed(self):
+        return bool(self._control[CLOSED])
+
+    def read(self, timeout=None):
+        """
+        Returns the next frame as a view into shared memory.
+
+        With drop_oldest the newest frame is returned and any frames skipped in
+        between are counted in `dropped`; otherwise frames come in order.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a new frame.
+
+        Returns:
+            tuple: (seq, timestamp, frame view) or None if no frame arrived /
+                   the stream is closed and drained.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            write_seq = int(self._control[WRITE_SEQ])
+            if write_seq > self._last_seq:
+                seq = write_seq if self.drop_oldest else self._last_seq + 1
+                seq = max(seq, write_seq - self.slots + 1)
+                slot = seq % self.slots
+                if self._slot_seq[slot] == seq:
+                    self.dropped += seq - self._last_seq - 1
+                    self._last_seq = seq
+                    self._control[READ_SEQ] = seq
+                    height, width = self._slot_shape[slot]
+                    return seq, float(self._slot_time[slot]), self._slot_data[slot][:height, :width]
+                continue  # overwritten under us; look again
+            if self.closed:
+                return None
+            if deadline is not None and time.time() >= deadline:
+                return None
+            time.sleep(0.001)
+
+    def is_current(self, seq):
+        """True while the slot holding frame `seq` has not been overwritten."""
+        return self._slot_seq[seq % self.slots] == seq
+
+    def close(self):
+        """Detaches from (and, for the owner, frees) the shared block."""
+        self._control = self._slot_seq = self._slot_time = self._slot_shape = None
+        self._slot_data = []
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def is_live_source(source):
+    """Camera indexes and network streams are live; anything else is a file."""
+    if isinstance(source, int):
+        return True
+    return str(source).lower().startswith(('rtsp://', 'rtmp://', 'http://', 'https://', 'udp://', 'tcp://'))
+
+
+def capture_loop(source, conn, slots, drop_oldest, stop_event,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0):
+    """
+    Entry point of the capture process: decodes `source` into the ring.
+
+    The first decoded frame's size is sent to the parent over `conn`, which
+    creates a ring with slots of exactly that size and sends back its name, so
+    frames are analysed at the source's own resolution. Live sources are
+    reopened with exponential backoff whenever they fail; files end the stream
+    at EOF.
+    """
+    import cv2
+
+    ring = None
+    live = is_live_source(source)
+    delay = reconnect_delay
+    try:
+        while not stop_event.is_set():
+            cap = cv2.VideoCapture(source)
+            if not cap.isOpened():
+                cap.release()
+                if not live:
+                    print(f"Error: Could not open video file {source}")
+                    break
+                print(f"Capture: could not open {source}, retrying in {delay:.0f}s")
+                stop_event.wait(delay)
+                delay = min(delay * 2, max_reconnect_delay)
+                continue
+
+            delay = reconnect_delay
+            try:
+                while not stop_event.is_set():
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    if ring is None:
+                        height, width = frame.shape[:2]
+                        conn.send((height, width))
+                        ring = FrameRing(conn.recv(), slots, height, width, drop_oldest=drop_oldest)
+                    if not ring.write(frame):
+                        break
+            finally:
+                cap.release()
+
+            if not live:
+                break
+            if not stop_event.is_set():
+                print(f"Capture: lost {source}, reconnecting...")
+    except (ValueError, EOFError, OSError) as e:
+        # A reconnected source with a larger resolution than the ring, or the
+        # parent going away during the handshake
+        print(f"Capture: stopping {source}: {e}")
+    finally:
+        conn.close()
+        if ring is not None:
+            ring.close_writer()
+            ring.close()
+
+
+class SharedMemoryCapture:
+    """
+    Drop-in replacement for cv2.VideoCapture that decodes in a separate
+    process and hands frames over through a FrameRing sized to the source.
+
+    For files, `read()` returns a NumPy view into shared memory; the writer
+    waits for the reader, so the view stays valid until the next `read()`.
+    Live sources never wait for the reader and would overwrite a slot while
+    it is still being analysed, so their frames are copied out of the ring.
+    """
+    def __init__(self, source, slots=8):
+        self.source = source
+        self.slots = slots
+        self.ring = None
+        self.drop_oldest = is_live_source(source)
+        self.copy_frames = self.drop_oldest
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._stop = multiprocessing.Event()
+        self._process = multiprocessing.Process(
+            target=capture_loop,
+            args=(source, child_conn, slots, self.drop_oldest, self._stop),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self.seq = 0
+        self.timestamp = 0.0
+        self._released = False
+
+    def _attach(self, timeout):
+        """Creates the ring once the capture process reports the frame size."""
+        if self.ring is None and not self._conn.closed and self._conn.poll(timeout):
+            try:
+                height, width = self._conn.recv()
+            except EOFError:  # capture ended before the first frame
+                self._conn.close()
+                return False
+            self.ring = FrameRing(slots=self.slots, max_height=height, max_width=width,
+                                  create=True, drop_oldest=self.drop_oldest)
+            self._conn.send(self.ring.name)
+        return self.ring is not None
+
+    def isOpened(self):
+        if self._released:
+            return False
+        if self._process.is_alive():
+            return True
+        return self.ring is not None and (not self.ring.closed
+                                          or int(self.ring._control[WRITE_SEQ]) > self.ring._last_seq)
+
+    def read(self):
+        """Returns (ret, frame) like cv2.VideoCapture.read."""
+        while not self._released:
+            if not self._attach(timeout=0.5):
+                if not self._process.is_alive() and (self._conn.closed or not self._conn.poll()):
+                    return False, None
+                continue
+            item = self.ring.read(timeout=0.5)
+            if item is not None:
+                self.seq, self.timestamp, frame = item
+                return True, frame.copy() if self.copy_frames else frame
+            if self.ring.closed or not self._process.is_alive():
+                return False, None
+        return False, None
+
+    @property
+    def dropped(self):
+        return self.ring.dropped if self.ring is not None else 0
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self._stop.set()
+        if self.ring is not None:
+            self.ring.close_writer()
+        self._conn.close()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+        if self.ring is not None:
+            self.ring.close()
@@ -0,0 +1,534 @@
+# inference_server.py
+
+"""
+Local inference server shared by several camera workers.
+
+One server process owns a single compiled instance of the face detector,
+emotion and head-pose models. Camera workers write preprocessed inputs into
+their own shared-memory slots and send small (client, request, model, slot)
+messages; the server groups pending requests per model into dynamic batches
+(bounded by `max_batch_size` and `max_delay`), runs them and writes the
+outputs back into the workers' slots.
+
+Usage:
+    python inference_server.py --sources 0 rtsp://cam2/stream lecture.mp4
+    ANALYSIS_MODE=reader uvicorn main:app --port 8001   # /api/classroom/realtime?stream=0
+"""
+
+import os
+import time
+import queue
+import multiprocessing
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+
+ALIGN = 64
+
+# Model name -> (weights, {output key: OpenVINO output index or name})
+MODELS = {
+    "detector": (os.getenv("DETECTOR_MODEL") or os.path.join('models', 'weights', 'yolov8n-face.onnx'), {"output": 0}),
+    "emotion": (os.path.join('models', 'weights', 'intel', 'emotions-recognition-retail-0003', 'FP32',
+                             'emotions-recognition-retail-0003.xml'), {"probabilities": 0}),
+    "head_pose": (os.path.join('models', 'weights', 'intel', 'head-pose-estimation-adas-0001', 'FP32',
+                               'head-pose-estimation-adas-0001.xml'),
+                  {"yaw": "angle_y_fc", "pitch": "angle_p_fc", "roll": "angle_r_fc"}),
+}
+
+
+# Requests per model one client can have in flight. A camera submits one
+# detector frame at a time, and each 640x640 float32 detector slot is ~4.9 MB,
+# so the detector gets only a batch's worth; face crops (~50 KB each) come many
+# per frame and get more.
+DEFAULT_CROP_SLOTS = 64
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def default_slots(specs, max_batch_size):
+    """Slots per model: `max_batch_size` for the detector, DEFAULT_CROP_SLOTS for the crop models."""
+    return {name: max_batch_size if name == "detector" else DEFAULT_CROP_SLOTS for name in specs}
+
+
+class ModelSpec:
+    """Per-item (batch dimension removed) input and output shapes of one model."""
+    def __init__(self, name, input_shape, outputs):
+        """
+        Args:
+            name (str): Model name used in requests.
+            input_shape (tuple): Shape of one input item, e.g. (3, 64, 64).
+            outputs (dict): Output key -> shape of one output item.
+        """
+        self.name = name
+        self.input_shape = tuple(input_shape)
+        self.outputs = {key: tuple(shape) for key, shape in outputs.items()}
+
+    def __repr__(self):
+        return f"ModelSpec({self.name!r}, {self.input_shape}, {self.outputs})"
+
+
+def read_model_specs(models=MODELS):
+    """Reads the input/output shapes of the served models (without compiling them)."""
+    from openvino.runtime import Core
+
+    core = Core()
+    specs = {}
+    for name, (path, outputs) in models.items():
+        model = core.read_model(model=path)
+        specs[name] = ModelSpec(
+            name,
+            model.inputs[0].get_shape()[1:],
+            {key: model.output(ref).get_shape()[1:] for key, ref in outputs.items()},
+        )
+    return specs
+
+
+class OpenVINOBatchRunner:
+    """
+    One compiled model, reshaped to accept a dynamic batch dimension.
+
+    Models that cannot be reshaped are compiled unchanged and run item by
+    item; they still benefit from being compiled only once.
+    """
+    def __init__(self, core, path, outputs, profile, max_batch_size):
+        from openvino.runtime import Dimension
+
+        model = core.read_model(model=path)
+        input_port = model.inputs[0]
+        try:
+            shape = input_port.get_partial_shape()
+            shape[0] = Dimension(1, max_batch_size)
+            model.reshape({input_port: shape})
+            self.batched = True
+        except Exception as e:
+            print(f"Inference server: {path} does not support batching, running items one by one ({e})")
+            self.batched = False
+
+        self.compiled_model = profile.compile(core, model)
+        self.output_ports = [self.compiled_model.output(ref) for ref in outputs.values()]
+        self.request = self.compiled_model.create_infer_request()
+
+    def __call__(self, batch):
+        """Runs a (N, ...) batch and returns one (N, ...) array per output."""
+        if self.batched:
+            results = self.request.infer([batch])
+            return [results[port] for port in self.output_ports]
+
+        items = []
+        for i in range(len(batch)):
+            results = self.request.infer([batch[i:i + 1]])
+            items.append([np.array(results[port]) for port in self.output_ports])
+        return [np.concatenate(outputs) for outputs in zip(*items)]
+
+
+def load_openvino_runners(specs, profile, max_batch_size):
+    """Default runner factory: compiles every model in `specs` once."""
+    from openvino.runtime import Core
+    from runtime_profiles import get_profile
+
+    core = Core()
+    profile = get_profile(profile)
+    print(f"Inference server: compiling models (runtime profile: {profile.name})...")
+    return {name: OpenVINOBatchRunner(core, MODELS[name][0], MODELS[name][1], profile, max_batch_size)
+            for name in specs}
+
+
+class ClientChannel:
+    """
+    Picklable description of one camera worker's connection: its shared
+    memory block and response queue. Pass it to the worker process and open
+    it there with InferenceClient.
+    """
+    def __init__(self, client_id, shm_name, specs, slots, request_queue, response_queue):
+        self.client_id = client_id
+        self.shm_name = shm_name
+        self.specs = specs
+        self.slots = slots
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+
+
+def _layout(specs, slots):
+    """Returns ({model: (input offset, {output key: offset})}, total size) for one client block."""
+    layout = {}
+    offset = 0
+    for name, spec in specs.items():
+        input_offset = offset
+        offset = _align(offset + slots[name] * int(np.prod(spec.input_shape)) * 4)
+        output_offsets = {}
+        for key, shape in spec.outputs.items():
+            output_offsets[key] = offset
+            offset = _align(offset + slots[name] * int(np.prod(shape)) * 4)
+        layout[name] = (input_offset, output_offsets)
+    return layout, max(offset, ALIGN)
+
+
+class _ClientBuffers:
+    """Float32 views of a client's input and output slots."""
+    def __init__(self, shm, specs, slots):
+        layout, _ = _layout(specs, slots)
+        self.inputs = {}
+        self.outputs = {}
+        for name, spec in specs.items():
+            input_offset, output_offsets = layout[name]
+            self.inputs[name] = np.ndarray((slots[name],) + spec.input_shape, dtype=np.float32,
+                                           buffer=shm.buf, offset=input_offset)
+            self.outputs[name] = {key: np.ndarray((slots[name],) + shape, dtype=np.float32,
+                                                  buffer=shm.buf, offset=output_offsets[key])
+                                  for key, shape in spec.outputs.items()}
+
+
+def serve(specs, channels, request_queue, runner_factory, profile, max_batch_size, max_delay,
+          ready, stats):
+    """
+    Entry point of the server process.
+
+    Requests for the same model are collected until `max_batch_size` of them
+    are waiting or the oldest has waited `max_delay` seconds, whichever comes
+    first, then run as one batch.
+    """
+    runners = runner_factory(specs, profile, max_batch_size)
+    shms = {channel.client_id: shared_memory.SharedMemory(name=channel.shm_name) for channel in channels}
+    buffers = {client_id: _ClientBuffers(shm, specs, channels[0].slots) for client_id, shm in shms.items()}
+    responses = {channel.client_id: channel.response_queue for channel in channels}
+    batch_inputs = {name: np.empty((max_batch_size,) + spec.input_shape, dtype=np.float32)
+                    for name, spec in specs.items()}
+    pending = {name: deque() for name in specs}
+    ready.set()
+
+    def run_batch(name):
+        items = [pending[name].popleft() for _ in range(min(max_batch_size, len(pending[name])))]
+        batch = batch_inputs[name][:len(items)]
+        for i, (client_id, _, slot, _) in enumerate(items):
+            batch[i] = buffers[client_id].inputs[name][slot]
+
+        done = {}
+        try:
+            outputs = runners[name](batch)
+            error = None
+        except Exception as e:
+            outputs, error = None, f"{name} inference failed: {e}"
+
+        for i, (client_id, request_id, slot, _) in enumerate(items):
+            if outputs is not None:
+                for key, output in zip(specs[name].outputs, outputs):
+                    buffers[client_id].outputs[name][key][slot] = output[i]
+            done.setdefault(client_id, []).append(request_id)
+        for client_id, request_ids in done.items():
+            responses[client_id].put((request_ids, error))
+
+        with stats.get_lock():
+            stats[0] += 1
+            stats[1] += len(items)
+            stats[2] = max(stats[2], len(items))
+
+    running = True
+    try:
+        while running or any(pending.values()):
+            now = time.perf_counter()
+            waiting = [items[0][3] + max_delay for items in pending.values() if items]
+            timeout = max(0.0, min(waiting) - now) if waiting else 0.1
+
+            # Block until the next deadline, then drain whatever else has arrived
+            messages = []
+            try:
+                messages.append(request_queue.get(timeout=timeout) if running else request_queue.get_nowait())
+                while True:
+                    messages.append(request_queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            now = time.perf_counter()
+            for message in messages:
+                if message is None:
+                    running = False
+                    continue
+                client_id, request_id, name, slot = message
+                pending[name].append((client_id, request_id, slot, now))
+
+            for name, items in pending.items():
+                while items and (len(items) >= max_batch_size or not running
+                                 or time.perf_counter() - items[0][3] >= max_delay):
+                    run_batch(name)
+    finally:
+        buffers.clear()
+        for shm in shms.values():
+            shm.close()
+
+
+class InferenceServer:
+    """
+    Starts and owns the inference server process and the shared memory of
+    its clients.
+
+    Create every client channel with `create_client()` before `start()`, then
+    hand each channel to its camera worker process.
+    """
+    def __init__(self, specs=None, profile=None, max_batch_size=16, max_delay=0.005, slots=None,
+                 runner_factory=load_openvino_runners):
+        """
+        Args:
+            specs (dict, optional): Model name -> ModelSpec (read from the model files by default).
+            profile (str or RuntimeProfile, optional): Runtime profile used to compile the models.
+            max_batch_size (int): Largest batch run at once.
+            max_delay (float): Longest time in seconds a request waits for its batch to fill.
+            slots (int or dict, optional): Requests a single client can have in flight, for
+                every model or per model name (default: see `default_slots`).
+            runner_factory (callable): (specs, profile, max_batch_size) -> {model name: runner},
+                where a runner maps an (N, ...) input batch to a list of (N, ...) outputs.
+        """
+        self.specs = specs if specs is not None else read_model_specs()
+        self.profile = profile
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        if slots is None:
+            slots = default_slots(self.specs, max_batch_size)
+        elif isinstance(slots, int):
+            slots = {name: slots for name in self.specs}
+        self.slots = slots
+        self.runner_factory = runner_factory
+
+        self._request_queue = multiprocessing.Queue()
+        self._channels = []
+        self._shms = []
+        self._ready = multiprocessing.Event()
+        # batches run, requests served, largest batch
+        self._stats = multiprocessing.Array('q', 3)
+        self._process = None
+
+    @property
+    def client_memory_bytes(self):
+        """Shared memory allocated per camera worker (all models' input and output slots)."""
+        return _layout(self.specs, self.slots)[1]
+
+    def create_client(self):
+        """Allocates the shared memory for one more camera worker and returns its ClientChannel."""
+        if self._process is not None:
+            raise RuntimeError("Clients must be created before the inference server is started")
+        shm = shared_memory.SharedMemory(create=True, size=self.client_memory_bytes)
+        channel = ClientChannel(len(self._channels), shm.name, self.specs, self.slots,
+                                self._request_queue, multiprocessing.Queue())
+        self._shms.append(shm)
+        self._channels.append(channel)
+        return channel
+
+    def start(self, timeout=None):
+        """Starts the server process and waits until its models are compiled."""
+        self._process = multiprocessing.Process(
+            target=serve,
+            args=(self.specs, self._channels, self._request_queue, self.runner_factory, self.profile,
+                  self.max_batch_size, self.max_delay, self._ready, self._stats),
+            daemon=True,
+        )
+        self._process.start()
+        while not self._ready.wait(0.1):
+            if not self._process.is_alive():
+                raise RuntimeError("Inference server failed to start")
+            if timeout is not None:
+                timeout -= 0.1
+                if timeout <= 0:
+                    raise TimeoutError("Inference server did not become ready in time")
+        return self
+
+    @property
+    def stats(self):
+        """Batches run, requests served, average and largest batch size."""
+        batches, requests, largest = self._stats[:]
+        return {
+            "batches": batches,
+            "requests": requests,
+            "average_batch_size": requests / batches if batches else 0.0,
+            "max_batch_size": largest,
+        }
+
+    def stop(self):
+        if self._process is not None and self._process.is_alive():
+            self._request_queue.put(None)
+            self._process.join(timeout=10)
+            if self._process.is_alive():
+                self._process.terminate()
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms = []
+
+    def __enter__(self):
+        return self if self._process is not None else self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class InferenceClient:
+    """
+    Camera-worker side of a ClientChannel. Mirrors the submit()/wait() style
+    of the model wrappers; see models/remote.py for drop-in wrappers.
+
+    Not thread-safe: use one client per camera worker.
+    """
+    def __init__(self, channel, timeout=30.0):
+        """
+        Args:
+            channel (ClientChannel): Channel created by InferenceServer.create_client().
+            timeout (float): Seconds to wait for a result before giving up.
+        """
+        self.channel = channel
+        self.timeout = timeout
+        self._shm = shared_memory.SharedMemory(name=channel.shm_name)
+        self._buffers = _ClientBuffers(self._shm, channel.specs, channel.slots)
+        self._free_slots = {name: list(range(channel.slots[name])) for name in channel.specs}
+        self._in_flight = {}
+        self._results = {}
+        self._next_id = 0
+
+    def submit(self, model, tensor):
+        """
+        Queues one input item (with or without its batch dimension of 1).
+
+        Returns:
+            int: Request id to pass to `wait`.
+        """
+        spec = self.channel.specs[model]
+        while not self._free_slots[model]:
+            # All slots busy: collect finished results to free some up
+            self._collect(self.timeout)
+        slot = self._free_slots[model].pop()
+        self._buffers.inputs[model][slot] = np.asarray(tensor, dtype=np.float32).reshape(spec.input_shape)
+
+        self._next_id += 1
+        self._in_flight[self._next_id] = (model, slot)
+        self.channel.request_queue.put((self.channel.client_id, self._next_id, model, slot))
+        return self._next_id
+
+    def wait(self, request_id):
+        """
+        Returns:
+            dict: Output key -> array for one item (batch dimension removed).
+        """
+        while request_id not in self._results:
+            if request_id not in self._in_flight:
+                raise KeyError(f"Unknown inference request {request_id}")
+            self._collect(self.timeout)
+        result = self._results.pop(request_id)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def infer(self, model, tensor):
+        """Blocking `submit` + `wait`."""
+        return self.wait(self.submit(model, tensor))
+
+    def _collect(self, timeout):
+        try:
+            request_ids, error = self.channel.response_queue.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No response from the inference server") from None
+        for request_id in request_ids:
+            model, slot = self._in_flight.pop(request_id)
+            if error:
+                self._results[request_id] = RuntimeError(error)
+            else:
+                self._results[request_id] = {key: output[slot].copy()
+                                             for key, output in self._buffers.outputs[model].items()}
+            self._free_slots[model].append(slot)
+
+    def close(self):
+        self._buffers = None
+        self._shm.close()
+
+
+def camera_worker(source, channel, stream, log_dir=None, capture_process=False, schedule=None, quality_gate=False):
+    """
+    Entry point of a camera worker process: runs the pipeline against the server.
+
+    Args:
+        schedule (tuple, optional): (scheduler table name, stream count, target FPS,
+            own budget in analysis seconds per second) to run this camera under a StreamScheduler.
+        quality_gate (bool): Skip attribute inference on low-quality crops (face_quality.py).
+    """
+    from pipeline import run_video_analysis
+    from shared_state import SnapshotPublisher, default_snapshot_path
+    from stream_scheduler import SchedulerTable, StreamScheduler
+
+    client = InferenceClient(channel)
+    publisher = SnapshotPublisher(default_snapshot_path(stream))
+    table = scheduler = None
+    if schedule:
+        table_name, streams, target_fps, stream_budget = schedule
+        table = SchedulerTable(streams, name=table_name)
+        scheduler = StreamScheduler(table, int(stream), target_fps, stream_budget)
+    print(f"[camera {stream}] publishing engagement snapshots to {publisher.path}")
+    try:
+        run_video_analysis(source, log_dir=log_dir, publisher=publisher, capture_process=capture_process,
+                           inference_client=client, scheduler=scheduler, quality_gate=quality_gate)
+    finally:
+        publisher.close()
+        client.close()
+        if table:
+            table.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run several cameras against one shared inference server")
+    parser.add_argument('--sources', nargs='+', default=['0'], help='Camera indexes, video files or stream URLs')
+    parser.add_argument('--profile', default=None, help='Runtime profile (see runtime_profiles.py)')
+    parser.add_argument('--max-batch-size', type=int, default=16)
+    parser.add_argument('--max-delay-ms', type=float, default=5.0, help='Longest wait for a batch to fill')
+    parser.add_argument('--log-dir', default=os.getenv("ANALYSIS_LOG_DIR"),
+                        help='Analysis log root; each run gets a timestamped subdirectory with one '
+                             'numbered subdirectory per camera')
+    parser.add_argument('--capture-process', action='store_true',
+                        help='Decode each source in its own process (see frame_ring.py)')
+    parser.add_argument('--target-fps', type=float, nargs='+', default=[10.0],
+                        help='Analysis FPS per source (one value for all, or one per source)')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='Wall-clock seconds of analysis per second shared by all cameras '
+                             '(default: one per core)')
+    parser.add_argument('--stream-budget', type=float, default=None, help='Wall-clock seconds of analysis per second a single camera may use')
+    parser.add_argument('--quality-gate', action='store_true', default=os.getenv("QUALITY_GATE") == "1",
+                        help='Skip attribute inference on blurred, occluded or extreme-angle crops (face_quality.py)')
+    args = parser.parse_args()
+
+    from stream_scheduler import SchedulerTable
+    target_fps = args.target_fps * len(args.sources) if len(args.target_fps) == 1 else args.target_fps
+    if len(target_fps) != len(args.sources):
+        parser.error("--target-fps needs one value or one per source")
+    table = SchedulerTable(len(args.sources), args.time_budget, create=True)
+
+    server = InferenceServer(profile=args.profile, max_batch_size=args.max_batch_size,
+                             max_delay=args.max_delay_ms / 1000.0)
+    print(f"Inference server: {server.client_memory_bytes / 2**20:.0f} MB of shared memory per camera "
+          f"(slots per model: {server.slots})")
+    from analysis_log import session_log_dir
+    log_root = session_log_dir(args.log_dir) if args.log_dir else None
+    workers = []
+    for index, source in enumerate(args.sources):
+        source = int(source) if source.isdigit() else source
+        log_dir = os.path.join(log_root, str(index)) if log_root else None
+        schedule = (table.name, len(args.sources), target_fps[index], args.stream_budget)
+        workers.append(multiprocessing.Process(
+            target=camera_worker,
+            args=(source, server.create_client(), str(index), log_dir, args.capture_process, schedule,
+                  args.quality_gate)))
+
+    with server:
+        for worker in workers:
+            worker.start()
+        try:
+            seconds = 0
+            while any(worker.is_alive() for worker in workers):
+                time.sleep(1)
+                seconds += 1
+                if seconds % 30 == 0:
+                    for row in table.report():
+                        print(f"[camera {row['stream']}] {row['achieved_fps']:.1f}/{row['target_fps']:.1f} fps "
+                              f"(allowed {row['allowed_fps']:.1f}, {row['ms_per_frame']:.0f} ms/frame)")
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+        print(f"Inference server: {server.stats}")
+        table.close()
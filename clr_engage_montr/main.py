@@ -1,13 +1,11 @@
-import cv2
-import time
+import os
+import re
 import threading
-from collections import defaultdict
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from models.face_detection import YoloV8FaceDetector
-from models.face_tracking import DeepSortFaceTracker
-from models.face_expression import EmotionRecognizer
-from models.face_direction import HeadPoseEstimator
+from pipeline import run_video_analysis, realtime_data, preview_frame
+from shared_state import SnapshotPublisher, SnapshotReader, default_snapshot_path
+from analysis_log import session_log_dir
 
 app = FastAPI()
 
@@ -20,113 +18,103 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Shared state for Streamlit to access
-realtime_data = {
-    "present_ids": [],
-    "engagement": []
-}
-
-def run_video_analysis(video_path):
-    print("Initializing models...")
-    detector = YoloV8FaceDetector()
-    tracker = DeepSortFaceTracker(max_age=50, n_init=3)
-    emotion_recognizer = EmotionRecognizer()
-    pose_estimator = HeadPoseEstimator()
-    print("Models loaded.")
-
-    dissociation_tracker = defaultdict(lambda: {'count': 0, 'status': 'Unknown'})
-    DISSOCIATION_FRAME_THRESHOLD = 6
-    YAW_THRESHOLD = 33
-    PITCH_THRESHOLD = 23
-
-    unique_ids = set()
-    PRINT_INTERVAL = 10
-    ATTENDANCE_UPDATE_INTERVAL = 50
-
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"Error: Could not open video file {video_path}")
-        return
-
-    frame_num = 0
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            print("End of video or cannot read frame.")
-            break
-
-        frame_num += 1
-        detections = detector.detect(frame)
-        tracked_faces = tracker.update_tracks(detections, frame)
-
-        engagement_output = []
-
-        for track_id, bbox in tracked_faces:
-            x1, y1, x2, y2 = map(int, [
-                max(0, bbox[0]),
-                max(0, bbox[1]),
-                min(frame.shape[1], bbox[2]),
-                min(frame.shape[0], bbox[3])
-            ])
-
-            face_crop = frame[y1:y2, x1:x2]
-            if face_crop.size == 0 or face_crop.shape[0] < 20 or face_crop.shape[1] < 20:
-                continue
-
-            emotion, _ = emotion_recognizer.infer(face_crop)
-            yaw, pitch, _ = pose_estimator.predict_angles(face_crop)
-
-            emotion = emotion.lower()
-            is_looking_away = abs(yaw) > YAW_THRESHOLD or abs(pitch) > PITCH_THRESHOLD
-            is_disengaged_emotion = emotion in ['surprise', 'sad', 'anger']
-
-            current_tracker = dissociation_tracker[track_id]
-            if is_looking_away or is_disengaged_emotion:
-                current_tracker['count'] += 1
-            else:
-                current_tracker['count'] = 0
-                current_tracker['status'] = 'Engaged'
-
-            if current_tracker['count'] > DISSOCIATION_FRAME_THRESHOLD:
-                current_tracker['status'] = 'Disengaged'
-
-            # Attendance
-            if frame_num % ATTENDANCE_UPDATE_INTERVAL == 0:
-                unique_ids.add(track_id)
-
-            if frame_num % PRINT_INTERVAL == 0:
-                print(f"[Frame {frame_num}] ID: {track_id}, Emotion: {emotion}, Engagement: {current_tracker['status']}")
-
-            engagement_output.append({
-                "id": track_id,
-                "emotion": emotion,
-                "engagement": current_tracker['status']
-            })
-
-        if frame_num % PRINT_INTERVAL == 0:
-            realtime_data["present_ids"] = list(unique_ids)
-            realtime_data["engagement"] = engagement_output
-
-        if frame_num % ATTENDANCE_UPDATE_INTERVAL == 0:
-            print(f"[Frame {frame_num}] Attendance: {len(unique_ids)} students")
-
-    cap.release()
-    print("Video processing complete.")
+# "embedded": this process runs the camera pipeline in a background thread.
+# "reader":   this process only serves the API, reading snapshots that a single
+#             dedicated `python main.py` analysis process publishes into shared
+#             memory, so uvicorn can run any number of workers.
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "embedded")
+snapshot_reader = SnapshotReader() if ANALYSIS_MODE == "reader" else None
+# Readers for the per-camera snapshots published by inference_server.py
+stream_readers = {}
+# Camera streams served in reader mode (inference_server.py names them 0, 1, ...).
+# Unset, a stream is served once its snapshot file has been published.
+ANALYSIS_STREAMS = [name for name in os.getenv("ANALYSIS_STREAMS", "").split(",") if name]
+STREAM_NAME = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def is_known_stream(stream):
+    # The name becomes part of a file path, and every stream keeps a reader open
+    if ANALYSIS_STREAMS:
+        return stream in ANALYSIS_STREAMS
+    return bool(STREAM_NAME.match(stream)) and os.path.exists(default_snapshot_path(stream))
 
 # FastAPI endpoint
 @app.get("/api/classroom/realtime")
-def get_realtime_engagement(subject: str = ""):
+def get_realtime_engagement(subject: str = "", stream: str = ""):
+    if snapshot_reader and stream:
+        if stream not in stream_readers:
+            if not is_known_stream(stream):
+                return Response(status_code=404, content=f"Unknown stream: {stream[:64]}")
+            stream_readers[stream] = SnapshotReader(default_snapshot_path(stream))
+        return stream_readers[stream].read(default=realtime_data)
+    if snapshot_reader:
+        return snapshot_reader.read(default=realtime_data)
     return realtime_data
 
+# Latest frame with face boxes and engagement status, drawn and encoded only on request
+@app.get("/api/classroom/preview.jpg")
+def get_preview_frame(request: Request):
+    if snapshot_reader:
+        # The frames live in the separate analysis process
+        return Response(status_code=503, content="Preview is only available in embedded mode")
+    jpeg, version = preview_frame.jpeg()
+    if jpeg is None:
+        return Response(status_code=503, content="No frame analysed yet")
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=jpeg, media_type="image/jpeg", headers=headers)
+
 # Return the health status of the api
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "message": "Server is running"}
+    health = {"status": "ok", "message": "Server is running", "analysis_mode": ANALYSIS_MODE}
+    if snapshot_reader:
+        snapshot_reader.read()
+        health["snapshot_age_seconds"] = snapshot_reader.age()
+    return health
 
 # Start the processing thread
-def start_background_processing(video_path=0):  # <-- change to 0 for webcam
-    t = threading.Thread(target=run_video_analysis, args=(video_path,), daemon=True)
+def start_background_processing(video_path=0, log_dir=None, profile=None, capture_process=False,
+                                quality_gate=False):  # <-- change to 0 for webcam
+    t = threading.Thread(target=run_video_analysis, daemon=True, args=(video_path,),
+                         kwargs={"log_dir": log_dir, "profile": profile, "capture_process": capture_process,
+                                 "quality_gate": quality_gate})
     t.start()
 
-# Kick off when server starts
-start_background_processing()
+# Kick off when the server starts. Not at import time: the capture process
+# (spawn) re-imports this module and must not start a second pipeline.
+@app.on_event("startup")
+def start_embedded_pipeline():
+    if ANALYSIS_MODE != "embedded":
+        return
+    log_root = os.getenv("ANALYSIS_LOG_DIR")
+    start_background_processing(log_dir=session_log_dir(log_root) if log_root else None,
+                                capture_process=os.getenv("CAPTURE_PROCESS") == "1",
+                                quality_gate=os.getenv("QUALITY_GATE") == "1")
+
+if __name__ == "__main__":
+    # Dedicated analysis process for multi-worker deployments:
+    #   python main.py --source 0
+    #   ANALYSIS_MODE=reader uvicorn main:app --workers 4 --port 8001
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the engagement pipeline and publish snapshots to shared memory")
+    parser.add_argument('--source', default='0', help='Camera index, video file or stream URL')
+    parser.add_argument('--log-dir', default=os.getenv("ANALYSIS_LOG_DIR"),
+                        help='Analysis log root; each run logs to a new timestamped subdirectory')
+    parser.add_argument('--profile', default=None, help='Runtime profile (see runtime_profiles.py)')
+    parser.add_argument('--capture-process', action='store_true',
+                        help='Decode the source in a separate process and share frames through shared memory')
+    parser.add_argument('--quality-gate', action='store_true', default=os.getenv("QUALITY_GATE") == "1",
+                        help='Skip attribute inference on blurred, occluded or extreme-angle crops (face_quality.py)')
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    publisher = SnapshotPublisher()
+    print(f"Publishing engagement snapshots to {publisher.path}")
+    try:
+        log_dir = session_log_dir(args.log_dir) if args.log_dir else None
+        run_video_analysis(source, log_dir, None, args.profile, publisher, args.capture_process,
+                           quality_gate=args.quality_gate)
+    finally:
+        publisher.close()
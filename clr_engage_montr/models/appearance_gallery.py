@@ -0,0 +1,88 @@
+# models/appearance_gallery.py
+
+import numpy as np
+
+
+class AppearanceGallery:
+    """
+    Bounded, representative set of appearance features for one track.
+
+    Instead of dropping the oldest feature when the budget is exceeded (FIFO),
+    the two most similar features are merged into their weighted mean. The
+    gallery therefore keeps one sample per distinct appearance (head turned,
+    looking down, different lighting) no matter how long the track lives,
+    while repeated near-identical frames collapse into one sample.
+
+    Pairwise cosine distances are maintained incrementally, so adding a
+    feature costs O(budget * dim).
+    """
+    def __init__(self, budget):
+        """
+        Args:
+            budget (int): Maximum number of samples kept.
+        """
+        if budget < 1:
+            raise ValueError("Gallery budget must be at least 1")
+        self.budget = budget
+        self.size = 0
+        self.features = None
+        self.weights = np.zeros(budget + 1, dtype=np.float64)
+        self._distances = np.full((budget + 1, budget + 1), np.inf, dtype=np.float32)
+
+    @property
+    def samples(self):
+        """(size, dim) array of unit-length samples."""
+        if self.features is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self.features[:self.size]
+
+    @property
+    def nbytes(self):
+        return 0 if self.features is None else self.features.nbytes + self.weights.nbytes + self._distances.nbytes
+
+    def add(self, feature):
+        """Adds one feature, merging the closest pair if the budget is exceeded."""
+        feature = np.asarray(feature, dtype=np.float32).ravel()
+        if self.features is None:
+            self.features = np.zeros((self.budget + 1, feature.size), dtype=np.float32)
+
+        n = self.size
+        self.features[n] = feature / max(np.linalg.norm(feature), 1e-12)
+        self.weights[n] = 1.0
+        self._update_distances(n, n)
+        self.size += 1
+
+        if self.size > self.budget:
+            self._merge_closest()
+
+    def _update_distances(self, row, n):
+        """Recomputes the distances between sample `row` and the first `n` samples."""
+        distances = 1.0 - self.features[:n] @ self.features[row]
+        self._distances[row, :n] = distances
+        self._distances[:n, row] = distances
+        self._distances[row, row] = np.inf
+
+    def _merge_closest(self):
+        n = self.size
+        i, j = divmod(int(np.argmin(self._distances[:n, :n])), n)
+        i, j = min(i, j), max(i, j)
+
+        # Weighted mean of the pair goes into slot i
+        merged = self.weights[i] * self.features[i] + self.weights[j] * self.features[j]
+        self.features[i] = merged / max(np.linalg.norm(merged), 1e-12)
+        self.weights[i] += self.weights[j]
+
+        # The last sample moves into the freed slot j
+        last = n - 1
+        if j != last:
+            self.features[j] = self.features[last]
+            self.weights[j] = self.weights[last]
+            self._distances[j, :] = self._distances[last, :]
+            self._distances[:, j] = self._distances[:, last]
+            self._distances[j, j] = np.inf
+        self._distances[last, :] = np.inf
+        self._distances[:, last] = np.inf
+        self.weights[last] = 0.0
+        self.size = last
+
+        self._update_distances(i, self.size)
@@ -0,0 +1,66 @@
+# models/association.py
+
+import numpy as np
+
+
+def ltwh_to_ltrb(boxes):
+    """Converts an (N, 4) array of [left, top, width, height] boxes to [left, top, right, bottom]."""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    return np.concatenate([boxes[:, :2], boxes[:, :2] + boxes[:, 2:]], axis=1)
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Pairwise IoU of two sets of [left, top, right, bottom] boxes.
+
+    Returns:
+        np.ndarray: (len(boxes_a), len(boxes_b)) matrix.
+    """
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+
+    left = np.maximum(a[:, None, 0], b[None, :, 0])
+    top = np.maximum(a[:, None, 1], b[None, :, 1])
+    right = np.minimum(a[:, None, 2], b[None, :, 2])
+    bottom = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-12), 0.0)
+
+
+def unambiguous_matches(iou, match_threshold=0.5, overlap_threshold=0.1):
+    """
+    Finds detections that map to exactly one track by IoU alone.
+
+    A detection is unambiguous when its best track overlaps it by at least
+    `match_threshold`, and neither the detection nor that track overlaps any
+    other track/detection by more than `overlap_threshold`. Everything else
+    (new faces, occlusions, people crossing) is ambiguous and needs an
+    appearance embedding.
+
+    Args:
+        iou (np.ndarray): (detections, tracks) IoU matrix.
+        match_threshold (float): Minimum IoU for a confident match.
+        overlap_threshold (float): IoU above which a second candidate makes the match ambiguous.
+
+    Returns:
+        np.ndarray: Track index per detection, or -1 where ambiguous or unmatched.
+    """
+    n_detections, n_tracks = iou.shape
+    matches = np.full(n_detections, -1, dtype=np.intp)
+    if n_detections == 0 or n_tracks == 0:
+        return matches
+
+    best = np.argmax(iou, axis=1)
+    best_iou = iou[np.arange(n_detections), best]
+    candidates_per_detection = np.sum(iou > overlap_threshold, axis=1)
+    candidates_per_track = np.sum(iou > overlap_threshold, axis=0)
+
+    clear = (best_iou >= match_threshold) & (candidates_per_detection == 1) & (candidates_per_track[best] == 1)
+    matches[clear] = best[clear]
+    return matches
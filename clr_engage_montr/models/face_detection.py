@@ -1,7 +1,20 @@
 # models/face_detection.py (Corrected Again)
 
+import os
 import cv2
 import numpy as np
+from runtime_profiles import get_profile
+
+DEFAULT_MODEL_PATH = 'models/weights/yolov8n-face.onnx'
+
+
+def detector_model_path():
+    """
+    The detector model to load: the DETECTOR_MODEL environment variable (e.g. the
+    INT8 OpenVINO IR written by quantize_detector.py) or the FP32 ONNX model.
+    """
+    return os.getenv("DETECTOR_MODEL") or DEFAULT_MODEL_PATH
+
 
 class YoloV8FaceDetector:
     """
@@ -10,18 +23,36 @@ class YoloV8FaceDetector:
     It uses an ONNX model and provides a method to get detections in a format
     suitable for trackers like DeepSORT.
     """
-    def __init__(self, model_path='models/weights/yolov8n-face.onnx', conf_threshold=0.45, iou_threshold=0.5):
+    def __init__(self, model_path=None, conf_threshold=0.45, iou_threshold=0.5, profile=None, backend=None):
         """
         Initializes the YOLOv8 Face Detector.
 
         Args:
-            model_path (str): Path to the ONNX model file.
+            model_path (str, optional): Path to the ONNX model, or an OpenVINO IR (.xml) such as
+                the INT8 model from quantize_detector.py. Defaults to `detector_model_path()`.
             conf_threshold (float): Confidence threshold for filtering detections.
             iou_threshold (float): IoU threshold for non-maximum suppression.
+            profile (str or RuntimeProfile, optional): Runtime profile (see runtime_profiles.py).
+                It selects the backend (cv2.dnn or OpenVINO) and its performance settings.
+            backend (str, optional): 'openvino' or 'opencv', overriding the profile's backend.
         """
         self.conf_threshold = conf_threshold
         self.iou_threshold = iou_threshold
-        self.net = cv2.dnn.readNet(model_path)
+        self.profile = get_profile(profile)
+        self.model_path = model_path or detector_model_path()
+        # cv2.dnn cannot run OpenVINO IR (e.g. the quantized INT8 detector)
+        self.backend = 'openvino' if self.model_path.endswith('.xml') else backend or self.profile.detector_backend
+
+        if self.backend == 'openvino':
+            from openvino.runtime import Core
+            core = Core()
+            self.net = None
+            self.compiled_model = self.profile.compile(core, core.read_model(model=self.model_path))
+            self.output_layer = self.compiled_model.outputs[0]
+        else:
+            self.net = cv2.dnn.readNet(self.model_path)
+            if self.profile.inference_threads:
+                cv2.setNumThreads(self.profile.inference_threads)
         
         # --- THIS IS THE FIX ---
         # Hardcode the standard input size for YOLOv8-face models for reliability.
@@ -29,7 +60,7 @@ class YoloV8FaceDetector:
         self.input_height = 640
         self.input_width = 640
         
-        print("YOLOv8 Face Detector initialized successfully.")
+        print(f"YOLOv8 Face Detector initialized successfully ({self.backend}, profile '{self.profile.name}', {self.model_path}).")
 
     def detect(self, image):
         """
@@ -43,13 +74,21 @@ class YoloV8FaceDetector:
         """
         input_image, scale, pad_x, pad_y = self._format_image(image)
         
-        self.net.setInput(input_image)
-        outputs = self.net.forward(self.net.getUnconnectedOutLayersNames())
-        
-        detections = self._process_output(outputs[0], scale, pad_x, pad_y)
+        output = self._infer(input_image)
+
+        detections = self._process_output(output, scale, pad_x, pad_y)
         
         return detections
 
+    def _infer(self, input_image):
+        """Runs the network on a preprocessed blob and returns its first output."""
+        if self.net is None:
+            return self.compiled_model([input_image])[self.output_layer]
+
+        self.net.setInput(input_image)
+        outputs = self.net.forward(self.net.getUnconnectedOutLayersNames())
+        return outputs[0]
+
     def _format_image(self, image):
         """Prepares image for network input by padding and scaling."""
         image_height, image_width = image.shape[:2]
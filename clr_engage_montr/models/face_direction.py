@@ -4,9 +4,10 @@ import numpy as np
 import os
 import cv2
 from openvino.runtime import Core
+from runtime_profiles import get_profile
 
 class HeadPoseEstimator:
-    def __init__(self, model_precision='FP32'):
+    def __init__(self, model_precision='FP32', profile=None):
         model_dir = os.path.join('models', 'weights', 'intel', 'head-pose-estimation-adas-0001', model_precision)
         model_xml = os.path.join(model_dir, 'head-pose-estimation-adas-0001.xml')
         model_bin = os.path.join(model_dir, 'head-pose-estimation-adas-0001.bin')
@@ -16,7 +17,8 @@ class HeadPoseEstimator:
 
         core = Core()
         self.model = core.read_model(model=model_xml)
-        self.compiled_model = core.compile_model(self.model, device_name="CPU")
+        self.profile = get_profile(profile)
+        self.compiled_model = self.profile.compile(core, self.model)
 
         # Extract input and output layer names
         self.input_layer_name = self.model.inputs[0].get_any_name()
@@ -26,15 +28,16 @@ class HeadPoseEstimator:
             "roll": self.model.output("angle_r_fc").get_any_name()
         }
 
+        # Pool of reusable infer requests for submit()/wait()
+        self._free_requests = []
+
         print("Head Pose Estimation model loaded using OpenVINO runtime.")
 
     def predict_angles(self, face_crop):
         if face_crop is None or face_crop.size == 0:
             return 0.0, 0.0, 0.0
 
-        # Resize to 60x60 as required by the model
-        resized_face = cv2.resize(face_crop, (60, 60))
-        input_blob = np.expand_dims(resized_face.transpose(2, 0, 1), axis=0).astype(np.float32)
+        input_blob = self._preprocess(face_crop)
 
         # Inference using input/output **names**
         results = self.compiled_model({self.input_layer_name: input_blob})
@@ -44,3 +47,34 @@ class HeadPoseEstimator:
         roll = float(results[self.output_layer_names["roll"]])
 
         return yaw, pitch, roll
+
+    def submit(self, face_crop):
+        """
+        Starts head-pose inference on an OpenVINO infer request without
+        blocking. Collect the angles with `wait`.
+        """
+        if face_crop is None or face_crop.size == 0:
+            return None
+
+        request = self._free_requests.pop() if self._free_requests else self.compiled_model.create_infer_request()
+        request.start_async({self.input_layer_name: self._preprocess(face_crop)})
+        return request
+
+    def wait(self, handle):
+        """Waits for a request started by `submit` and returns (yaw, pitch, roll)."""
+        if handle is None:
+            return 0.0, 0.0, 0.0
+
+        try:
+            handle.wait()
+            yaw = float(handle.get_tensor(self.output_layer_names["yaw"]).data.item())
+            pitch = float(handle.get_tensor(self.output_layer_names["pitch"]).data.item())
+            roll = float(handle.get_tensor(self.output_layer_names["roll"]).data.item())
+            return yaw, pitch, roll
+        finally:
+            self._free_requests.append(handle)
+
+    def _preprocess(self, face_crop):
+        # Resize to 60x60 as required by the model
+        resized_face = cv2.resize(face_crop, (60, 60))
+        return np.expand_dims(resized_face.transpose(2, 0, 1), axis=0).astype(np.float32)
@@ -2,13 +2,14 @@ import cv2
 import numpy as np
 import os
 from openvino.runtime import Core
+from runtime_profiles import get_profile
 
 class EmotionRecognizer:
     """
     A class to load and perform inference with the emotions-recognition-retail-0003
     OpenVINO model. This version uses manual preprocessing for maximum reliability.
     """
-    def __init__(self, model_xml_path=r'models\weights\intel\emotions-recognition-retail-0003\FP32\emotions-recognition-retail-0003.xml', model_bin_path=r'models\weights\intel\emotions-recognition-retail-0003\FP32\emotions-recognition-retail-0003.bin'):
+    def __init__(self, model_xml_path=r'models\weights\intel\emotions-recognition-retail-0003\FP32\emotions-recognition-retail-0003.xml', model_bin_path=r'models\weights\intel\emotions-recognition-retail-0003\FP32\emotions-recognition-retail-0003.bin', profile=None):
         """
         Initializes the EmotionRecognizer by loading and compiling the OpenVINO model.
         All preprocessing is handled manually in the `infer` method.
@@ -16,6 +17,7 @@ class EmotionRecognizer:
         Args:
             model_xml_path (str): Path to the .xml file of the emotion recognition model.
             model_bin_path (str): Path to the .bin file of the emotion recognition model.
+            profile (str or RuntimeProfile, optional): Runtime profile (see runtime_profiles.py).
         """
         self.emotion_labels = ['neutral', 'happy', 'sad', 'surprise', 'anger']
         # The model requires a specific 64x64 input size
@@ -27,12 +29,16 @@ class EmotionRecognizer:
             # 1. Load the original model from the files
             emotion_model = core.read_model(model=model_xml_path, weights=model_bin_path)
 
-            # 2. Compile the model for the target device (e.g., "CPU")
+            # 2. Compile the model for the target device with the runtime profile's settings
             # We are not using PrePostProcessor or reshaping the model itself.
-            self.compiled_emotion_model = core.compile_model(emotion_model, "CPU")
+            self.profile = get_profile(profile)
+            self.compiled_emotion_model = self.profile.compile(core, emotion_model)
 
             # 3. Get the model's output layer
             self.output_layer = self.compiled_emotion_model.outputs[0]
+
+            # Pool of reusable infer requests for submit()/wait()
+            self._free_requests = []
             
             print("Emotion recognition model loaded successfully (using manual preprocessing).")
             # For debugging, confirm the model's expected input shape
@@ -53,34 +59,97 @@ class EmotionRecognizer:
         Returns:
             tuple[str, float]: A tuple containing the predicted emotion label and its confidence score.
         """
+        emotion, confidence, _ = self.infer_with_probabilities(face_roi)
+        return emotion, confidence
+
+    def infer_with_probabilities(self, face_roi: np.ndarray) -> tuple[str, float, np.ndarray]:
+        """
+        Same as `infer`, but also returns the full probability vector
+        (ordered as `self.emotion_labels`), e.g. for the analysis log.
+
+        Returns:
+            tuple[str, float, np.ndarray]: Label, confidence and per-class probabilities.
+        """
+        empty_probabilities = np.zeros(len(self.emotion_labels), dtype=np.float32)
         if face_roi is None or face_roi.size == 0:
-            return "unknown", 0.0
+            return "unknown", 0.0, empty_probabilities
 
         try:
-            # --- MANUAL PREPROCESSING ---
-            # 1. Resize the image to the model's required input size (64x64).
-            resized_face = cv2.resize(face_roi, (self.input_width, self.input_height))
-
-            # 2. Transpose the image from HWC to CHW format.
-            # OpenCV provides (Height, Width, Channels)
-            # The model requires (Channels, Height, Width)
-            transposed_face = resized_face.transpose(2, 0, 1)
+            input_tensor = self._preprocess(face_roi)
 
-            # 3. Add a batch dimension (N) to create the final NCHW tensor.
-            input_tensor = np.expand_dims(transposed_face, axis=0)
-            
-            # 4. Run inference on the manually preprocessed tensor.
+            # Run inference on the manually preprocessed tensor.
             # The result is a dictionary where the key is the output layer.
             results = self.compiled_emotion_model([input_tensor])[self.output_layer]
-            
-            # --- POST-PROCESSING ---
-            emotion_probabilities = results.flatten()
-            predicted_emotion_idx = np.argmax(emotion_probabilities)
-            predicted_emotion = self.emotion_labels[predicted_emotion_idx]
-            confidence = emotion_probabilities[predicted_emotion_idx]
 
-            return predicted_emotion, confidence
+            return self._postprocess(results)
 
         except Exception as e:
             print(f"Error during emotion inference: {e}")
-            return "error", 0.0
\ No newline at end of file
+            return "error", 0.0, empty_probabilities
+
+    def submit(self, face_roi: np.ndarray):
+        """
+        Starts emotion inference on an OpenVINO infer request without blocking.
+
+        Several submissions (also across models) can be in flight at once;
+        collect each result with `wait`.
+
+        Args:
+            face_roi (np.ndarray): The cropped face region (HWC, BGR).
+
+        Returns:
+            A handle to pass to `wait`.
+        """
+        if face_roi is None or face_roi.size == 0:
+            return None
+
+        try:
+            request = self._free_requests.pop() if self._free_requests else self.compiled_emotion_model.create_infer_request()
+            request.start_async([self._preprocess(face_roi)])
+            return request
+        except Exception as e:
+            print(f"Error submitting emotion inference: {e}")
+            return e
+
+    def wait(self, handle) -> tuple[str, float, np.ndarray]:
+        """
+        Waits for a request started by `submit` and returns the same values
+        as `infer_with_probabilities`.
+        """
+        empty_probabilities = np.zeros(len(self.emotion_labels), dtype=np.float32)
+        if handle is None:
+            return "unknown", 0.0, empty_probabilities
+        if isinstance(handle, Exception):
+            return "error", 0.0, empty_probabilities
+
+        try:
+            handle.wait()
+            return self._postprocess(handle.get_tensor(self.output_layer).data.copy())
+        except Exception as e:
+            print(f"Error during emotion inference: {e}")
+            return "error", 0.0, empty_probabilities
+        finally:
+            # Infer requests are reusable; keep them for the next submission
+            self._free_requests.append(handle)
+
+    def _preprocess(self, face_roi: np.ndarray) -> np.ndarray:
+        """Manual preprocessing of a face crop into the model's NCHW input."""
+        # 1. Resize the image to the model's required input size (64x64).
+        resized_face = cv2.resize(face_roi, (self.input_width, self.input_height))
+
+        # 2. Transpose the image from HWC to CHW format.
+        # OpenCV provides (Height, Width, Channels)
+        # The model requires (Channels, Height, Width)
+        transposed_face = resized_face.transpose(2, 0, 1)
+
+        # 3. Add a batch dimension (N) to create the final NCHW tensor.
+        return np.expand_dims(transposed_face, axis=0)
+
+    def _postprocess(self, results: np.ndarray) -> tuple[str, float, np.ndarray]:
+        """Turns raw model output into (label, confidence, probabilities)."""
+        emotion_probabilities = results.flatten()
+        predicted_emotion_idx = np.argmax(emotion_probabilities)
+        predicted_emotion = self.emotion_labels[predicted_emotion_idx]
+        confidence = emotion_probabilities[predicted_emotion_idx]
+
+        return predicted_emotion, confidence, emotion_probabilities
@@ -1,12 +1,40 @@
 # models/face_tracker.py
 
 from deep_sort_realtime.deepsort_tracker import DeepSort
+from deep_sort_realtime.deep_sort.nn_matching import NearestNeighborDistanceMetric
+from models.appearance_gallery import AppearanceGallery
+from models.association import ltwh_to_ltrb, iou_matrix, unambiguous_matches
+
+
+class RepresentativeGalleryMetric(NearestNeighborDistanceMetric):
+    """
+    Cosine nearest-neighbour metric whose per-track galleries are bounded
+    AppearanceGallery instances (representative samples) instead of FIFO lists.
+    """
+    def __init__(self, matching_threshold, budget):
+        super().__init__("cosine", matching_threshold, budget)
+        self.galleries = {}
+
+    def partial_fit(self, features, targets, active_targets):
+        for feature, target in zip(features, targets):
+            if target not in self.galleries:
+                self.galleries[target] = AppearanceGallery(self.budget)
+            self.galleries[target].add(feature)
+        self.galleries = {k: self.galleries[k] for k in active_targets if k in self.galleries}
+        self.samples = {k: gallery.samples for k, gallery in self.galleries.items()}
+
+    @property
+    def nbytes(self):
+        return sum(gallery.nbytes for gallery in self.galleries.values())
+
 
 class DeepSortFaceTracker:
     """
     A wrapper class for the DeepSORT algorithm to track detected faces.
     """
-    def __init__(self, max_age=30, n_init=3, nms_max_overlap=1.0):
+    def __init__(self, max_age=30, n_init=3, nms_max_overlap=1.0, nn_budget=32,
+                 gallery_retention='representative', embedder="mobilenet", selective_embedding=True,
+                 embedding_refresh_interval=10):
         """
         Initializes the DeepSORT tracker.
 
@@ -14,21 +42,51 @@ class DeepSortFaceTracker:
             max_age (int): The maximum number of consecutive frames a track can be lost for.
             n_init (int): The number of consecutive frames a track must be detected for to be confirmed.
             nms_max_overlap (float): The NMS overlap threshold for the tracker.
+            nn_budget (int, optional): Maximum appearance features kept per track
+                (None keeps every feature, the original unbounded behaviour).
+            gallery_retention (str): 'representative' merges the most similar features
+                when the budget is reached; 'fifo' drops the oldest (DeepSORT's own policy).
+            embedder (str or callable, optional): DeepSORT embedder name, a callable
+                `(frame, raw_detections) -> embeddings`, or None when the caller passes
+                embeddings to `update_tracks`.
+            selective_embedding (bool): Only embed detections whose IoU association is
+                ambiguous (occlusion, crossing) or missing (new faces); clear one-to-one
+                matches reuse their track's latest feature.
+            embedding_refresh_interval (int): Re-embed a track after this many frames of
+                reused features, so its gallery follows slow appearance changes.
         """
+        if gallery_retention not in ('representative', 'fifo'):
+            raise ValueError(f"Unknown gallery retention policy '{gallery_retention}'")
+        max_cosine_distance = 0.3
         self.tracker = DeepSort(
             max_age=max_age,
             n_init=n_init,
             nms_max_overlap=nms_max_overlap,
-            max_cosine_distance=0.3,
-            nn_budget=None,
+            max_cosine_distance=max_cosine_distance,
+            nn_budget=nn_budget,
             override_track_class=None,
-            embedder="mobilenet",
+            embedder=None if embedder is None or callable(embedder) else embedder,
             half=True,
             bgr=True,
         )
+        if nn_budget is not None and gallery_retention == 'representative':
+            self.tracker.tracker.metric = RepresentativeGalleryMetric(max_cosine_distance, nn_budget)
+
+        if callable(embedder):
+            self.embed = embedder
+        elif embedder is not None:
+            self.embed = self.tracker.generate_embeds
+        else:
+            self.embed = None
+        self.selective_embedding = selective_embedding
+        self.embedding_refresh_interval = embedding_refresh_interval
+        self._frames_since_embedding = {}
+        # Detections embedded vs. detections that reused their track's feature
+        self.embeddings_computed = 0
+        self.embeddings_reused = 0
         print("Face Tracker (DeepSORT) initialized successfully.")
 
-    def update_tracks(self, raw_detections, frame):
+    def update_tracks(self, raw_detections, frame, embeds=None):
         """
         Updates the tracker with new detections from a frame.
 
@@ -36,6 +94,7 @@ class DeepSortFaceTracker:
             raw_detections (list): A list of detections from the face detector.
                                    Expected format: [([x, y, w, h], score, class_name), ...]
             frame (np.ndarray): The current video frame (required by DeepSORT for feature extraction).
+            embeds (list, optional): Precomputed appearance embeddings, one per detection.
 
         Returns:
             list: A list of active tracks. Each track is a tuple containing:
@@ -45,8 +104,24 @@ class DeepSortFaceTracker:
         # A list of tuples, where each tuple is ([left, top, w, h], confidence, detection_class).
         # Our YoloV8FaceDetector's output format is already compatible.
         
+        reused_tracks = None
+        if embeds is None and self.embed is not None:
+            if self.selective_embedding:
+                embeds, reused_tracks = self._selective_embeds(raw_detections, frame)
+            else:
+                embeds = self.embed(frame, raw_detections) if raw_detections else []
+                self.embeddings_computed += len(raw_detections)
+
         # Update the tracker with the new detections
-        tracks = self.tracker.update_tracks(raw_detections, frame=frame)
+        tracks = self.tracker.update_tracks(raw_detections, embeds=embeds, frame=frame)
+
+        if reused_tracks is not None:
+            # Tracks updated with a fresh embedding start counting again
+            for track in tracks:
+                if track.time_since_update == 0 and track.track_id not in reused_tracks:
+                    self._frames_since_embedding[track.track_id] = 0
+            for track_id in self.tracker.tracker.del_tracks_ids:
+                self._frames_since_embedding.pop(track_id, None)
         
         tracked_faces = []
         for track in tracks:
@@ -61,4 +136,42 @@ class DeepSortFaceTracker:
             
             tracked_faces.append((track_id, bbox))
             
-        return tracked_faces
\ No newline at end of file
+        return tracked_faces
+
+    def _selective_embeds(self, raw_detections, frame):
+        """
+        Returns one embedding per detection, running the embedder only where
+        IoU alone cannot tell which track a detection belongs to.
+
+        Returns:
+            tuple: (embeddings, ids of the tracks whose feature was reused)
+        """
+        if not raw_detections:
+            return [], set()
+
+        tracks = [t for t in self.tracker.tracker.tracks
+                  if t.is_confirmed() and t.time_since_update <= 1 and t.features]
+        detection_boxes = ltwh_to_ltrb([detection[0] for detection in raw_detections])
+        track_boxes = [t.to_ltrb() for t in tracks]
+        matches = unambiguous_matches(iou_matrix(detection_boxes, track_boxes))
+
+        embeds = [None] * len(raw_detections)
+        reused_tracks = set()
+        for i, track_index in enumerate(matches):
+            if track_index < 0:
+                continue
+            track = tracks[track_index]
+            frames = self._frames_since_embedding.get(track.track_id, 0)
+            if frames >= self.embedding_refresh_interval:
+                continue
+            embeds[i] = track.get_feature()
+            self._frames_since_embedding[track.track_id] = frames + 1
+            reused_tracks.add(track.track_id)
+
+        needed = [i for i, embed in enumerate(embeds) if embed is None]
+        if needed:
+            for i, embed in zip(needed, self.embed(frame, [raw_detections[i] for i in needed])):
+                embeds[i] = embed
+        self.embeddings_computed += len(needed)
+        self.embeddings_reused += len(raw_detections) - len(needed)
+        return embeds, reused_tracks
@@ -0,0 +1,91 @@
+# models/remote.py
+
+import numpy as np
+from models.face_detection import YoloV8FaceDetector
+from models.face_expression import EmotionRecognizer
+from models.face_direction import HeadPoseEstimator
+
+
+class RemoteFaceDetector(YoloV8FaceDetector):
+    """
+    YoloV8FaceDetector that runs the network in the shared inference server
+    (inference_server.py). Pre- and post-processing stay in the camera worker.
+    """
+    def __init__(self, client, conf_threshold=0.45, iou_threshold=0.5):
+        """
+        Args:
+            client (InferenceClient): Connection to the inference server.
+            conf_threshold (float): Confidence threshold for filtering detections.
+            iou_threshold (float): IoU threshold for non-maximum suppression.
+        """
+        self.client = client
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.net = None
+        self.input_height = 640
+        self.input_width = 640
+
+    def _infer(self, input_image):
+        # Same (1, C, N) layout as the local backends
+        return self.client.infer("detector", input_image)["output"][np.newaxis]
+
+
+class RemoteEmotionRecognizer(EmotionRecognizer):
+    """EmotionRecognizer that runs the model in the shared inference server."""
+    def __init__(self, client):
+        """
+        Args:
+            client (InferenceClient): Connection to the inference server.
+        """
+        self.client = client
+        self.emotion_labels = ['neutral', 'happy', 'sad', 'surprise', 'anger']
+        self.input_height = 64
+        self.input_width = 64
+
+    def infer_with_probabilities(self, face_roi: np.ndarray) -> tuple[str, float, np.ndarray]:
+        return self.wait(self.submit(face_roi))
+
+    def submit(self, face_roi: np.ndarray):
+        if face_roi is None or face_roi.size == 0:
+            return None
+        try:
+            return self.client.submit("emotion", self._preprocess(face_roi))
+        except Exception as e:
+            print(f"Error submitting emotion inference: {e}")
+            return e
+
+    def wait(self, handle) -> tuple[str, float, np.ndarray]:
+        empty_probabilities = np.zeros(len(self.emotion_labels), dtype=np.float32)
+        if handle is None:
+            return "unknown", 0.0, empty_probabilities
+        if isinstance(handle, Exception):
+            return "error", 0.0, empty_probabilities
+        try:
+            return self._postprocess(self.client.wait(handle)["probabilities"])
+        except Exception as e:
+            print(f"Error during emotion inference: {e}")
+            return "error", 0.0, empty_probabilities
+
+
+class RemoteHeadPoseEstimator(HeadPoseEstimator):
+    """HeadPoseEstimator that runs the model in the shared inference server."""
+    def __init__(self, client):
+        """
+        Args:
+            client (InferenceClient): Connection to the inference server.
+        """
+        self.client = client
+
+    def predict_angles(self, face_crop):
+        return self.wait(self.submit(face_crop))
+
+    def submit(self, face_crop):
+        if face_crop is None or face_crop.size == 0:
+            return None
+        return self.client.submit("head_pose", self._preprocess(face_crop))
+
+    def wait(self, handle):
+        if handle is None:
+            return 0.0, 0.0, 0.0
+        outputs = self.client.wait(handle)
+        return (float(outputs["yaw"].item()), float(outputs["pitch"].item()), float(outputs["roll"].item()))
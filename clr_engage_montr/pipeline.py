@@ -0,0 +1,209 @@
+# pipeline.py
+
+import cv2
+import time
+from models.face_detection import YoloV8FaceDetector
+from models.face_tracking import DeepSortFaceTracker
+from models.face_expression import EmotionRecognizer
+from models.face_direction import HeadPoseEstimator
+from analysis_log import AnalysisLogWriter
+from engagement import STATUS_LABELS, UNKNOWN, EngagementRules, EngagementStateArrays
+from face_quality import CropQualityGate
+from runtime_profiles import get_profile
+from frame_ring import SharedMemoryCapture
+from preview import PreviewFrame
+
+# Latest results of the pipeline running in this process (served by main.py)
+realtime_data = {
+    "present_ids": [],
+    "engagement": []
+}
+# Latest analysed frame, annotated only when /api/classroom/preview.jpg asks for it
+preview_frame = PreviewFrame()
+
+def close_analysis_log(analysis_log):
+    """Closes an AnalysisLogWriter (if any), reporting a failed final write instead of raising."""
+    if analysis_log is None:
+        return
+    try:
+        analysis_log.close()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+
+def run_video_analysis(video_path, log_dir=None, rules=None, profile=None, publisher=None, capture_process=False,
+                       inference_client=None, scheduler=None, quality_gate=None, tracker=None, on_detections=None):
+    if inference_client is not None:
+        # Models live in the shared inference server (inference_server.py);
+        # this camera only keeps its tracker.
+        from models.remote import RemoteFaceDetector, RemoteEmotionRecognizer, RemoteHeadPoseEstimator
+        print("Initializing tracker (models served by the inference server)...")
+        detector = RemoteFaceDetector(inference_client)
+        emotion_recognizer = RemoteEmotionRecognizer(inference_client)
+        pose_estimator = RemoteHeadPoseEstimator(inference_client)
+    else:
+        profile = get_profile(profile)
+        print(f"Initializing models (runtime profile: {profile.name})...")
+        detector = YoloV8FaceDetector(profile=profile)
+        emotion_recognizer = EmotionRecognizer(profile=profile)
+        pose_estimator = HeadPoseEstimator(profile=profile)
+    tracker = DeepSortFaceTracker(max_age=50, n_init=3) if tracker is None else tracker
+    print("Models loaded.")
+
+    # Thresholds live in EngagementRules so they can be tuned offline with replay.py
+    engagement_state = EngagementStateArrays(rules or EngagementRules())
+
+    # Optional (quality_gate=True or a CropQualityGate; its thresholds are not
+    # calibrated on classroom footage yet): blurred, occluded or extreme-angle
+    # crops skip attribute inference and reuse the track's recent values.
+    quality_gate = CropQualityGate() if quality_gate is True else quality_gate
+    last_attributes = {}  # track id -> (attributes, frame they were inferred on)
+
+    unique_ids = set()
+    PRINT_INTERVAL = 10
+    ATTENDANCE_UPDATE_INTERVAL = 50
+    ATTRIBUTE_REUSE_MAX_FRAMES = 15  # older attributes are not reused for a skipped crop
+
+    # With capture_process, decoding (and RTSP/webcam reconnects) happen in their
+    # own process and frames arrive through a shared-memory ring buffer sized
+    # to the source's resolution.
+    cap = SharedMemoryCapture(video_path) if capture_process else cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Error: Could not open video file {video_path}")
+        return
+
+    # Optional append-only log of every analysed face, for post-session analytics
+    analysis_log = AnalysisLogWriter(log_dir) if log_dir else None
+    if analysis_log:
+        print(f"Logging analysis results to {log_dir}")
+
+    try:
+        frame_num = 0
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                print("End of video or cannot read frame.")
+                break
+
+            # Under a StreamScheduler, frames that arrive before this stream's next
+            # analysis slot are skipped so all cameras share the CPU fairly.
+            if scheduler and not scheduler.should_analyse():
+                continue
+            analysis_start = time.perf_counter()
+
+            frame_num += 1
+            frame_time = time.time()
+            detections = detector.detect(frame)
+            if on_detections:
+                # Raw detector output, e.g. for replay.py's cache
+                on_detections(frame_num, detections)
+            tracked_faces = tracker.update_tracks(detections, frame)
+
+            engagement_output = []
+            preview_faces = []
+
+            # Crop every face first, then launch emotion and head-pose inference for
+            # all of them at once so both models overlap on the CPU.
+            faces = []
+            for track_id, bbox in tracked_faces:
+                x1, y1, x2, y2 = map(int, [
+                    max(0, bbox[0]),
+                    max(0, bbox[1]),
+                    min(frame.shape[1], bbox[2]),
+                    min(frame.shape[0], bbox[3])
+                ])
+
+                face_crop = frame[y1:y2, x1:x2]
+                if face_crop.size == 0 or face_crop.shape[0] < 20 or face_crop.shape[1] < 20:
+                    continue
+
+                if quality_gate and not quality_gate.accept(face_crop):
+                    faces.append((track_id, (x1, y1, x2, y2), None))
+                    continue
+
+                faces.append((track_id, (x1, y1, x2, y2),
+                              (emotion_recognizer.submit(face_crop), pose_estimator.submit(face_crop))))
+
+            results = []
+            unanalysed = []
+            for track_id, bbox, requests in faces:
+                if requests is None:
+                    # Skipped crop: reuse the track's recent attributes, if any
+                    attributes, inferred_at = last_attributes.get(track_id, (None, 0))
+                    if attributes is None or frame_num - inferred_at > ATTRIBUTE_REUSE_MAX_FRAMES:
+                        unanalysed.append((track_id, bbox))
+                        continue
+                else:
+                    emotion_request, pose_request = requests
+                    emotion, _, emotion_probs = emotion_recognizer.wait(emotion_request)
+                    yaw, pitch, roll = pose_estimator.wait(pose_request)
+                    attributes = (emotion.lower(), emotion_probs, yaw, pitch, roll)
+                    last_attributes[track_id] = (attributes, frame_num)
+                results.append((track_id, bbox) + attributes)
+
+            # One vectorized engagement update for every face in the frame
+            statuses = engagement_state.update([r[0] for r in results], [r[2] for r in results],
+                                               [r[4] for r in results], [r[5] for r in results])
+            # Faces without attributes yet still count as present, reported as Unknown (not logged)
+            results += [(track_id, bbox, "unknown", None, None, None, None) for track_id, bbox in unanalysed]
+            statuses = list(statuses) + [UNKNOWN] * len(unanalysed)
+
+            for (track_id, bbox, emotion, emotion_probs, yaw, pitch, roll), status_code in zip(results, statuses):
+                status = STATUS_LABELS[status_code]
+
+                if analysis_log and emotion_probs is not None:
+                    try:
+                        analysis_log.append(frame_num, frame_time, track_id, bbox,
+                                            emotion_probs, yaw, pitch, roll, status)
+                    except RuntimeError as e:
+                        # The log is secondary to live monitoring: stop logging, keep analysing
+                        print(f"Error: {e}. Analysis logging disabled.")
+                        close_analysis_log(analysis_log)
+                        analysis_log = None
+
+                # Attendance
+                if frame_num % ATTENDANCE_UPDATE_INTERVAL == 0:
+                    unique_ids.add(track_id)
+
+                if frame_num % PRINT_INTERVAL == 0:
+                    print(f"[Frame {frame_num}] ID: {track_id}, Emotion: {emotion}, Engagement: {status}")
+
+                preview_faces.append((track_id, bbox, emotion, status))
+                engagement_output.append({
+                    "id": track_id,
+                    "emotion": emotion,
+                    "engagement": status
+                })
+
+            # Ring views of file frames are reused by the capture process; live frames are already copies
+            preview_frame.update(frame, preview_faces, copy=capture_process and not cap.copy_frames)
+
+            if scheduler:
+                scheduler.record(time.perf_counter() - analysis_start)
+
+            if frame_num % PRINT_INTERVAL == 0:
+                realtime_data["present_ids"] = list(unique_ids)
+                realtime_data["engagement"] = engagement_output
+                if scheduler:
+                    realtime_data["fps"] = scheduler.status()
+                if quality_gate:
+                    realtime_data["quality_skip_rate"] = round(quality_gate.skip_rate, 3)
+                if publisher:
+                    publisher.publish(realtime_data)
+
+            if frame_num % ATTENDANCE_UPDATE_INTERVAL == 0:
+                # Forget attributes too old to be reused (tracks that left or stayed blurred)
+                for track_id in [t for t, (_, at) in last_attributes.items() if frame_num - at > ATTRIBUTE_REUSE_MAX_FRAMES]:
+                    del last_attributes[track_id]
+                print(f"[Frame {frame_num}] Attendance: {len(unique_ids)} students")
+                if quality_gate:
+                    print(f"[Frame {frame_num}] Quality gate skipped {quality_gate.skip_rate:.1%} of face crops")
+    finally:
+        # Also on errors: stops the capture process, frees its shared memory and flushes the log
+        cap.release()
+        close_analysis_log(analysis_log)
+    if capture_process:
+        print(f"Frames dropped by the capture ring buffer: {cap.dropped}")
+    if quality_gate:
+        print(f"Quality gate skipped {quality_gate.skipped} of {quality_gate.checked} face crops")
+    print("Video processing complete.")
+    return frame_num
@@ -0,0 +1,112 @@
+# preview.py
+
+import threading
+import time
+import cv2
+
+STATUS_COLORS = {
+    "Engaged": (0, 200, 0),
+    "Disengaged": (0, 0, 230),
+    "Unknown": (160, 160, 160),
+}
+
+
+class PreviewFrame:
+    """
+    Latest analysed frame and its faces, annotated and JPEG-encoded on demand.
+
+    The pipeline only hands over references (`update`), so nothing is drawn or
+    encoded while nobody is watching. A request draws and encodes the latest
+    frame once per frame version; further requests for the same version, and
+    requests arriving less than `min_interval` after the last encode, get the
+    cached JPEG.
+
+    Frames from a SharedMemoryCapture are views into a ring buffer that the
+    capture process keeps overwriting, so while a viewer is active (a request in
+    the last `watch_window` seconds) `update` copies the frame.
+    """
+    def __init__(self, min_interval=0.2, jpeg_quality=80, max_width=960, watch_window=5.0):
+        """
+        Args:
+            min_interval (float): Minimum seconds between two encodes (rate limit).
+            jpeg_quality (int): JPEG quality (0-100).
+            max_width (int): Frames wider than this are downscaled before drawing.
+            watch_window (float): Seconds after a request during which frames are copied.
+        """
+        self.min_interval = min_interval
+        self.jpeg_quality = jpeg_quality
+        self.max_width = max_width
+        self.watch_window = watch_window
+
+        self._lock = threading.Lock()
+        self._frame = None
+        self._faces = []
+        self.version = 0
+        self._last_request = float("-inf")
+
+        self._jpeg = None
+        self._jpeg_version = 0
+        self._last_encode = float("-inf")
+        self.encodes = 0
+
+    def update(self, frame, faces, copy=False):
+        """
+        Records the latest analysed frame. Called by the pipeline for every frame.
+
+        Args:
+            frame (np.ndarray): The BGR frame.
+            faces (list): (track_id, (x1, y1, x2, y2), emotion, status) per face.
+            copy (bool): The frame buffer will be reused (shared-memory capture);
+                copy it while a viewer is active.
+        """
+        if copy and time.monotonic() - self._last_request < self.watch_window:
+            frame = frame.copy()
+        with self._lock:
+            self._frame = frame
+            self._faces = faces
+            self.version += 1
+
+    def jpeg(self, now=None):
+        """
+        Returns the annotated latest frame.
+
+        Returns:
+            tuple: (JPEG bytes, frame version), or (None, 0) before the first frame.
+        """
+        now = time.monotonic() if now is None else now
+        self._last_request = now
+        with self._lock:
+            if self._frame is None:
+                return None, 0
+            fresh = self._jpeg_version == self.version
+            limited = now - self._last_encode < self.min_interval
+            if self._jpeg is not None and (fresh or limited):
+                return self._jpeg, self._jpeg_version
+            frame, faces, version = self._frame, self._faces, self.version
+
+        # Draw and encode outside the lock so the pipeline is never blocked
+        ok, encoded = cv2.imencode(".jpg", self.annotate(frame, faces),
+                                   [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return self._jpeg, self._jpeg_version
+        with self._lock:
+            self._jpeg, self._jpeg_version = encoded.tobytes(), version
+            self._last_encode = now
+            self.encodes += 1
+            return self._jpeg, self._jpeg_version
+
+    def annotate(self, frame, faces):
+        """Draws the face boxes and labels on a (downscaled) copy of the frame."""
+        scale = min(1.0, self.max_width / frame.shape[1])
+        if scale < 1.0:
+            image = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            image = frame.copy()
+
+        for track_id, bbox, emotion, status in faces:
+            x1, y1, x2, y2 = (int(v * scale) for v in bbox)
+            color = STATUS_COLORS.get(status, STATUS_COLORS["Unknown"])
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(image, f"{track_id} {emotion} {status}", (x1, max(12, y1 - 6)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1, cv2.LINE_AA)
+        return image
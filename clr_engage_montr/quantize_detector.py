@@ -0,0 +1,265 @@
+# quantize_detector.py
+
+"""
+Offline INT8 quantization of the YOLOv8 face detector.
+
+The detector is the most expensive model per frame. This tool converts the
+FP32 ONNX model to an INT8 OpenVINO IR with NNCF post-training quantization,
+calibrated on frames from our own classrooms, and reports how much accuracy
+the INT8 model gives up on a labeled set.
+
+Usage:
+    python quantize_detector.py quantize --calibration calib/ [--subset-size 300]
+    python quantize_detector.py evaluate --images eval/images --labels eval/labels
+    DETECTOR_MODEL=models/weights/yolov8n-face-int8.xml python main.py
+
+Calibration sources are directories of images and/or video files (every
+`--video-stride`-th frame is used). Labels are YOLO-format text files, one per
+image with the same stem: `class xc yc w h` normalized to [0, 1] (extra
+keypoint columns are ignored). Without labels, the FP32 detections are used
+as the reference, which measures agreement rather than accuracy.
+
+Requires `nncf` and `openvino` (only for this tool and the INT8 runtime).
+"""
+
+import argparse
+import os
+import time
+import cv2
+import numpy as np
+from models.association import iou_matrix, ltwh_to_ltrb
+from models.face_detection import DEFAULT_MODEL_PATH, YoloV8FaceDetector
+
+INT8_MODEL_PATH = os.path.join('models', 'weights', 'yolov8n-face-int8.xml')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+
+def iter_frames(sources, video_stride=30):
+    """
+    Yields (name, BGR frame) from image files, video files and directories of either.
+
+    Args:
+        sources (list): Paths to images, videos or directories.
+        video_stride (int): Use every n-th frame of a video.
+    """
+    for source in sources:
+        if os.path.isdir(source):
+            paths = [os.path.join(source, name) for name in sorted(os.listdir(source))]
+        else:
+            paths = [source]
+        for path in paths:
+            extension = os.path.splitext(path)[1].lower()
+            if extension in IMAGE_EXTENSIONS:
+                frame = cv2.imread(path)
+                if frame is not None:
+                    yield path, frame
+            elif extension in VIDEO_EXTENSIONS:
+                cap = cv2.VideoCapture(path)
+                index = 0
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    if index % video_stride == 0:
+                        yield f"{path}#{index}", frame
+                    index += 1
+                cap.release()
+
+
+def quantize(calibration_sources, model_path=DEFAULT_MODEL_PATH, output_path=INT8_MODEL_PATH,
+             subset_size=300, video_stride=30):
+    """
+    Quantizes the detector to INT8 and saves it as OpenVINO IR.
+
+    The calibration frames go through the detector's own letterbox
+    preprocessing, so the activation ranges match what it sees at runtime.
+    The box-decoding tail of the graph (Multiply/Subtract/Sigmoid) stays in
+    floating point: quantizing it costs box precision for almost no speed.
+
+    Returns:
+        str: Path of the saved .xml model.
+    """
+    import nncf
+    import openvino as ov
+
+    # cv2.dnn backend: only the preprocessing is used here
+    detector = YoloV8FaceDetector(model_path, profile='default')
+    blobs = []
+    for _, frame in iter_frames(calibration_sources, video_stride):
+        blobs.append(detector._format_image(frame)[0])
+        if len(blobs) >= subset_size:
+            break
+    if not blobs:
+        raise ValueError(f"No calibration frames found in {calibration_sources}")
+    print(f"Calibrating on {len(blobs)} frames...")
+
+    model = ov.Core().read_model(model_path)
+    quantized = nncf.quantize(
+        model,
+        nncf.Dataset(blobs),
+        preset=nncf.QuantizationPreset.MIXED,
+        subset_size=len(blobs),
+        ignored_scope=nncf.IgnoredScope(types=["Multiply", "Subtract", "Sigmoid"]),
+    )
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    ov.save_model(quantized, output_path, compress_to_fp16=False)
+    print(f"INT8 detector saved to {output_path}")
+    return output_path
+
+
+def parse_yolo_labels(text, image_width, image_height):
+    """
+    Parses YOLO-format labels into pixel [left, top, width, height] boxes.
+
+    Returns:
+        np.ndarray: (N, 4) array.
+    """
+    boxes = []
+    for line in text.splitlines():
+        values = line.split()
+        if len(values) < 5:
+            continue
+        xc, yc, w, h = (float(v) for v in values[1:5])
+        boxes.append([(xc - w / 2) * image_width, (yc - h / 2) * image_height, w * image_width, h * image_height])
+    return np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+
+def match_detections(predicted, truth, iou_threshold=0.5):
+    """
+    Greedily matches predicted boxes to ground-truth boxes by IoU.
+
+    Args:
+        predicted (np.ndarray): (P, 4) [left, top, width, height] boxes, highest confidence first.
+        truth (np.ndarray): (T, 4) [left, top, width, height] boxes.
+        iou_threshold (float): Minimum IoU for a true positive.
+
+    Returns:
+        tuple: (true_positives, false_positives, false_negatives, list of matched IoUs)
+    """
+    predicted = np.asarray(predicted, dtype=np.float64).reshape(-1, 4)
+    truth = np.asarray(truth, dtype=np.float64).reshape(-1, 4)
+    iou = iou_matrix(ltwh_to_ltrb(predicted), ltwh_to_ltrb(truth))
+
+    matched_truth = set()
+    ious = []
+    for p in range(len(predicted)):
+        candidates = [(iou[p, t], t) for t in range(len(truth)) if t not in matched_truth]
+        if not candidates:
+            break
+        best_iou, best = max(candidates)
+        if best_iou >= iou_threshold:
+            matched_truth.add(best)
+            ious.append(float(best_iou))
+
+    tp = len(ious)
+    return tp, len(predicted) - tp, len(truth) - tp, ious
+
+
+def detection_metrics(totals):
+    """Precision, recall, F1 and mean IoU from accumulated (tp, fp, fn, ious)."""
+    tp, fp, fn, ious = totals
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+    }
+
+
+def _detect_boxes(detector, frame, latencies):
+    start = time.perf_counter()
+    detections = detector.detect(frame)
+    latencies.append(time.perf_counter() - start)
+    detections = sorted(detections, key=lambda d: d[1], reverse=True)
+    return np.asarray([d[0] for d in detections], dtype=np.float64).reshape(-1, 4)
+
+
+def evaluate(image_sources, labels_dir=None, fp32_path=DEFAULT_MODEL_PATH, int8_path=INT8_MODEL_PATH,
+             iou_threshold=0.5, profile=None):
+    """
+    Compares the FP32 and INT8 detectors on a labeled set.
+
+    Both models run on OpenVINO with the same profile, so the deltas come from
+    the precision alone and not from cv2.dnn vs OpenVINO. With `labels_dir`,
+    frames without a label file are skipped.
+
+    Returns:
+        dict: {"fp32": metrics, "int8": metrics, "delta": int8 - fp32, "frames": n}
+    """
+    models = {
+        "fp32": YoloV8FaceDetector(fp32_path, profile=profile, backend='openvino'),
+        "int8": YoloV8FaceDetector(int8_path, profile=profile, backend='openvino'),
+    }
+    totals = {name: [0, 0, 0, []] for name in models}
+    latencies = {name: [] for name in models}
+    frames = 0
+
+    for path, frame in iter_frames(image_sources):
+        if labels_dir:
+            label_path = os.path.join(labels_dir, os.path.splitext(os.path.basename(path))[0] + '.txt')
+            if not os.path.exists(label_path):
+                continue
+            with open(label_path) as f:
+                truth = parse_yolo_labels(f.read(), frame.shape[1], frame.shape[0])
+
+        boxes = {name: _detect_boxes(detector, frame, latencies[name]) for name, detector in models.items()}
+        if not labels_dir:
+            truth = boxes["fp32"]
+
+        for name in models:
+            tp, fp, fn, ious = match_detections(boxes[name], truth, iou_threshold)
+            totals[name][0] += tp
+            totals[name][1] += fp
+            totals[name][2] += fn
+            totals[name][3].extend(ious)
+        frames += 1
+
+    results = {"frames": frames}
+    for name in models:
+        results[name] = detection_metrics(totals[name])
+        results[name]["latency_p50_ms"] = float(np.median(latencies[name]) * 1000.0) if latencies[name] else 0.0
+    results["delta"] = {key: results["int8"][key] - results["fp32"][key] for key in results["fp32"]}
+    return results
+
+
+def print_report(results):
+    print(f"\nDetector accuracy on {results['frames']} frames")
+    print(f"{'':<8}{'precision':>10}{'recall':>10}{'f1':>10}{'mean IoU':>10}{'p50 ms':>10}")
+    for name in ("fp32", "int8", "delta"):
+        r = results[name]
+        print(f"{name:<8}{r['precision']:>10.3f}{r['recall']:>10.3f}{r['f1']:>10.3f}"
+              f"{r['mean_iou']:>10.3f}{r['latency_p50_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 quantization of the YOLOv8 face detector")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    q = subparsers.add_parser("quantize", help="Quantize the detector with a calibration set")
+    q.add_argument("--calibration", nargs="+", required=True, help="Calibration images, videos or directories")
+    q.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    q.add_argument("--output", default=INT8_MODEL_PATH)
+    q.add_argument("--subset-size", type=int, default=300)
+    q.add_argument("--video-stride", type=int, default=30)
+
+    e = subparsers.add_parser("evaluate", help="Compare FP32 and INT8 accuracy")
+    e.add_argument("--images", nargs="+", required=True, help="Evaluation images or directories")
+    e.add_argument("--labels", default=None, help="Directory of YOLO-format label files")
+    e.add_argument("--fp32", default=DEFAULT_MODEL_PATH)
+    e.add_argument("--int8", default=INT8_MODEL_PATH)
+    e.add_argument("--iou-threshold", type=float, default=0.5)
+    e.add_argument("--profile", default=None)
+
+    args = parser.parse_args()
+    if args.command == "quantize":
+        quantize(args.calibration, args.model, args.output, args.subset_size, args.video_stride)
+    else:
+        print_report(evaluate(args.images, args.labels, args.fp32, args.int8, args.iou_threshold, args.profile))
+
+
+if __name__ == "__main__":
+    main()
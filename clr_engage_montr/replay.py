@@ -0,0 +1,312 @@
+# replay.py
+
+"""
+Inference replay for engagement threshold tuning.
+
+`record` runs the DNN pipeline (detector, tracker, emotion and head-pose
+models) over a video once and caches the raw outputs, keyed by the video's
+content hash and the model weight versions. `replay` then re-runs only the
+engagement state machine over that cache, vectorised with NumPy, so parameter
+sweeps and A/B comparisons of EngagementRules take microseconds per run instead
+of re-running inference.
+
+Usage:
+    python replay.py record lecture.mp4
+    python replay.py sweep lecture.mp4 --yaw 25 33 40 --pitch 18 23 --frames 4 6 10
+"""
+
+import os
+import argparse
+import hashlib
+import itertools
+import tempfile
+import time
+import numpy as np
+from analysis_log import AnalysisLogReader
+from engagement import EMOTION_LABELS, STATUS_LABELS, UNKNOWN, ENGAGED, DISENGAGED, EngagementRules
+
+
+DEFAULT_CACHE_DIR = 'replay_cache'
+
+# Weight files whose contents identify the "model version" part of the cache key
+DETECTOR_MODEL = os.getenv("DETECTOR_MODEL") or os.path.join('models', 'weights', 'yolov8n-face.onnx')
+MODEL_FILES = [
+    DETECTOR_MODEL,
+    os.path.join('models', 'weights', 'intel', 'emotions-recognition-retail-0003', 'FP32', 'emotions-recognition-retail-0003.xml'),
+    os.path.join('models', 'weights', 'intel', 'emotions-recognition-retail-0003', 'FP32', 'emotions-recognition-retail-0003.bin'),
+    os.path.join('models', 'weights', 'intel', 'head-pose-estimation-adas-0001', 'FP32', 'head-pose-estimation-adas-0001.xml'),
+    os.path.join('models', 'weights', 'intel', 'head-pose-estimation-adas-0001', 'FP32', 'head-pose-estimation-adas-0001.bin'),
+]
+if DETECTOR_MODEL.endswith('.xml'):
+    MODEL_FILES.append(os.path.splitext(DETECTOR_MODEL)[0] + '.bin')
+
+OBSERVATION_DTYPE = np.dtype([
+    ('frame', np.int32),
+    ('track_id', np.int64),
+    ('bbox', np.int32, (4,)),
+    ('analysed', np.bool_),       # False when the crop was not analysed (older caches)
+    ('emotion', np.int8),         # index into EMOTION_LABELS, -1 if unknown
+    ('emotion_probs', np.float32, (len(EMOTION_LABELS),)),
+    ('yaw', np.float32),
+    ('pitch', np.float32),
+    ('roll', np.float32),
+])
+
+DETECTION_DTYPE = np.dtype([
+    ('frame', np.int32),
+    ('box', np.int32, (4,)),      # x, y, w, h as produced by YoloV8FaceDetector
+    ('score', np.float32),
+])
+
+
+def file_digest(path, block_size=1 << 20):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def model_version_key(model_files=MODEL_FILES):
+    """Combines the digests of the model weight files into one short key."""
+    digest = hashlib.sha256()
+    for path in model_files:
+        digest.update(path.encode())
+        digest.update((file_digest(path) if os.path.exists(path) else 'missing').encode())
+    return digest.hexdigest()[:16]
+
+
+class ReplayRecord:
+    """Cached raw pipeline outputs for one video."""
+    def __init__(self, observations, detections, video_hash='', model_key=''):
+        self.observations = observations
+        self.detections = detections
+        self.video_hash = video_hash
+        self.model_key = model_key
+
+        # Pre-sort analysed observations by track (stable, so frame order is kept
+        # within a track); every replay reuses this ordering.
+        self.analysed = observations[observations['analysed']]
+        analysed = self.analysed
+        self._order = np.argsort(analysed['track_id'], kind='stable')
+        self._sorted = analysed[self._order]
+        track_ids = self._sorted['track_id']
+        self._group_start = np.ones(len(track_ids), dtype=bool)
+        self._group_start[1:] = track_ids[1:] != track_ids[:-1]
+        self._abs_yaw = np.abs(self._sorted['yaw'])
+        self._abs_pitch = np.abs(self._sorted['pitch'])
+
+
+class ReplayCache:
+    """Directory of .npz replay records keyed by video hash and model versions."""
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, video_hash, model_key):
+        return os.path.join(self.cache_dir, f"{video_hash[:32]}_{model_key}.npz")
+
+    def load(self, video_hash, model_key):
+        path = self.path_for(video_hash, model_key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return ReplayRecord(data['observations'], data['detections'], video_hash, model_key)
+
+    def save(self, record):
+        path = self.path_for(record.video_hash, record.model_key)
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, observations=record.observations, detections=record.detections)
+        os.replace(tmp_path, path)
+        return path
+
+
+def record_from_log(log_dir, detections, video_hash='', model_key=''):
+    """
+    Builds a replay record from an analysis log written by the pipeline.
+
+    Args:
+        log_dir (str): AnalysisLogWriter directory of one run.
+        detections (list): (frame, box, score) tuples from the detector.
+
+    Returns:
+        ReplayRecord: Every logged face as an analysed observation.
+    """
+    rows = AnalysisLogReader(log_dir).read_all()
+    observations = np.zeros(len(rows), dtype=OBSERVATION_DTYPE)
+    for field in ('frame', 'track_id', 'bbox', 'emotion_probs', 'yaw', 'pitch', 'roll'):
+        observations[field] = rows[field]
+
+    # Every logged face fed the engagement state; its emotion is the most likely
+    # class, and failed inference is logged with all-zero probabilities.
+    observations['analysed'] = True
+    probs = observations['emotion_probs']
+    observations['emotion'] = np.where(probs.any(axis=1), probs.argmax(axis=1), -1)
+    return ReplayRecord(observations, np.array(detections, dtype=DETECTION_DTYPE), video_hash, model_key)
+
+
+def record(video_path, cache=None, force=False, **options):
+    """
+    Runs the full inference pipeline over a video and caches its raw outputs.
+
+    Args:
+        video_path (str): Path to the recorded video.
+        cache (ReplayCache, optional): Cache to use (defaults to ./replay_cache).
+        force (bool): Re-run inference even when a cached record exists.
+        **options: Passed to `pipeline.run_video_analysis` (e.g. profile, quality_gate).
+
+    Returns:
+        ReplayRecord: The cached (or freshly recorded) outputs.
+    """
+    cache = cache or ReplayCache()
+    video_hash = file_digest(video_path)
+    model_key = model_version_key()
+    if options:
+        # Pipeline options change the outputs too
+        model_key += '-' + hashlib.sha256(repr(sorted(options.items())).encode()).hexdigest()[:8]
+    if not force:
+        cached = cache.load(video_hash, model_key)
+        if cached is not None:
+            print(f"Replay cache hit for {video_path}")
+            return cached
+
+    from pipeline import run_video_analysis
+
+    detections = []
+
+    def keep_detections(frame_num, frame_detections):
+        detections.extend((frame_num, box, score) for box, score, _ in frame_detections)
+
+    # Record through the live analysis loop (same crop, quality gate and skip
+    # rules); the analysed faces come back through its analysis log.
+    with tempfile.TemporaryDirectory(prefix='replay_') as log_dir:
+        frame_num = run_video_analysis(video_path, log_dir=log_dir, on_detections=keep_detections, **options)
+        if frame_num is None:
+            raise FileNotFoundError(f"Could not open video file {video_path}")
+        result = record_from_log(log_dir, detections, video_hash, model_key)
+    path = cache.save(result)
+    print(f"Recorded {frame_num} frames, {len(result.observations)} observations to {path}")
+    return result
+
+
+def replay(rec, rules=None):
+    """
+    Re-runs the engagement state machine over a cached record.
+
+    Produces exactly the statuses EngagementStateMachine would produce if fed
+    the analysed observations in frame order.
+
+    Args:
+        rec (ReplayRecord): Cached pipeline outputs.
+        rules (EngagementRules, optional): Thresholds to evaluate.
+
+    Returns:
+        np.ndarray: Status code (see STATUS_LABELS) per analysed observation, in
+                    the original frame order.
+    """
+    rules = rules or EngagementRules()
+    n = len(rec._sorted)
+    if n == 0:
+        return np.empty(0, dtype=np.uint8)
+
+    # Index EMOTION_LABELS with the trailing entry standing in for "unknown" (-1)
+    emotion_table = np.array([label in rules.disengaged_emotions for label in EMOTION_LABELS] + [False])
+    flagged = ((rec._abs_yaw > rules.yaw_threshold)
+               | (rec._abs_pitch > rules.pitch_threshold)
+               | emotion_table[rec._sorted['emotion']])
+
+    # Length of the current run of flagged observations, reset at every unflagged
+    # observation and at every track boundary.
+    idx = np.arange(n)
+    group_start = rec._group_start
+    reset_at = np.where(flagged, -1, idx)
+    reset_at[group_start] = np.where(flagged[group_start], idx[group_start] - 1, idx[group_start])
+    run_length = np.where(flagged, idx - np.maximum.accumulate(reset_at), 0)
+
+    # A flagged face keeps its previous status until the run is long enough,
+    # which is Engaged if it was ever unflagged before, Unknown otherwise.
+    unflagged_seen = np.cumsum(~flagged)
+    start_positions = np.maximum.accumulate(np.where(group_start, idx, 0))
+    seen_before_group = np.where(start_positions > 0, unflagged_seen[start_positions - 1], 0)
+    ever_engaged = (unflagged_seen - seen_before_group) > 0
+
+    status = np.where(ever_engaged, ENGAGED, UNKNOWN).astype(np.uint8)
+    status[run_length > rules.dissociation_frame_threshold] = DISENGAGED
+
+    out = np.empty(n, dtype=np.uint8)
+    out[rec._order] = status
+    return out
+
+
+def summarize(rec, status):
+    """Aggregate metrics for one replay result."""
+    total = len(status)
+    frames = rec.analysed['frame']
+    disengaged = status == DISENGAGED
+    frames_with_disengaged = len(np.unique(frames[disengaged])) if total else 0
+    return {
+        "observations": int(total),
+        "engaged_ratio": float(np.mean(status == ENGAGED)) if total else 0.0,
+        "disengaged_ratio": float(np.mean(disengaged)) if total else 0.0,
+        "frames_with_disengaged": int(frames_with_disengaged),
+    }
+
+
+def sweep(rec, dissociation_frame_thresholds=(6,), yaw_thresholds=(33,), pitch_thresholds=(23,),
+          disengaged_emotion_sets=(('surprise', 'sad', 'anger'),)):
+    """
+    Evaluates every combination of the given thresholds.
+
+    Returns:
+        list: (EngagementRules, summary dict) tuples.
+    """
+    results = []
+    for frames, yaw, pitch, emotions in itertools.product(
+            dissociation_frame_thresholds, yaw_thresholds, pitch_thresholds, disengaged_emotion_sets):
+        rules = EngagementRules(frames, yaw, pitch, emotions)
+        results.append((rules, summarize(rec, replay(rec, rules))))
+    return results
+
+
+def compare(rec, rules_a, rules_b):
+    """
+    A/B comparison of two rule sets over the same cached record.
+
+    Returns:
+        dict: Agreement ratio and how many observations changed status.
+    """
+    status_a = replay(rec, rules_a)
+    status_b = replay(rec, rules_b)
+    changed = status_a != status_b
+    return {
+        "agreement": float(1.0 - np.mean(changed)) if len(changed) else 1.0,
+        "changed": int(np.sum(changed)),
+        "a": summarize(rec, status_a),
+        "b": summarize(rec, status_b),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay engagement inference")
+    parser.add_argument('command', choices=['record', 'sweep'])
+    parser.add_argument('video', help='Path to the recorded video')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--force', action='store_true', help='Re-run inference even if cached')
+    parser.add_argument('--frames', type=int, nargs='+', default=[6], help='DISSOCIATION_FRAME_THRESHOLD values')
+    parser.add_argument('--yaw', type=float, nargs='+', default=[33], help='YAW_THRESHOLD values')
+    parser.add_argument('--pitch', type=float, nargs='+', default=[23], help='PITCH_THRESHOLD values')
+    args = parser.parse_args()
+
+    rec = record(args.video, ReplayCache(args.cache_dir), force=args.force)
+    if args.command == 'sweep':
+        start = time.perf_counter()
+        results = sweep(rec, args.frames, args.yaw, args.pitch)
+        elapsed = time.perf_counter() - start
+        for rules, summary in results:
+            print(f"{rules.as_dict()} -> {summary}")
+        print(f"{len(results)} replays in {elapsed:.3f}s ({len(results) / max(elapsed, 1e-9):.0f} replays/s)")
+
+
+if __name__ == "__main__":
+    main()
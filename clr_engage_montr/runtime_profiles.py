@@ -0,0 +1,89 @@
+# runtime_profiles.py
+
+import os
+
+
+class RuntimeProfile:
+    """
+    Named set of OpenVINO runtime settings shared by every inference engine
+    (face detector, emotion and head-pose models), so one switch changes all
+    of them consistently.
+    """
+    def __init__(self, name, description, performance_hint=None, num_streams=None,
+                 inference_threads=None, cpu_pinning=None, device='CPU', detector_backend='openvino'):
+        """
+        Args:
+            name (str): Profile name used in configuration.
+            description (str): Short human-readable summary.
+            performance_hint (str): OpenVINO PERFORMANCE_HINT ('LATENCY' or 'THROUGHPUT').
+            num_streams (int or str): NUM_STREAMS; an int or 'AUTO'.
+            inference_threads (int): INFERENCE_NUM_THREADS; 0 lets OpenVINO decide.
+            cpu_pinning (bool): ENABLE_CPU_PINNING.
+            device (str): OpenVINO device name.
+            detector_backend (str): 'openvino' or 'opencv' (cv2.dnn) for the YOLOv8 detector.
+        """
+        self.name = name
+        self.description = description
+        self.performance_hint = performance_hint
+        self.num_streams = num_streams
+        self.inference_threads = inference_threads
+        self.cpu_pinning = cpu_pinning
+        self.device = device
+        self.detector_backend = detector_backend
+
+    def ov_config(self):
+        """Returns the config dict passed to `Core.compile_model`."""
+        config = {}
+        if self.performance_hint is not None:
+            config["PERFORMANCE_HINT"] = self.performance_hint
+        if self.num_streams is not None:
+            config["NUM_STREAMS"] = str(self.num_streams)
+        if self.inference_threads is not None:
+            config["INFERENCE_NUM_THREADS"] = int(self.inference_threads)
+        if self.cpu_pinning is not None:
+            config["ENABLE_CPU_PINNING"] = bool(self.cpu_pinning)
+        return config
+
+    def compile(self, core, model):
+        """Compiles `model` on this profile's device with this profile's settings."""
+        return core.compile_model(model, self.device, self.ov_config())
+
+    def __repr__(self):
+        return f"RuntimeProfile({self.name!r}, {self.ov_config()})"
+
+
+PROFILES = {
+    # OpenVINO defaults and cv2.dnn for the detector: the original behaviour
+    "default": RuntimeProfile(
+        "default", "Library defaults (original behaviour)", detector_backend='opencv'),
+    # One live camera: answer every frame as fast as possible
+    "latency": RuntimeProfile(
+        "latency", "Single live camera, minimal per-frame latency",
+        performance_hint="LATENCY", num_streams=1, inference_threads=0, cpu_pinning=True),
+    # Offline video or several cameras: keep every core busy
+    "throughput": RuntimeProfile(
+        "throughput", "Offline batch / many streams, maximum frames per second",
+        performance_hint="THROUGHPUT", num_streams="AUTO", inference_threads=0, cpu_pinning=False),
+}
+
+PROFILE_ENV_VAR = "INFERENCE_PROFILE"
+
+
+def get_profile(profile=None):
+    """
+    Resolves a profile.
+
+    Args:
+        profile (str or RuntimeProfile, optional): A profile or its name. When
+            omitted, the INFERENCE_PROFILE environment variable is used, falling
+            back to "default".
+
+    Returns:
+        RuntimeProfile: The resolved profile.
+    """
+    if isinstance(profile, RuntimeProfile):
+        return profile
+    name = profile or os.getenv(PROFILE_ENV_VAR) or "default"
+    if name not in PROFILES:
+        raise ValueError(f"Unknown runtime profile '{name}'. Available: {', '.join(PROFILES)}")
+    return PROFILES[name]
@@ -0,0 +1,157 @@
+# shared_state.py
+
+import os
+import json
+import mmap
+import struct
+import tempfile
+import time
+
+# Header: magic, layout version, sequence number, payload length, publish time.
+# The sequence number works as a seqlock: it is odd while a write is in
+# progress, so readers retry instead of returning a torn snapshot.
+HEADER = struct.Struct('<4sIQId')
+HEADER_SIZE = 32
+MAGIC = b'EDUS'
+LAYOUT_VERSION = 1
+DEFAULT_CAPACITY = 1 << 20  # 1 MiB of JSON is far more than one classroom needs
+
+
+def default_snapshot_path(stream=None):
+    """
+    Memory-mapped snapshot file, on tmpfs when the platform has one.
+
+    Args:
+        stream (str, optional): Camera stream name when several cameras publish
+            side by side (see inference_server.py); each gets its own file.
+    """
+    path = os.getenv("ENGAGEMENT_SHM_PATH")
+    if not path:
+        base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+        path = os.path.join(base, 'edutrack_engagement.shm')
+    if stream:
+        root, ext = os.path.splitext(path)
+        path = f"{root}_{stream}{ext}"
+    return path
+
+
+class SnapshotPublisher:
+    """
+    Publishes JSON snapshots of the analysis state into a memory-mapped file.
+
+    Only the single analysis process writes; any number of API worker
+    processes read the latest snapshot with SnapshotReader without locks.
+    """
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            path (str, optional): Snapshot file (see default_snapshot_path).
+            capacity (int): Maximum size in bytes of one encoded snapshot.
+        """
+        self.path = path or default_snapshot_path()
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity
+
+        self._file = open(self.path, 'a+b')
+        # Only ever grow the file: readers may still have it mapped at its old
+        # size, and touching pages cut off by a truncate raises SIGBUS.
+        if os.path.getsize(self.path) < size:
+            self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+
+        magic, version, seq, _, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic == MAGIC and version == LAYOUT_VERSION:
+            # Continue the existing sequence so readers never see it go backwards
+            # (and keep serving the last snapshot until the first publish)
+            self._seq = seq + (seq & 1)
+        else:
+            self._seq = 0
+            HEADER.pack_into(self._mmap, 0, MAGIC, LAYOUT_VERSION, 0, 0, 0.0)
+
+    def publish(self, state):
+        """
+        Writes a new snapshot.
+
+        Args:
+            state (dict): JSON-serialisable state, e.g. `realtime_data`.
+        """
+        payload = json.dumps(state, default=str).encode('utf-8')
+        if len(payload) > self.capacity:
+            raise ValueError(f"Snapshot of {len(payload)} bytes exceeds capacity of {self.capacity} bytes")
+
+        self._seq += 1  # odd: write in progress
+        HEADER.pack_into(self._mmap, 0, MAGIC, LAYOUT_VERSION, self._seq, 0, 0.0)
+        self._mmap[HEADER_SIZE:HEADER_SIZE + len(payload)] = payload
+        self._seq += 1  # even: snapshot complete
+        HEADER.pack_into(self._mmap, 0, MAGIC, LAYOUT_VERSION, self._seq, len(payload), time.time())
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+class SnapshotReader:
+    """
+    Reads the latest snapshot written by SnapshotPublisher.
+
+    The file is opened lazily, so API workers can start before the analysis
+    process has published anything.
+    """
+    def __init__(self, path=None, max_retries=100):
+        self.path = path or default_snapshot_path()
+        self.max_retries = max_retries
+        self._mmap = None
+        self._last_seq = None
+        self._last_state = None
+        self._last_published_at = 0.0
+
+    def _open(self):
+        if self._mmap is not None:
+            return True
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= HEADER_SIZE:
+            return False
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return True
+
+    def read(self, default=None):
+        """
+        Returns the latest complete snapshot, or `default` if none exists yet.
+        Decoded snapshots are cached until the sequence number changes.
+        """
+        if not self._open():
+            return default
+
+        for _ in range(self.max_retries):
+            magic, version, seq, length, published_at = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != LAYOUT_VERSION or seq == 0:
+                return default
+            if seq & 1:
+                continue  # writer is mid-update
+            if length == 0:
+                return default
+            if seq == self._last_seq:
+                return self._last_state
+            if HEADER_SIZE + length > len(self._mmap):
+                # Publisher was restarted with a larger capacity
+                self.close()
+                return self.read(default)
+            payload = self._mmap[HEADER_SIZE:HEADER_SIZE + length]
+            if HEADER.unpack_from(self._mmap, 0)[2] != seq:
+                continue  # overwritten while copying
+            self._last_seq = seq
+            self._last_state = json.loads(payload)
+            self._last_published_at = published_at
+            return self._last_state
+
+        # Writer kept us busy; serve the previous snapshot rather than block
+        return self._last_state if self._last_state is not None else default
+
+    def age(self):
+        """Seconds since the snapshot last returned by `read` was published."""
+        return time.time() - self._last_published_at if self._last_published_at else None
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
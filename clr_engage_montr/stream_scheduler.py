@@ -0,0 +1,223 @@
+# stream_scheduler.py
+
+"""
+Fair processing-time budget across camera streams on one machine.
+
+Budgets are in wall-clock seconds of analysis per second (1.0 = one stream
+analysing back to back). Costs are measured as wall time rather than CPU
+time because most of a frame's work happens outside the camera process
+(inference server, OpenVINO worker threads), where CPU time would miss it.
+The default total budget of one second per core assumes analysis keeps
+roughly one core busy while it runs.
+
+Every stream has a target analysis FPS and, optionally, its own budget.
+Each stream measures how long one analysed frame takes and shares it
+through a small table in shared memory; from that table every stream
+computes the same allocation:
+
+    wanted_i  = min(target_i, own_budget_i / cost_i)
+    scale     = min(1, global_budget / sum(wanted_i * cost_i))
+    allowed_i = wanted_i * scale
+
+so under overload every stream loses the same fraction of its frame rate,
+instead of a busy 4K stream starving the others. Frames that arrive before a
+stream's next analysis slot are skipped.
+"""
+
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+ROW_DTYPE = np.dtype([
+    ('target_fps', 'f8'),
+    ('budget', 'f8'),         # analysis seconds per second this stream may use; 0 = no own cap
+    ('cost', 'f8'),           # wall-clock seconds per analysed frame (moving average)
+    ('allowed_fps', 'f8'),
+    ('achieved_fps', 'f8'),
+    ('analysed', 'i8'),
+    ('skipped', 'i8'),
+    ('heartbeat', 'f8'),      # time.time() of the last update; 0 = not started
+])
+
+STALE_AFTER = 5.0  # seconds without a heartbeat before a stream stops counting
+
+
+def allocate_fps(target_fps, cost, budget, global_budget):
+    """
+    Computes the analysis FPS each stream may run at.
+
+    Args:
+        target_fps (array): Target FPS per stream.
+        cost (array): Wall-clock seconds per analysed frame (0 = not measured yet).
+        budget (array): Analysis seconds per second each stream may use on its own (0 = no own cap).
+        global_budget (float): Analysis seconds per second shared by all streams.
+
+    Returns:
+        np.ndarray: Allowed FPS per stream.
+    """
+    target_fps = np.asarray(target_fps, dtype=np.float64)
+    cost = np.asarray(cost, dtype=np.float64)
+    budget = np.asarray(budget, dtype=np.float64)
+
+    wanted = target_fps.copy()
+    capped = (budget > 0) & (cost > 0)
+    wanted[capped] = np.minimum(wanted[capped], budget[capped] / cost[capped])
+
+    demand = float(np.sum(wanted * cost))
+    if demand > global_budget > 0:
+        wanted *= global_budget / demand
+    return wanted
+
+
+class SchedulerTable:
+    """
+    Per-stream rows in shared memory. Each stream writes only its own row and
+    reads the others, so no lock is needed.
+    """
+    def __init__(self, streams, time_budget=None, name=None, create=False):
+        """
+        Args:
+            streams (int): Number of stream rows.
+            time_budget (float, optional): Analysis seconds per second shared by all streams
+                (defaults to one per core).
+            name (str): Shared memory block name (generated when creating).
+            create (bool): Allocate the block (owner) instead of attaching to it.
+        """
+        self.streams = streams
+        size = 8 + streams * ROW_DTYPE.itemsize
+        self._owner = create
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self.shm.name
+
+        self._budget = np.ndarray((1,), dtype=np.float64, buffer=self.shm.buf, offset=0)
+        self.rows = np.ndarray((streams,), dtype=ROW_DTYPE, buffer=self.shm.buf, offset=8)
+        if create:
+            self._budget[0] = time_budget or os.cpu_count() or 1
+            self.rows[:] = np.zeros(streams, dtype=ROW_DTYPE)
+
+    @property
+    def time_budget(self):
+        return float(self._budget[0])
+
+    def allocation(self, now=None):
+        """Allowed FPS for every stream, counting only streams that are alive."""
+        now = time.time() if now is None else now
+        rows = self.rows.copy()
+        alive = (rows['heartbeat'] > 0) & (now - rows['heartbeat'] < STALE_AFTER)
+        allowed = np.zeros(self.streams)
+        allowed[alive] = allocate_fps(rows['target_fps'][alive], rows['cost'][alive],
+                                      rows['budget'][alive], self.time_budget)
+        return allowed
+
+    def stream_report(self, index):
+        """Target vs achieved FPS of one stream."""
+        row = self.rows[index].copy()
+        return {
+            "stream": index,
+            "target_fps": round(float(row['target_fps']), 2),
+            "allowed_fps": round(float(row['allowed_fps']), 2),
+            "achieved_fps": round(float(row['achieved_fps']), 2),
+            "ms_per_frame": round(float(row['cost']) * 1000.0, 1),
+            "analysed": int(row['analysed']),
+            "skipped": int(row['skipped']),
+        }
+
+    def report(self):
+        """Target vs achieved FPS of every started stream, e.g. for logs or an API response."""
+        return [self.stream_report(i) for i in range(self.streams) if self.rows['heartbeat'][i] > 0]
+
+    def close(self):
+        self._budget = self.rows = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+class StreamScheduler:
+    """
+    Decides, frame by frame, whether one stream analyses the frame it just
+    read, and records how long (wall-clock) the analysis took.
+
+    Usage:
+        if scheduler.should_analyse():
+            start = time.perf_counter()
+            ... detect, track, attributes ...
+            scheduler.record(time.perf_counter() - start)
+    """
+    def __init__(self, table, index, target_fps, time_budget=None, refresh_interval=0.5, smoothing=0.2):
+        """
+        Args:
+            table (SchedulerTable): Table shared by all streams.
+            index (int): This stream's row.
+            target_fps (float): Analysis frame rate this stream aims for.
+            time_budget (float, optional): Analysis seconds per second this stream may use on its own.
+            refresh_interval (float): Seconds between allocation updates.
+            smoothing (float): Weight of the newest sample in the cost average.
+        """
+        self.table = table
+        self.index = index
+        self.refresh_interval = refresh_interval
+        self.smoothing = smoothing
+
+        self.row = table.rows[index:index + 1]
+        self.row['target_fps'] = target_fps
+        self.row['budget'] = time_budget or 0.0
+        self.row['cost'] = 0.0
+        self.row['allowed_fps'] = target_fps
+        self.row['achieved_fps'] = 0.0
+        self.row['analysed'] = 0
+        self.row['skipped'] = 0
+        self.row['heartbeat'] = time.time()
+
+        self._next_due = 0.0
+        self._next_refresh = 0.0
+        self._window_start = None
+        self._window_frames = 0
+
+    @property
+    def target_fps(self):
+        return float(self.row['target_fps'][0])
+
+    @property
+    def allowed_fps(self):
+        return float(self.row['allowed_fps'][0])
+
+    def should_analyse(self, now=None):
+        """True when the stream's next analysis slot has come."""
+        now = time.perf_counter() if now is None else now
+        if now >= self._next_refresh:
+            self._refresh(now)
+        if now < self._next_due:
+            self.row['skipped'] += 1
+            return False
+
+        interval = 1.0 / self.allowed_fps if self.allowed_fps > 0 else self.refresh_interval
+        # Keep the average cadence, but never bank more than one slot of catch-up
+        self._next_due = max(self._next_due, now - interval) + interval
+        return True
+
+    def record(self, seconds):
+        """Records the processing time of one analysed frame."""
+        cost = float(self.row['cost'][0])
+        self.row['cost'] = seconds if cost == 0 else (1 - self.smoothing) * cost + self.smoothing * seconds
+        self.row['analysed'] += 1
+        self._window_frames += 1
+
+    def _refresh(self, now):
+        if self._window_start is None:
+            self._window_start = now
+        elapsed = now - self._window_start
+        if elapsed > 0 and self._window_frames:
+            self.row['achieved_fps'] = self._window_frames / elapsed
+            self._window_start, self._window_frames = now, 0
+        elif elapsed >= 2 * self.refresh_interval:
+            self.row['achieved_fps'] = 0.0
+            self._window_start = now
+        self.row['heartbeat'] = time.time()
+        self.row['allowed_fps'] = self.table.allocation()[self.index]
+        self._next_refresh = now + self.refresh_interval
+
+    def status(self):
+        """Target vs achieved FPS of this stream."""
+        return self.table.stream_report(self.index)
@@ -0,0 +1,62 @@
+"""
+Tests for the append-only analysis log (analysis_log.py).
+"""
+import numpy as np
+import pytest
+from analysis_log import AnalysisLogWriter, AnalysisLogReader, STATUS_LABELS
+
+
+def write_rows(log_dir, frames, faces_per_frame=2, chunk_rows=7):
+    with AnalysisLogWriter(str(log_dir), chunk_rows=chunk_rows) as writer:
+        for frame in range(frames):
+            for face in range(faces_per_frame):
+                probs = np.full(5, 0.2, dtype=np.float32)
+                writer.append(frame, frame / 30.0, face + 1, (0, 0, 10, 10), probs,
+                              10.0 * face, -5.0, 1.0, 'Engaged' if face else 'Disengaged')
+
+
+def test_rows_round_trip_across_chunks(tmp_path):
+    write_rows(tmp_path, frames=20)
+    reader = AnalysisLogReader(str(tmp_path))
+
+    rows = reader.read_all()
+    assert len(rows) == 40
+    assert len(list(tmp_path.glob('chunk_*.npy'))) == 6  # 40 rows / 7 per chunk
+    assert np.all(np.diff(rows['frame']) >= 0)
+    assert STATUS_LABELS[rows['status'][0]] == 'Disengaged'
+    assert STATUS_LABELS[rows['status'][1]] == 'Engaged'
+    assert rows['yaw'][1] == 10.0
+
+
+def test_range_scan_and_track_filter(tmp_path):
+    write_rows(tmp_path, frames=20)
+    reader = AnalysisLogReader(str(tmp_path))
+
+    rows = reader.scan(5, 9)
+    assert sorted(set(rows['frame'].tolist())) == [5, 6, 7, 8]
+    assert len(rows) == 8
+
+    rows = reader.scan(0, 100, track_id=2)
+    assert len(rows) == 20
+    assert set(rows['track_id'].tolist()) == {2}
+
+    assert len(reader.scan(50, 60)) == 0
+
+
+def test_writer_refuses_a_directory_with_a_log(tmp_path):
+    write_rows(tmp_path, frames=3)
+    with pytest.raises(FileExistsError):
+        AnalysisLogWriter(str(tmp_path))
+    assert len(AnalysisLogReader(str(tmp_path))) == 6
+
+
+def test_write_failures_are_raised_instead_of_hanging(tmp_path):
+    writer = AnalysisLogWriter(str(tmp_path), chunk_rows=2, max_pending=2)
+    writer.append(1, 0.0, 1, (0, 0, 10), np.zeros(5), 0.0, 0.0, 0.0, 'Engaged')  # bbox has 3 values
+    for frame in range(2, 10):  # more rows than the queue holds: must not block
+        try:
+            writer.append(frame, 0.0, 1, (0, 0, 1, 1), np.zeros(5), 0.0, 0.0, 0.0, 'Engaged')
+        except RuntimeError:
+            break
+    with pytest.raises(RuntimeError, match="Analysis log writer failed"):
+        writer.close()
@@ -0,0 +1,42 @@
+"""
+Tests for the bounded appearance gallery (models/appearance_gallery.py).
+"""
+import numpy as np
+from models.appearance_gallery import AppearanceGallery
+
+
+def unit(v):
+    return v / np.linalg.norm(v)
+
+
+def test_budget_is_respected_and_distances_stay_consistent():
+    rng = np.random.default_rng(0)
+    gallery = AppearanceGallery(budget=8)
+    for _ in range(500):
+        gallery.add(rng.normal(size=32))
+        assert gallery.size <= 8
+
+    samples = gallery.samples
+    assert samples.shape == (8, 32)
+    assert np.allclose(np.linalg.norm(samples, axis=1), 1.0, atol=1e-5)
+    assert np.isclose(gallery.weights[:8].sum(), 500)
+
+    expected = 1.0 - samples @ samples.T
+    np.fill_diagonal(expected, np.inf)
+    assert np.allclose(gallery._distances[:8, :8], expected, atol=1e-5)
+
+
+def test_keeps_one_sample_per_appearance_mode():
+    rng = np.random.default_rng(1)
+    modes = np.eye(4, 64) * 10
+    gallery = AppearanceGallery(budget=4)
+
+    # A long stretch of one mode, then short visits to the others: FIFO would
+    # forget the first mode, the representative gallery keeps all four.
+    sequence = [0] * 400 + [1] * 5 + [2] * 5 + [3] * 5
+    for mode in sequence:
+        gallery.add(modes[mode] + rng.normal(0, 0.5, size=64))
+
+    nearest = np.argmax(gallery.samples @ np.array([unit(m) for m in modes]).T, axis=1)
+    assert sorted(nearest.tolist()) == [0, 1, 2, 3]
+    assert gallery.weights[:4].max() >= 400
@@ -0,0 +1,29 @@
+"""
+Tests for the IoU association helpers used by selective embedding (models/association.py).
+"""
+import numpy as np
+from models.association import ltwh_to_ltrb, iou_matrix, unambiguous_matches
+
+
+def test_iou_matrix():
+    a = ltwh_to_ltrb([[0, 0, 10, 10], [100, 100, 10, 10]])
+    b = ltwh_to_ltrb([[5, 0, 10, 10]])
+    iou = iou_matrix(a, b)
+    assert iou.shape == (2, 1)
+    assert np.isclose(iou[0, 0], 50 / 150)
+    assert iou[1, 0] == 0
+    assert iou_matrix(a, np.empty((0, 4))).shape == (2, 0)
+
+
+def test_only_clear_one_to_one_matches_skip_embedding():
+    tracks = ltwh_to_ltrb([[0, 0, 80, 96],      # seated, alone
+                           [200, 0, 80, 96],    # two people crossing
+                           [240, 0, 80, 96]])
+    detections = ltwh_to_ltrb([[2, 1, 80, 96],    # clear match for track 0
+                               [205, 0, 80, 96],  # overlaps tracks 1 and 2
+                               [600, 0, 80, 96]]) # new face
+    matches = unambiguous_matches(iou_matrix(detections, tracks))
+    assert matches.tolist() == [0, -1, -1]
+
+    # No tracks yet: everything needs an embedding
+    assert unambiguous_matches(iou_matrix(detections, np.empty((0, 4)))).tolist() == [-1, -1, -1]
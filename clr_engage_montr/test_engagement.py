@@ -0,0 +1,46 @@
+"""
+Golden tests: the vectorized EngagementStateArrays against EngagementStateMachine.
+"""
+import numpy as np
+from engagement import EMOTION_LABELS, STATUS_LABELS, EngagementRules, EngagementStateMachine, EngagementStateArrays
+
+EMOTIONS = EMOTION_LABELS + ['unknown', 'error']
+
+
+def make_frames(n_frames=400, n_tracks=12, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(n_frames):
+        # Tracks come and go; new ids appear over time
+        visible = [t for t in range(n_tracks + len(frames) // 50) if rng.random() > 0.2]
+        rng.shuffle(visible)
+        frames.append([(int(t), EMOTIONS[rng.integers(len(EMOTIONS))], float(rng.normal(0, 30)),
+                        float(rng.normal(0, 20))) for t in visible])
+    return frames
+
+
+def test_matches_state_machine():
+    frames = make_frames()
+    for rules in [EngagementRules(),
+                  EngagementRules(2, 20, 10, ('sad',)),
+                  EngagementRules(0, 90, 90, ()),
+                  EngagementRules(15, 5, 5, EMOTION_LABELS)]:
+        reference = EngagementStateMachine(rules)
+        arrays = EngagementStateArrays(rules, capacity=4)
+        for faces in frames:
+            expected = [reference.update(*face) for face in faces]
+            track_ids, emotions, yaws, pitches = zip(*faces) if faces else ([], [], [], [])
+            statuses = arrays.update(list(track_ids), list(emotions), yaws, pitches)
+            assert [STATUS_LABELS[s] for s in statuses] == expected
+
+
+def test_emotion_indexes_and_repeated_tracks():
+    rules = EngagementRules(dissociation_frame_threshold=1)
+    reference = EngagementStateMachine(rules)
+    arrays = EngagementStateArrays(rules)
+
+    faces = [(7, 'sad', 0.0, 0.0), (7, 'sad', 0.0, 0.0), (8, 'happy', 0.0, 0.0)]
+    expected = [reference.update(*face) for face in faces]
+    statuses = arrays.update([7, 7, 8], np.array([2, 2, 1]), [0.0] * 3, [0.0] * 3)
+    assert [STATUS_LABELS[s] for s in statuses] == expected == ['Unknown', 'Disengaged', 'Engaged']
+    assert arrays.count[arrays.slots[7]] == 2
@@ -0,0 +1,34 @@
+"""
+Tests for the golden-output comparison of equivalence.py.
+"""
+import numpy as np
+from analysis_log import ROW_DTYPE
+from equivalence import compare_logs
+
+
+def make_log(faces):
+    rows = np.zeros(len(faces), dtype=ROW_DTYPE)
+    for row, (frame, track_id, x, emotion, yaw, status) in zip(rows, faces):
+        row['frame'], row['track_id'], row['bbox'] = frame, track_id, (x, 0, x + 50, 50)
+        row['emotion_probs'][emotion] = 1.0
+        row['yaw'], row['status'] = yaw, status
+    return rows
+
+
+def test_identical_logs_are_equivalent():
+    log = make_log([(1, 1, 0, 0, 5.0, 1), (1, 2, 100, 1, -3.0, 2), (2, 1, 2, 0, 5.5, 1)])
+    report = compare_logs(log, log.copy())
+    assert report["divergence_rate"] == 0.0 and report["paired"] == 3 and not report["examples"]
+
+
+def test_divergences_are_counted_per_field():
+    reference = make_log([(1, 1, 0, 0, 5.0, 1), (1, 2, 100, 1, -3.0, 2), (2, 1, 0, 0, 5.0, 1), (3, 1, 0, 0, 5.0, 1)])
+    # Frame 1: same faces in another order, one angle within tolerance, one id
+    # swapped; frame 2: emotion and status changed; frame 3: face missing, extra face elsewhere
+    candidate = make_log([(1, 3, 101, 1, -3.5, 2), (1, 1, 1, 0, 5.2, 1), (2, 1, 0, 2, 5.0, 2), (3, 4, 300, 0, 5.0, 1)])
+    report = compare_logs(reference, candidate, angle_tolerance=1.0)
+
+    assert (report["paired"], report["missing"], report["extra"], report["divergent"]) == (3, 1, 1, 2)
+    assert report["fields"] == {"track_id": 1, "emotion": 1, "emotion_probs": 1, "angles": 0, "status": 1}
+    assert np.isclose(report["divergence_rate"], 4 / 5)
+    assert [e["frame"] for e in report["examples"]] == [1, 2]
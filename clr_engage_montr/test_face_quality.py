@@ -0,0 +1,31 @@
+"""
+Tests for the face-crop quality gate (face_quality.py).
+"""
+import cv2
+import numpy as np
+from face_quality import CropQualityGate
+
+
+def make_face(height=96, width=80, seed=0):
+    rng = np.random.default_rng(seed)
+    crop = rng.integers(0, 256, size=(height // 8, width // 8, 3), dtype=np.uint8)
+    return cv2.resize(crop, (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+def test_sharp_crop_passes_and_blurred_crop_is_skipped():
+    gate = CropQualityGate()
+    sharp = make_face()
+    blurred = cv2.GaussianBlur(sharp, (0, 0), 6)
+
+    assert gate.score(sharp) > gate.score(blurred)
+    assert gate.accept(sharp)
+    assert not gate.accept(blurred)
+    assert (gate.checked, gate.skipped, gate.skip_rate) == (2, 1, 0.5)
+
+
+def test_size_and_aspect_ratio_lower_the_score():
+    gate = CropQualityGate()
+    assert gate.score(make_face(96, 80)) > gate.score(make_face(24, 24))
+    assert gate.score(make_face(96, 80)) > gate.score(make_face(32, 96))
+    assert gate.score(make_face(24, 96)) == 0.0  # width/height of 4 is far outside the face range
+    assert gate.score(np.zeros((0, 10, 3), dtype=np.uint8)) == 0.0
@@ -0,0 +1,89 @@
+"""
+Tests for the shared-memory frame ring (frame_ring.py).
+"""
+import multiprocessing
+import numpy as np
+from frame_ring import FrameRing
+
+
+def make_frame(value, height=48, width=64):
+    return np.full((height, width, 3), value % 256, dtype=np.uint8)
+
+
+def write_frames(ring_name, count, drop_oldest):
+    ring = FrameRing(ring_name, slots=4, max_height=48, max_width=64, drop_oldest=drop_oldest)
+    for i in range(1, count + 1):
+        ring.write(make_frame(i))
+    ring.close_writer()
+    ring.close()
+
+
+def test_views_and_sequence_numbers():
+    ring = FrameRing(slots=4, max_height=48, max_width=64, create=True)
+    try:
+        ring.write(make_frame(7, height=24, width=32), timestamp=1.5)
+        seq, timestamp, frame = ring.read(timeout=0)
+        assert (seq, timestamp, frame.shape) == (1, 1.5, (24, 32, 3))
+        assert np.all(frame == 7)
+        assert np.shares_memory(frame, np.ndarray(ring.shm.size, dtype=np.uint8, buffer=ring.shm.buf))
+        assert ring.read(timeout=0) is None
+    finally:
+        ring.close()
+
+
+def test_drop_oldest_returns_newest_and_counts_drops():
+    ring = FrameRing(slots=4, max_height=48, max_width=64, create=True, drop_oldest=True)
+    try:
+        for i in range(1, 11):
+            ring.write(make_frame(i))
+        seq, _, frame = ring.read(timeout=0)
+        assert seq == 10 and np.all(frame == 10)
+        assert ring.dropped == 9
+        assert not ring.is_current(6)
+    finally:
+        ring.close()
+
+
+def test_in_order_delivery_across_processes():
+    ring = FrameRing(slots=4, max_height=48, max_width=64, create=True, drop_oldest=False)
+    process = multiprocessing.Process(target=write_frames, args=(ring.name, 200, False))
+    process.start()
+    try:
+        seen = []
+        while True:
+            item = ring.read(timeout=5)
+            if item is None:
+                break
+            seq, _, frame = item
+            assert np.all(frame == seq % 256)
+            seen.append(seq)
+        process.join()
+        assert seen == list(range(1, 201))
+        assert ring.dropped == 0
+    finally:
+        ring.close()
+
+
+def test_capture_process_keeps_the_source_resolution(tmp_path):
+    import cv2
+    from frame_ring import SharedMemoryCapture
+
+    # Wider than the old fixed 1920x1080 slots
+    path = str(tmp_path / "wide.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (2400, 1200))
+    for i in range(3):
+        writer.write(np.full((1200, 2400, 3), 60 * i, dtype=np.uint8))
+    writer.release()
+
+    cap = SharedMemoryCapture(path)
+    try:
+        shapes = []
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            shapes.append(frame.shape)
+        assert shapes == [(1200, 2400, 3)] * 3
+        assert not cap.copy_frames  # files are served as views; live sources are copied
+    finally:
+        cap.release()
@@ -0,0 +1,100 @@
+"""
+Tests for the cross-stream batching inference server (inference_server.py).
+"""
+import multiprocessing
+import numpy as np
+from inference_server import ModelSpec, InferenceServer, InferenceClient
+
+SPECS = {
+    "double": ModelSpec("double", (2, 3), {"twice": (2, 3), "total": (1,)}),
+    "negate": ModelSpec("negate", (4,), {"negated": (4,)}),
+}
+
+
+def fake_runners(specs, profile, max_batch_size):
+    def double(batch):
+        assert len(batch) <= max_batch_size
+        return [batch * 2, batch.reshape(len(batch), -1).sum(axis=1, keepdims=True)]
+
+    def negate(batch):
+        if np.any(batch == 13):
+            raise ValueError("unlucky")
+        return [-batch]
+
+    return {"double": double, "negate": negate}
+
+
+def run_camera(channel, offset, count, results):
+    client = InferenceClient(channel)
+    requests = [client.submit("double", np.full((1, 2, 3), offset + i)) for i in range(count)]
+    ok = all(np.all(client.wait(r)["twice"] == 2 * (offset + i)) for i, r in enumerate(requests))
+    results.put(ok)
+    client.close()
+
+
+def test_results_and_batching():
+    server = InferenceServer(SPECS, max_batch_size=8, max_delay=0.05, slots=4, runner_factory=fake_runners)
+    channel = server.create_client()
+    with server:
+        client = InferenceClient(channel)
+        # More requests than slots: submit() has to collect finished ones on its own
+        requests = [client.submit("double", np.full((2, 3), i, dtype=np.float32)) for i in range(10)]
+        for i, request in enumerate(requests):
+            outputs = client.wait(request)
+            assert np.all(outputs["twice"] == 2 * i)
+            assert outputs["total"].tolist() == [6 * i]
+
+        assert client.infer("negate", [1, 2, 3, 4])["negated"].tolist() == [-1, -2, -3, -4]
+        client.close()
+
+        stats = server.stats
+        assert stats["requests"] == 11
+        assert stats["max_batch_size"] <= 8
+        assert stats["average_batch_size"] > 1
+
+
+def test_errors_are_returned_to_the_caller():
+    server = InferenceServer(SPECS, max_delay=0.001, runner_factory=fake_runners)
+    channel = server.create_client()
+    with server:
+        client = InferenceClient(channel)
+        try:
+            client.infer("negate", [13, 0, 0, 0])
+            assert False, "expected an error"
+        except RuntimeError as e:
+            assert "unlucky" in str(e)
+        assert client.infer("negate", [1, 0, 0, 0])["negated"].tolist() == [-1, 0, 0, 0]
+        client.close()
+
+
+def test_many_camera_processes_share_one_server():
+    server = InferenceServer(SPECS, max_batch_size=16, max_delay=0.005, runner_factory=fake_runners)
+    channels = [server.create_client() for _ in range(3)]
+    results = multiprocessing.Queue()
+    with server:
+        workers = [multiprocessing.Process(target=run_camera, args=(channel, 100 * i, 20, results))
+                   for i, channel in enumerate(channels)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+        assert [results.get(timeout=5) for _ in workers] == [True] * 3
+        assert server.stats["requests"] == 60
+
+
+def test_slots_are_sized_per_model():
+    specs = {"detector": ModelSpec("detector", (3, 640, 640), {"output": (5, 8400)}),
+             "emotion": ModelSpec("emotion", (3, 64, 64), {"probabilities": (5,)})}
+    server = InferenceServer(specs, max_batch_size=8, runner_factory=fake_runners)
+    assert server.slots == {"detector": 8, "emotion": 64}
+    # 8 detector slots (~39 MB) instead of 64 (~315 MB) per camera
+    assert server.client_memory_bytes < 45 * 2**20
+
+    server = InferenceServer(SPECS, max_delay=0.001, slots={"double": 2, "negate": 1}, runner_factory=fake_runners)
+    channel = server.create_client()
+    with server:
+        client = InferenceClient(channel)
+        requests = [client.submit("double", np.full((2, 3), i)) for i in range(5)]
+        assert [client.wait(r)["total"].tolist() for r in requests] == [[6 * i] for i in range(5)]
+        assert client.infer("negate", [1, 2, 3, 4])["negated"].tolist() == [-1, -2, -3, -4]
+        client.close()
@@ -0,0 +1,34 @@
+"""
+Tests for the on-demand annotated preview (preview.py).
+"""
+import cv2
+import numpy as np
+from preview import PreviewFrame
+
+
+def test_encodes_lazily_once_per_version_and_rate_limited():
+    preview = PreviewFrame(min_interval=1.0)
+    assert preview.jpeg(now=0.0) == (None, 0)
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    for _ in range(5):
+        preview.update(frame, [(3, (10, 10, 110, 130), 'happy', 'Engaged')])
+    assert preview.encodes == 0
+
+    jpeg, version = preview.jpeg(now=10.0)
+    assert version == 5 and preview.encodes == 1
+    image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape == (480, 640, 3) and image[10, 60, 1] > 100  # green box edge
+
+    assert preview.jpeg(now=10.1) == (jpeg, 5)
+    preview.update(frame, [])
+    # A new version within min_interval gets the cached image
+    assert preview.jpeg(now=10.5) == (jpeg, 5) and preview.encodes == 1
+    assert preview.jpeg(now=11.1)[1] == 6 and preview.encodes == 2
+
+
+def test_large_frames_are_downscaled():
+    preview = PreviewFrame(max_width=320)
+    preview.update(np.zeros((720, 1280, 3), dtype=np.uint8), [(1, (0, 0, 100, 100), 'sad', 'Disengaged')])
+    jpeg, _ = preview.jpeg(now=0.0)
+    assert cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR).shape == (180, 320, 3)
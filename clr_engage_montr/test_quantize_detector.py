@@ -0,0 +1,24 @@
+"""
+Tests for the detector accuracy report of quantize_detector.py.
+"""
+import numpy as np
+from quantize_detector import detection_metrics, match_detections, parse_yolo_labels
+
+
+def test_parse_yolo_labels_ignores_keypoints():
+    text = "0 0.5 0.5 0.2 0.4 0.45 0.4 2.0 0.55 0.4 2.0\n\n0 0.1 0.1 0.1 0.1\n"
+    boxes = parse_yolo_labels(text, image_width=100, image_height=50)
+    assert np.allclose(boxes, [[40, 15, 20, 20], [5, 2.5, 10, 5]])
+
+
+def test_match_detections_counts_each_truth_once():
+    truth = np.array([[0, 0, 10, 10], [50, 50, 10, 10]])
+    # Two predictions on the first face (duplicate), one shifted, one false alarm
+    predicted = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [52, 50, 10, 10], [200, 200, 10, 10]])
+    tp, fp, fn, ious = match_detections(predicted, truth)
+    assert (tp, fp, fn) == (2, 2, 0)
+    assert np.isclose(ious[0], 1.0)
+
+    metrics = detection_metrics((tp, fp, fn, ious))
+    assert np.isclose(metrics["precision"], 0.5) and np.isclose(metrics["recall"], 1.0)
+    assert match_detections(np.empty((0, 4)), truth)[:3] == (0, 0, 2)
@@ -0,0 +1,79 @@
+"""
+Tests for the inference replay engine (replay.py).
+"""
+import numpy as np
+from engagement import EMOTION_LABELS, STATUS_LABELS, EngagementRules, EngagementStateMachine
+from replay import OBSERVATION_DTYPE, DETECTION_DTYPE, ReplayCache, ReplayRecord, record_from_log, replay, sweep, compare
+
+
+def make_record(n_frames=300, n_tracks=6, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for frame in range(1, n_frames + 1):
+        for track_id in range(1, n_tracks + 1):
+            if rng.random() < 0.15:
+                continue  # track not visible this frame
+            analysed = rng.random() > 0.05
+            rows.append((frame, track_id, (0, 0, 40, 40), analysed,
+                         rng.integers(-1, len(EMOTION_LABELS)), np.zeros(len(EMOTION_LABELS)),
+                         rng.normal(0, 30), rng.normal(0, 20), 0.0))
+    observations = np.array(rows, dtype=OBSERVATION_DTYPE)
+    return ReplayRecord(observations, np.empty(0, dtype=DETECTION_DTYPE), 'video', 'models')
+
+
+def reference_statuses(rec, rules):
+    machine = EngagementStateMachine(rules)
+    statuses = []
+    for obs in rec.analysed:
+        emotion = EMOTION_LABELS[obs['emotion']] if obs['emotion'] >= 0 else 'unknown'
+        statuses.append(machine.update(int(obs['track_id']), emotion, float(obs['yaw']), float(obs['pitch'])))
+    return statuses
+
+
+def test_replay_matches_state_machine():
+    rec = make_record()
+    for rules in [EngagementRules(),
+                  EngagementRules(2, 20, 10, ('sad',)),
+                  EngagementRules(0, 90, 90, ()),
+                  EngagementRules(15, 5, 5, EMOTION_LABELS)]:
+        expected = reference_statuses(rec, rules)
+        assert [STATUS_LABELS[s] for s in replay(rec, rules)] == expected
+
+
+def test_cache_round_trip(tmp_path):
+    rec = make_record(n_frames=20)
+    cache = ReplayCache(str(tmp_path))
+    cache.save(rec)
+
+    loaded = cache.load('video', 'models')
+    assert loaded is not None
+    assert np.array_equal(replay(loaded), replay(rec))
+    assert cache.load('video', 'other-models') is None
+
+
+def test_sweep_and_compare():
+    rec = make_record(n_frames=50)
+    results = sweep(rec, dissociation_frame_thresholds=(2, 6), yaw_thresholds=(20, 33))
+    assert len(results) == 4
+
+    strict, lenient = EngagementRules(1, 10, 10), EngagementRules(50, 90, 90, ())
+    result = compare(rec, strict, lenient)
+    assert result["changed"] > 0
+    assert result["b"]["disengaged_ratio"] == 0.0
+
+
+
+def test_record_from_pipeline_log(tmp_path):
+    from analysis_log import AnalysisLogWriter
+
+    with AnalysisLogWriter(str(tmp_path)) as log:
+        sad = np.eye(len(EMOTION_LABELS), dtype=np.float32)[EMOTION_LABELS.index('sad')]
+        log.append(1, 0.0, 7, (10, 10, 50, 50), sad, 40.0, 0.0, 0.0, 'Engaged')
+        log.append(2, 0.0, 7, (10, 10, 50, 50), np.zeros(5), 40.0, 0.0, 0.0, 'Engaged')  # failed inference
+
+    rec = record_from_log(str(tmp_path), [(1, [10, 10, 40, 40], 0.9)], 'video', 'models')
+    assert rec.observations['frame'].tolist() == [1, 2]
+    assert rec.observations['analysed'].all()
+    assert rec.observations['emotion'].tolist() == [EMOTION_LABELS.index('sad'), -1]
+    assert rec.detections['score'].tolist() == [np.float32(0.9)]
+    assert [STATUS_LABELS[s] for s in replay(rec)] == reference_statuses(rec, EngagementRules())
@@ -0,0 +1,27 @@
+"""
+Tests for runtime profile selection (runtime_profiles.py).
+"""
+import pytest
+from runtime_profiles import PROFILES, get_profile
+
+
+def test_default_profile_keeps_library_defaults(monkeypatch):
+    monkeypatch.delenv("INFERENCE_PROFILE", raising=False)
+    profile = get_profile()
+    assert profile.name == "default"
+    assert profile.ov_config() == {}
+    assert profile.detector_backend == "opencv"
+
+
+def test_profile_selected_from_environment(monkeypatch):
+    monkeypatch.setenv("INFERENCE_PROFILE", "throughput")
+    config = get_profile().ov_config()
+    assert config["PERFORMANCE_HINT"] == "THROUGHPUT"
+    assert config["NUM_STREAMS"] == "AUTO"
+    assert get_profile("latency").ov_config()["NUM_STREAMS"] == "1"
+    assert get_profile(PROFILES["latency"]) is PROFILES["latency"]
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        get_profile("turbo")
@@ -0,0 +1,68 @@
+"""
+Tests for the shared-memory snapshot channel (shared_state.py).
+"""
+import os
+import multiprocessing
+from shared_state import SnapshotPublisher, SnapshotReader
+
+
+def publish_snapshots(path, count):
+    publisher = SnapshotPublisher(path, capacity=4096)
+    for i in range(1, count + 1):
+        publisher.publish({"present_ids": list(range(i % 7)), "engagement": [], "frame": i})
+    publisher.close()
+
+
+def test_reader_before_publish_returns_default(tmp_path):
+    reader = SnapshotReader(str(tmp_path / "state.shm"))
+    assert reader.read(default={"present_ids": []}) == {"present_ids": []}
+    assert reader.age() is None
+
+
+def test_round_trip_and_caching(tmp_path):
+    path = str(tmp_path / "state.shm")
+    publisher = SnapshotPublisher(path, capacity=4096)
+    reader = SnapshotReader(path)
+
+    publisher.publish({"present_ids": ["1", "2"], "engagement": [{"id": "1", "engagement": "Engaged"}]})
+    first = reader.read()
+    assert first["present_ids"] == ["1", "2"]
+    assert reader.read() is first  # unchanged sequence number: cached object
+
+    publisher.publish({"present_ids": [], "engagement": []})
+    assert reader.read()["present_ids"] == []
+    assert reader.age() >= 0
+
+
+def test_snapshot_published_by_another_process(tmp_path):
+    path = str(tmp_path / "state.shm")
+    process = multiprocessing.Process(target=publish_snapshots, args=(path, 500))
+    process.start()
+    reader = SnapshotReader(path)
+    while process.is_alive():
+        state = reader.read()
+        if state is not None:
+            assert len(state["present_ids"]) == state["frame"] % 7  # never torn
+    process.join()
+    assert reader.read()["frame"] == 500
+
+
+def test_restarted_publisher_keeps_last_snapshot(tmp_path):
+    path = str(tmp_path / "state.shm")
+    publish_snapshots(path, 3)
+    SnapshotPublisher(path, capacity=4096).close()
+    assert SnapshotReader(path).read()["frame"] == 3
+
+
+def test_restart_with_smaller_capacity_never_shrinks_the_file(tmp_path):
+    path = str(tmp_path / "state.shm")
+    publish_snapshots(path, 3)
+    reader = SnapshotReader(path)
+    assert reader.read()["frame"] == 3  # mapped at the larger size
+    size = os.path.getsize(path)
+
+    publisher = SnapshotPublisher(path, capacity=1024)
+    publisher.publish({"frame": 4})
+    assert os.path.getsize(path) == size
+    assert reader.read()["frame"] == 4
+    publisher.close()
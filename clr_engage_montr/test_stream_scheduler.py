@@ -0,0 +1,49 @@
+"""
+Tests for the fair per-stream processing-time budget scheduler (stream_scheduler.py).
+"""
+import numpy as np
+from stream_scheduler import allocate_fps, SchedulerTable, StreamScheduler
+
+
+def test_allocation_within_budget_meets_targets():
+    allowed = allocate_fps([10, 10], [0.05, 0.05], [0, 0], global_budget=2.0)
+    assert np.allclose(allowed, [10, 10])
+
+
+def test_overload_degrades_every_stream_evenly():
+    # A heavy 4K stream and two light ones need 1.6 + 0.2 + 0.2 = 2 s/s; only 1 available
+    allowed = allocate_fps([10, 10, 10], [0.16, 0.02, 0.02], [0, 0, 0], global_budget=1.0)
+    assert np.allclose(allowed / 10, allowed[0] / 10)
+    assert np.isclose(np.sum(allowed * [0.16, 0.02, 0.02]), 1.0)
+
+
+def test_stream_budget_caps_only_that_stream():
+    allowed = allocate_fps([10, 10], [0.1, 0.1], [0.5, 0], global_budget=4.0)
+    assert np.allclose(allowed, [5, 10])
+
+
+def test_scheduler_throttles_cadence_to_allocation():
+    table = SchedulerTable(2, time_budget=1.0, create=True)
+    try:
+        heavy = StreamScheduler(table, 0, target_fps=10)
+        light = StreamScheduler(table, 1, target_fps=10)
+        heavy.record(0.15)
+        light.record(0.05)
+
+        # Feed 30 fps for 10 simulated seconds
+        analysed = {0: 0, 1: 0}
+        for i in range(300):
+            now = 1000.0 + i / 30
+            for scheduler in (heavy, light):
+                if scheduler.should_analyse(now):
+                    analysed[scheduler.index] += 1
+
+        # Demand is 1.5 + 0.5 = 2 s/s for a budget of 1: both streams get ~5 fps
+        assert abs(heavy.allowed_fps - 5.0) < 1e-6 and abs(light.allowed_fps - 5.0) < 1e-6
+        assert 45 <= analysed[0] <= 56 and 45 <= analysed[1] <= 56
+
+        report = table.report()
+        assert [row["target_fps"] for row in report] == [10, 10]
+        assert report[0]["skipped"] > 0
+    finally:
+        table.close()
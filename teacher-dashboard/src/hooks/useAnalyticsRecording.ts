@@ -1,18 +1,37 @@
 import { useCallback, useState } from 'react';
 
-const BACKEND_URL = 'http://localhost:8000/recording';
+const API_URL = 'http://localhost:8000';
+const BACKEND_URL = `${API_URL}/recording`;
+const POLL_INTERVAL_MS = 3000;
 
 export interface RecordingResult {
   videoUrl: string;
   transcriptUrl: string;
 }
 
+// /recording/stop queues the processing job; poll the session until it finishes
+const waitForJob = async (statusUrl: string) => {
+  while (true) {
+    const response = await fetch(`${API_URL}${statusUrl}`);
+    if (!response.ok) {
+      throw new Error(`Failed to fetch processing status: ${response.statusText}`);
+    }
+    const session = await response.json();
+    const job = session.job;
+    if (!job || job.status === 'completed' || job.status === 'error') {
+      return job;
+    }
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+  }
+};
+
 export const useAnalyticsRecording = () => {
   const [recordingResult, setRecordingResult] = useState<RecordingResult | null>(null);
 
   const sendAnalyticsState = useCallback(
     async (action: 'start' | 'stop', session_id: string) => {
-      const endpoint = `${BACKEND_URL}/${action}`;
+      // Recordings are keyed by session, so several classrooms can record at once
+      const endpoint = action === 'start' ? `${BACKEND_URL}/start` : `${BACKEND_URL}/${session_id}/stop`;
 
       try {
         const response = await fetch(endpoint, {
@@ -30,12 +49,13 @@ export const useAnalyticsRecording = () => {
 
         if (action === 'stop') {
           const data = await response.json();
-          const { videoUrl, transcriptUrl } = data;
+          const job = data.status_url ? await waitForJob(data.status_url) : null;
+          const { videoUrl, transcriptUrl } = job ? job.result : data;
 
           if (videoUrl && transcriptUrl) {
             setRecordingResult({ videoUrl, transcriptUrl });
           } else {
-            console.warn("Missing videoUrl or transcriptUrl in stop response:", data);
+            console.warn("Missing videoUrl or transcriptUrl in processing result:", job ?? data);
           }
         }
       } catch (error) {
@@ -1,12 +1,14 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import os
 import tempfile
 import asyncio
+import json
 import sys
+import uuid
 from pathlib import Path
 from typing import Optional, Dict, Any
 
@@ -35,7 +37,12 @@ else:
     print("✅ OpenAI API key is ready for use")
 
 # Import the new audio recorder
-from audio_recorder import AudioRecorder
+from audio_recorder import RecorderManager
+from openai_client import close_async_clients
+from job_queue import Job, JobQueue, JobQueueFull
+from stage_graph import StageTimer, educational_video_graph
+from live_transcription import LiveTranscriber
+from result_cache import get_result_cache
 
 # Check Python version
 PYTHON_VERSION = sys.version_info
@@ -183,19 +190,26 @@ print(f"🔧 More classes: VideoAnimator={VideoAnimator is not None}, PDFGenerat
 # Pydantic models for request/response
 class RecordingStartRequest(BaseModel):
     session_id: Optional[str] = None
+    device: Optional[str] = None  # input device of this session; auto-detected if None
 
 class RecordingStopRequest(BaseModel):
+    session_id: Optional[str] = None  # only for POST /recording/stop
     process_immediately: bool = True
     topic_hint: Optional[str] = None
 
+class ProcessRequest(BaseModel):
+    topic_hint: Optional[str] = None
+
 class SessionInfo(BaseModel):
     session_id: str
     video_path: Optional[str] = None
     pdf_path: Optional[str] = None
     transcript: Optional[str] = None
     title: Optional[str] = None
-    status: str  # "recording", "processing", "completed", "error"
+    status: str  # "recording", "recorded", "queued", "processing", "completed", "error"
     created_at: str
+    job_id: Optional[str] = None
+    audio_path: Optional[str] = None  # recording not processed yet (kept until processing succeeds)
 
 app = FastAPI(title="Voice to Educational Video API with Real-time Recording")
 app.mount("/static", StaticFiles(directory="output"), name="static")
@@ -213,12 +227,33 @@ app.add_middleware(
 # Create output directory if it doesn't exist
 os.makedirs("output", exist_ok=True)
 
-# Global audio recorder instance
-audio_recorder = AudioRecorder()
+# Recording sessions, each with its own recorder and capture thread/process
+recorder_manager = RecorderManager()
 
 # Session storage for tracking processing status
 active_sessions: Dict[str, SessionInfo] = {}
 
+# Transcribers of the recordings in progress, fed with rolling segments
+live_transcribers: Dict[str, LiveTranscriber] = {}
+
+# Processing jobs run in the background on a bounded worker pool
+job_queue = JobQueue(
+    workers=int(os.getenv("PROCESSING_WORKERS", "2")),
+    max_pending=int(os.getenv("PROCESSING_QUEUE_SIZE", "20")),
+)
+
+@app.on_event("startup")
+async def start_job_queue():
+    """Start the processing workers"""
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def close_openai_clients():
+    """Stop the recordings and processing workers and close the pooled OpenAI connections"""
+    await recorder_manager.stop_all()
+    await job_queue.stop()
+    await close_async_clients()
+
 # === HEALTH CHECK ENDPOINTS ===
 
 @app.get("/")
@@ -234,19 +269,33 @@ async def health_check_detailed():
         "api_version": "1.0",
         "recording_available": True,
         "active_sessions": len(active_sessions),
-        "full_pipeline_available": FULL_PIPELINE_AVAILABLE
+        "active_recordings": len(recorder_manager.recorders),
+        "full_pipeline_available": FULL_PIPELINE_AVAILABLE,
+        "jobs": job_queue.stats(),
+        "result_cache": get_result_cache().stats() if get_result_cache() else None
     }
 
 # === REAL-TIME RECORDING ENDPOINTS ===
 
 @app.post("/recording/start")
 async def start_recording(request: RecordingStartRequest):
-    """Start real-time audio recording"""
+    """Start a real-time audio recording session (several sessions can record at once)"""
     try:
         print(f"📡 Received start recording request: {request}")
-        result = await audio_recorder.start_recording(request.session_id)
+        session_id = request.session_id or str(uuid.uuid4())
+        
+        # Transcribe the recording in segments while it is still running
+        live = LiveTranscriber(AudioTranscriber()) if AudioTranscriber else None
+        result = await recorder_manager.start_recording(session_id, device=request.device,
+                                                        on_segment=live.submit if live else None)
         print(f"🎙 Recording start result: {result}")
         
+        if live:
+            if result["status"] == "success":
+                live_transcribers[session_id] = live
+            else:
+                await live.finish()
+        
         if result["status"] == "success":
             # Create session info
             from datetime import datetime
@@ -266,49 +315,38 @@ async def start_recording(request: RecordingStartRequest):
         traceback.print_exc()
         return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
 
-@app.post("/recording/stop")
-async def stop_recording(request: RecordingStopRequest):
-    """Stop audio recording and optionally process immediately"""
+@app.post("/recording/{session_id}/stop")
+async def stop_recording(session_id: str, request: Optional[RecordingStopRequest] = None):
+    """Stop a session's recording and queue it for processing; poll /session/{id} for progress"""
+    request = request or RecordingStopRequest()
     try:
-        result = await audio_recorder.stop_recording()
-
-        print("result cool!")
-        print(request)
+        result = await recorder_manager.stop_recording(session_id)
         
         if result["status"] == "success":
-            print("Status Success!!!!!!!")
             session_id = result["session_id"]
+            session = active_sessions.get(session_id)
+            live = live_transcribers.pop(session_id, None)
+            if session:
+                session.audio_path = result["file_path"]
             
-            # Update session status - FIX: Remove await and fix assignment
-            if session_id in active_sessions:
-                active_sessions[session_id].status = "processing" if request.process_immediately else "recorded"
-            
-            # Process Audio - FIX: Now it's async, so we need await
-            print("processing audio now")
-            processing_result: dict = await process_recorded_audio(
-                result["file_path"], 
-                session_id, 
-                request.topic_hint
-            )
-            print("processing audio done")
-
-            print(processing_result.get('status'))
-            
-            # If processing was successful, update the result with the processing output
-            if processing_result.get("status") == "success":
-                print("Processing was successful!")
-                result.update({
-                    "videoUrl": processing_result["videoUrl"],
-                    "transcriptUrl": processing_result["transcriptUrl"],
-                    "transcript": processing_result.get("transcript", ""),
-                    "title": processing_result.get("title", "Educational Video")
-                })
-                print(f"Final result: {result}")
+            if request.process_immediately:
+                try:
+                    result.update(queue_processing(session_id, result["file_path"], request.topic_hint, live))
+                except JobQueueFull as e:
+                    # Keep the recording so it can be processed later
+                    if session:
+                        session.status = "recorded"
+                    if live:
+                        asyncio.create_task(keep_live_transcript(session_id, live))
+                    result["processing_error"] = f"Processing queue is full: {e}"
+                    result["process_url"] = f"/session/{session_id}/process"
+                    return JSONResponse(result, status_code=503)
             else:
-                # If processing failed, include the error
-                result.update({
-                    "processing_error": processing_result.get("error", "Unknown processing error")
-                })
+                if session:
+                    session.status = "recorded"
+                if live:
+                    asyncio.create_task(keep_live_transcript(session_id, live))
+                result["process_url"] = f"/session/{session_id}/process"
         
         return JSONResponse(result)
         
@@ -318,11 +356,66 @@ async def stop_recording(request: RecordingStopRequest):
         traceback.print_exc()
         return JSONResponse({"error": str(e)}, status_code=500)
 
+def queue_processing(session_id: str, audio_path: str, topic_hint: Optional[str] = None,
+                     live: Optional[LiveTranscriber] = None) -> dict:
+    """Queue a recording for processing (raises JobQueueFull) and return the job's URLs"""
+    job = job_queue.submit(process_recorded_audio, audio_path, session_id, topic_hint, live,
+                           session_id=session_id)
+    session = active_sessions.get(session_id)
+    if session:
+        session.status = "queued"
+        session.job_id = job.job_id
+    return {
+        "job_id": job.job_id,
+        "status_url": f"/session/{session_id}",
+        "events_url": f"/session/{session_id}/events"
+    }
+
+@app.post("/session/{session_id}/process")
+async def process_session(session_id: str, request: Optional[ProcessRequest] = None):
+    """Process a kept recording: one stopped without processing, refused by a full queue, or whose processing failed"""
+    request = request or ProcessRequest()
+    session = active_sessions.get(session_id)
+    if not session:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+    if session.status not in ("recorded", "error"):
+        return JSONResponse({"error": f"Session is {session.status}"}, status_code=409)
+    if not session.audio_path or not os.path.exists(session.audio_path):
+        return JSONResponse({"error": "The session has no recording to process"}, status_code=409)
+    
+    try:
+        result = queue_processing(session_id, session.audio_path, request.topic_hint)
+    except JobQueueFull as e:
+        return JSONResponse({"error": f"Processing queue is full: {e}"}, status_code=503)
+    return JSONResponse({"status": "success", "session_id": session_id, **result})
+
+@app.post("/recording/stop")
+async def stop_recording_legacy(request: RecordingStopRequest):
+    """Stop the recording named in the body (or the only one in progress); prefer /recording/{session_id}/stop"""
+    session_id = request.session_id
+    if not session_id:
+        if len(recorder_manager.recorders) != 1:
+            return JSONResponse({"status": "error",
+                                 "message": "session_id is required while several sessions are recording"},
+                                status_code=400)
+        session_id = next(iter(recorder_manager.recorders))
+    return await stop_recording(session_id, request)
+
 @app.get("/recording/status")
 async def get_recording_status():
-    """Get current recording status"""
+    """Get the status of all recordings in progress"""
+    try:
+        status = await recorder_manager.get_recording_status()
+        return JSONResponse(status)
+        
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+@app.get("/recording/{session_id}/status")
+async def get_session_recording_status(session_id: str):
+    """Get the recording status of one session"""
     try:
-        status = await audio_recorder.get_recording_status()
+        status = await recorder_manager.get_recording_status(session_id)
         return JSONResponse(status)
         
     except Exception as e:
@@ -335,7 +428,34 @@ async def get_session_info(session_id: str):
         return JSONResponse({"error": "Session not found"}, status_code=404)
     
     session_info = active_sessions[session_id]
-    return JSONResponse(session_info.dict())
+    info = session_info.dict()
+    live = live_transcribers.get(session_id)
+    if live:
+        # Transcript of the segments recorded so far
+        info["transcript"] = live.transcript
+    job = job_queue.get(session_info.job_id)
+    if job:
+        # Per-stage status and partial results of the processing job
+        info["job"] = job.to_dict()
+    return JSONResponse(info)
+
+@app.get("/session/{session_id}/events")
+async def stream_session_events(session_id: str):
+    """Server-sent events with the processing job's progress until it finishes"""
+    session_info = active_sessions.get(session_id)
+    job = job_queue.get(session_info.job_id) if session_info else None
+    if not job:
+        return JSONResponse({"error": "No processing job for this session"}, status_code=404)
+    
+    async def events():
+        updates = job.subscribe()
+        while True:
+            snapshot = await updates.get()
+            if snapshot is None:
+                break
+            yield f"data: {json.dumps(snapshot)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 @app.get("/sessions")
 async def get_all_sessions():
@@ -363,6 +483,10 @@ async def delete_session(session_id: str):
         os.unlink(session_info.pdf_path)
         files_deleted.append(session_info.pdf_path)
     
+    if session_info.audio_path and os.path.exists(session_info.audio_path):
+        os.unlink(session_info.audio_path)
+        files_deleted.append(session_info.audio_path)
+    
     # Remove from active sessions
     del active_sessions[session_id]
     
@@ -371,8 +495,18 @@ async def delete_session(session_id: str):
         "files_deleted": files_deleted
     })
 
-async def process_recorded_audio(audio_file_path: str, session_id: str, topic_hint: Optional[str] = None):
-    """Background task to process recorded audio through the full pipeline"""
+async def keep_live_transcript(session_id: str, live: LiveTranscriber):
+    """Store the live transcript of a recording that is not processed right away"""
+    transcript = await live.finish()
+    if transcript and session_id in active_sessions:
+        active_sessions[session_id].transcript = transcript
+
+async def process_recorded_audio(job: Job, audio_file_path: str, session_id: str, topic_hint: Optional[str] = None,
+                                 live_transcriber: Optional[LiveTranscriber] = None):
+    """
+    Background job processing recorded audio through the full pipeline, reporting each stage to `job`.
+    With a `live_transcriber` the transcript stage only waits for the last segments.
+    """
     try:
         if session_id in active_sessions:
             active_sessions[session_id].status = "processing"
@@ -396,69 +530,47 @@ async def process_recorded_audio(audio_file_path: str, session_id: str, topic_hi
         
         print(f"🔧 Available modules: Narrator={has_narrator}, VideoAnimator={has_video_animator}, PDFGenerator={has_pdf_generator}, VideoMerger={has_video_merger}")
         
-        # Step 1: Transcribe audio
-        transcriber = AudioTranscriber()
-        transcript = await transcriber.transcribe(audio_file_path)
-        print(f"📝 Transcription completed: {len(transcript)} characters")
-        
-        # Step 2: Generate educational script
-        script_gen = ScriptGenerator()
-        script_data = await script_gen.generate_script(transcript, topic_hint)
-        print(f"📚 Script generated with title: {script_data.get('title', 'No title')}")
-        
-        # Initialize paths
-        narration_path = None
-        animation_path = None
-        final_video_path = None
-        pdf_path = None
-        
-        # Step 3: Create narration (if available)
-        if has_narrator:
-            try:
-                narrator = Narrator()
-                narration_path = await narrator.create_narration(script_data['full_text'])
-                print(f"🎙 Narration created: {os.path.abspath(narration_path)}")
-            except Exception as e:
-                print(f"⚠ Narration failed: {e}")
-                narration_path = None
-        else:
-            print("⚠ Narrator not available - skipping narration step")
-        
-        # Step 4: Create animations (if available)
-        if has_video_animator:
-            try:
-                animator = VideoAnimator()
-                animation_path = await animator.create_animation(script_data)
-                print(f"🎬 Animation created: {os.path.abspath(animation_path)}")
-            except Exception as e:
-                print(f"⚠ Animation failed: {e}")
-                animation_path = None
-        else:
-            print("⚠ VideoAnimator not available - skipping animation step")
-        
-        # Step 5: Merge video and audio (if both are available)
-        if has_video_merger and animation_path and narration_path:
-            try:
-                merger = VideoMerger()
-                final_video_path = await merger.merge_audio_video(animation_path, narration_path)
-                print(f"🎥 Final video created: {os.path.abspath(final_video_path)}")
-            except Exception as e:
-                print(f"⚠ Video merging failed: {e}")
-                final_video_path = None
-        else:
-            print("⚠ Video merging not available - missing components")
-        
-        # Step 6: Generate PDF (if available)
-        if has_pdf_generator:
-            try:
-                pdf_gen = PDFGenerator()
-                pdf_path = await pdf_gen.create_pdf(script_data)
-                print(f"📄 PDF transcript created: {os.path.abspath(pdf_path)}")
-            except Exception as e:
-                print(f"⚠ PDF generation failed: {e}")
-                pdf_path = None
-        else:
-            print("⚠ PDFGenerator not available - skipping PDF step")
+        # Transcript -> script -> narration, animation and PDF in parallel -> merge
+        graph = educational_video_graph(
+            live_transcriber or AudioTranscriber(), ScriptGenerator(),
+            narrator=Narrator() if has_narrator else None,
+            animator=VideoAnimator() if has_video_animator else None,
+            merger=VideoMerger() if has_video_merger else None,
+            pdf_generator=PDFGenerator() if has_pdf_generator else None,
+            topic_hint=topic_hint or "",
+            optional_outputs=True,
+        )
+        for stage, available in [("narration", has_narrator), ("animation", has_video_animator),
+                                 ("merge", has_narrator and has_video_animator and has_video_merger),
+                                 ("pdf", has_pdf_generator)]:
+            if not available:
+                job.skip_stage(stage, "module not available")
+                print(f"⚠ {stage} not available - skipping")
+        
+        def publish(stage: str, value):
+            # Partial results become visible to clients as soon as each stage is done
+            if stage == "transcript":
+                job.update_result(transcript=value)
+                if session_id in active_sessions:
+                    active_sessions[session_id].transcript = value
+                print(f"📝 Transcription completed: {len(value)} characters")
+            elif stage == "script":
+                job.update_result(title=value.get('title', 'Educational Video'))
+                print(f"📚 Script generated with title: {value.get('title', 'No title')}")
+            elif stage == "merge":
+                job.update_result(videoUrl=f"http://127.0.0.1:8000/static/{os.path.basename(value)}")
+                print(f"🎥 Final video created: {os.path.abspath(value)}")
+            elif stage == "pdf":
+                job.update_result(transcriptUrl=f"http://127.0.0.1:8000/static/{os.path.basename(value)}")
+                print(f"📄 PDF transcript created: {os.path.abspath(value)}")
+            else:
+                print(f"✅ {stage} created: {os.path.abspath(value)}")
+        
+        results = await graph.run({"audio_path": audio_file_path}, tracker=job, on_result=publish)
+        transcript = results["transcript"]
+        script_data = results["script"]
+        final_video_path = results.get("merge")
+        pdf_path = results.get("pdf")
         
         # Get absolute paths for return
         video_full_path = os.path.basename(final_video_path) if final_video_path else None
@@ -494,6 +606,13 @@ async def process_recorded_audio(audio_file_path: str, session_id: str, topic_hi
         print(f"✅ Processing completed for session {session_id}")
         print(f"📊 Result: {result}")
         
+        # The recording is only deleted once it has been processed
+        if os.path.exists(audio_file_path):
+            os.unlink(audio_file_path)
+            print(f"🗑 Cleaned up temporary audio file: {audio_file_path}")
+        if session_id in active_sessions:
+            active_sessions[session_id].audio_path = None
+        
         return result
         
     except Exception as e:
@@ -503,19 +622,10 @@ async def process_recorded_audio(audio_file_path: str, session_id: str, topic_hi
         
         if session_id in active_sessions:
             active_sessions[session_id].status = "error"
+        print(f"💾 Recording kept for a retry: POST /session/{session_id}/process")
         
-        # Return error result
-        return {
-            "status": "error",
-            "error": str(e),
-            "session_id": session_id
-        }
-    
-    finally:
-        # Clean up the original recorded audio file
-        if os.path.exists(audio_file_path):
-            os.unlink(audio_file_path)
-            print(f"🗑 Cleaned up temporary audio file: {audio_file_path}")
+        # Fails the job; the error is reported in its status
+        raise
 
 # === ORIGINAL ENDPOINTS (for file upload) ===
 
@@ -552,6 +662,7 @@ async def generate_educational_video(
         tmp_audio.write(await audio.read())
         audio_path = tmp_audio.name
     
+    processed = False
     try:
         # Check if full pipeline is available based on Python version
         if not FULL_PIPELINE_AVAILABLE:
@@ -560,6 +671,7 @@ async def generate_educational_video(
             with open(save_path, "wb") as f:
                 with open(audio_path, "rb") as src_file:
                     f.write(src_file.read())
+            processed = True
             
             return JSONResponse({
                 "status": "success",
@@ -570,42 +682,38 @@ async def generate_educational_video(
             })
         
         # Full pipeline is available (Python 3.10/3.12)
-        # Step 1: Transcribe audio
-        transcriber = AudioTranscriber()
-        transcript = await transcriber.transcribe(audio_path)
-        
-        # Step 2: Generate educational script
-        script_gen = ScriptGenerator()
-        script_data = await script_gen.generate_script(transcript, topic_hint)
-        
-        # Step 3: Create narration
-        narrator = Narrator()
-        narration_path = await narrator.create_narration(script_data['full_text'])
-        
-        # Step 4: Create animations
-        animator = VideoAnimator()
-        animation_path = await animator.create_animation(script_data)
-        
-        # Step 5: Merge video and audio
-        merger = VideoMerger()
-        final_video_path = await merger.merge_audio_video(animation_path, narration_path)
-        
-        # Step 6: Generate PDF
-        pdf_gen = PDFGenerator()
-        pdf_path = await pdf_gen.create_pdf(script_data)
+        # Transcript -> script -> narration, animation and PDF in parallel -> merge
+        graph = educational_video_graph(
+            AudioTranscriber(), ScriptGenerator(), Narrator(), VideoAnimator(), VideoMerger(), PDFGenerator(),
+            topic_hint=topic_hint,
+        )
+        timer = StageTimer()
+        results = await graph.run({"audio_path": audio_path}, tracker=timer)
+        transcript = results["transcript"]
+        script_data = results["script"]
+        final_video_path = results["merge"]
+        pdf_path = results["pdf"]
+        processed = True
         
         return JSONResponse({
             "video_path": os.path.abspath(final_video_path),
             "pdf_path": os.path.abspath(pdf_path),
             "transcript": transcript,
-            "title": script_data.get('title', 'Educational Video')
+            "title": script_data.get('title', 'Educational Video'),
+            "stage_durations": {name: round(d, 2) for name, d in timer.durations.items()}
         })
         
     except Exception as e:
-        return JSONResponse({"error": str(e)}, status_code=500)
+        # Keep the upload as a session so it can be retried with POST /session/{id}/process
+        from datetime import datetime
+        session_id = str(uuid.uuid4())
+        active_sessions[session_id] = SessionInfo(session_id=session_id, status="error", audio_path=audio_path,
+                                                  created_at=datetime.now().isoformat())
+        return JSONResponse({"error": str(e), "session_id": session_id,
+                             "process_url": f"/session/{session_id}/process"}, status_code=500)
     finally:
-        # Clean up temp audio file
-        if os.path.exists(audio_path):
+        # Clean up temp audio file once it has been processed (or copied to output)
+        if processed and os.path.exists(audio_path):
             os.unlink(audio_path)
 
 @app.get("/download/video/{filename}")
@@ -6,7 +6,6 @@ Transforms voice messages into animated educational videos and PDFs.
 import streamlit as st
 import os
 import tempfile
-import asyncio
 from pathlib import Path
 from typing import Optional, Tuple
 import io
@@ -18,6 +17,8 @@ from narrator import Narrator
 from animator import VideoAnimator
 from pdf_generator import PDFGenerator
 from video_merger import VideoMerger
+from stage_graph import StageTimer, educational_video_graph
+from openai_client import run_with_clients
 
 # Configure Streamlit page
 st.set_page_config(
@@ -60,57 +61,41 @@ class VoiceToEducationalApp:
         Returns:
             Tuple of (video_path, pdf_path)
         """
-        with st.spinner("🎙️ Transcribing audio..."):
+        with st.spinner("🎙️ Transcribing, scripting, narrating and animating..."):
             # Save uploaded file temporarily
             with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_audio:
                 tmp_audio.write(audio_file.read())
                 audio_path = tmp_audio.name
             
             try:
-                # Step 1: Transcribe audio
-                transcript = await self.transcriber.transcribe(audio_path)
-                st.success(f"✅ Transcription complete ({len(transcript)} characters)")
+                messages = {
+                    "transcript": "✅ Transcription complete",
+                    "script": "✅ Educational script generated",
+                    "narration": "✅ Narration audio created",
+                    "animation": "✅ Animations rendered",
+                    "merge": "✅ Final video created",
+                    "pdf": "✅ PDF transcript generated",
+                }
                 
-                # Display transcript
-                with st.expander("📝 View Transcript", expanded=False):
-                    st.text_area("Raw Transcript", transcript, height=200)
+                def show_result(stage: str, value):
+                    st.success(messages[stage])
+                    if stage == "transcript":
+                        with st.expander("📝 View Transcript", expanded=False):
+                            st.text_area("Raw Transcript", value, height=200)
+                    elif stage == "script":
+                        with st.expander("📚 View Educational Script", expanded=False):
+                            st.json(value)
                 
-                # Step 2: Generate structured script
-                with st.spinner("🧠 Generating educational script..."):
-                    script_data = await self.script_generator.generate_script(
-                        transcript, topic_hint
-                    )
-                    st.success("✅ Educational script generated")
-                
-                # Display script structure
-                with st.expander("📚 View Educational Script", expanded=False):
-                    st.json(script_data)
-                
-                # Step 3: Generate narration
-                with st.spinner("🎵 Creating narration audio..."):
-                    narration_path = await self.narrator.create_narration(
-                        script_data['full_text']
-                    )
-                    st.success("✅ Narration audio created")
-                
-                # Step 4: Create animations
-                with st.spinner("🎬 Generating 3Blue1Brown-style animations..."):
-                    animation_path = await self.animator.create_animation(script_data)
-                    st.success("✅ Animations rendered")
-                
-                # Step 5: Merge video and audio
-                with st.spinner("🎞️ Combining audio and visuals..."):
-                    final_video_path = await self.video_merger.merge_audio_video(
-                        animation_path, narration_path
-                    )
-                    st.success("✅ Final video created")
-                
-                # Step 6: Generate PDF
-                with st.spinner("📄 Creating PDF transcript..."):
-                    pdf_path = await self.pdf_generator.create_pdf(script_data)
-                    st.success("✅ PDF transcript generated")
+                # Transcript -> script -> narration, animation and PDF in parallel -> merge
+                graph = educational_video_graph(
+                    self.transcriber, self.script_generator, self.narrator, self.animator,
+                    self.video_merger, self.pdf_generator, topic_hint=topic_hint,
+                )
+                timer = StageTimer()
+                results = await graph.run({"audio_path": audio_path}, tracker=timer, on_result=show_result)
+                st.caption(" · ".join(f"{name} {duration:.1f}s" for name, duration in timer.durations.items()))
                 
-                return final_video_path, pdf_path
+                return results["merge"], results["pdf"]
                 
             finally:
                 # Clean up temporary audio file
@@ -196,7 +181,7 @@ def main():
                         app = VoiceToEducationalApp()
                         
                         # Process the audio
-                        video_path, pdf_path = asyncio.run(
+                        video_path, pdf_path = run_with_clients(
                             app.process_audio(uploaded_file, topic_hint)
                         )
                         
@@ -11,12 +11,17 @@ import time
 import signal
 import sys
 import subprocess
+import math
+import struct
+import wave
+from array import array
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 import logging
 import json
 import uuid
 import sys
+from collections import deque
 
 # Try different audio recording libraries based on Python version
 PYTHON_VERSION = sys.version_info
@@ -43,15 +48,153 @@ import subprocess
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class SilenceSegmenter:
+    """
+    Cuts a 16-bit PCM stream into rolling segments that end in a pause.
+
+    A segment is cut once it is at least `min_seconds` long and the audio has
+    been quiet for `min_silence_seconds`, or at `max_seconds` regardless.
+    """
+
+    def __init__(self, sample_rate: int, channels: int = 1, min_seconds: float = 30.0, max_seconds: float = 60.0,
+                 silence_rms: float = 500.0, min_silence_seconds: float = 0.3):
+        """
+        Initialize the segmenter.
+
+        Args:
+            sample_rate: Samples per second
+            channels: Number of channels
+            min_seconds: Shortest segment cut at a pause
+            max_seconds: Longest segment
+            silence_rms: RMS level (of 16-bit samples) below which a chunk counts as quiet
+            min_silence_seconds: Pause length that allows a cut
+        """
+        bytes_per_second = sample_rate * channels * 2
+        self.min_bytes = int(min_seconds * bytes_per_second)
+        self.max_bytes = int(max_seconds * bytes_per_second)
+        self.min_silence_bytes = int(min_silence_seconds * bytes_per_second)
+        self.silence_rms = silence_rms
+        self._buffer = bytearray()
+        self._quiet_bytes = 0
+
+    @staticmethod
+    def rms(data: bytes) -> float:
+        """Root mean square of 16-bit little-endian samples."""
+        samples = array('h')
+        samples.frombytes(data[:len(data) - len(data) % 2])
+        if sys.byteorder == 'big':
+            samples.byteswap()
+        return math.sqrt(sum(s * s for s in samples) / len(samples)) if samples else 0.0
+
+    def feed(self, data: bytes) -> Optional[bytes]:
+        """
+        Add audio.
+
+        Returns:
+            A finished segment's PCM, or None
+        """
+        self._buffer += data
+        # Loudness only matters once a cut is possible
+        if len(self._buffer) >= self.min_bytes - self.min_silence_bytes:
+            self._quiet_bytes = self._quiet_bytes + len(data) if self.rms(data) < self.silence_rms else 0
+        if len(self._buffer) >= self.max_bytes or (
+                len(self._buffer) >= self.min_bytes and self._quiet_bytes >= self.min_silence_bytes):
+            return self.flush()
+        return None
+
+    def flush(self) -> bytes:
+        """Return the buffered audio as the last segment and reset."""
+        segment = bytes(self._buffer)
+        self._buffer.clear()
+        self._quiet_bytes = 0
+        return segment
+
+
+class WavStreamWriter:
+    """
+    Writes 16-bit PCM to a WAV file as it is captured.
+
+    The header's size fields are rewritten every `finalize_seconds` of audio,
+    so the file on disk is a valid WAV of everything up to the last
+    finalization even if the process dies; memory use does not grow with the
+    recording's length.
+    """
+
+    HEADER_SIZE = 44
+
+    def __init__(self, path, sample_rate: int, channels: int = 1, finalize_seconds: float = 5.0):
+        """
+        Create the file.
+
+        Args:
+            path: WAV file to write
+            sample_rate: Samples per second
+            channels: Number of channels
+            finalize_seconds: Audio written between header updates
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.finalize_bytes = max(1, int(finalize_seconds * sample_rate * channels * 2))
+        self.data_bytes = 0
+        self._unfinalized = 0
+        self._file = open(path, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        block_align = self.channels * 2
+        self._file.write(struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + self.data_bytes, b'WAVE',
+            b'fmt ', 16, 1, self.channels, self.sample_rate, self.sample_rate * block_align, block_align, 16,
+            b'data', self.data_bytes))
+
+    def write(self, data: bytes):
+        """Append PCM, finalizing the header when enough audio has accumulated."""
+        self._file.write(data)
+        self.data_bytes += len(data)
+        self._unfinalized += len(data)
+        if self._unfinalized >= self.finalize_bytes:
+            self.finalize()
+
+    def finalize(self):
+        """Make the file on disk a complete WAV of the audio written so far."""
+        self._file.seek(0)
+        self._write_header()
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+        self._unfinalized = 0
+
+    @property
+    def seconds(self) -> float:
+        return self.data_bytes / (self.sample_rate * self.channels * 2)
+
+    def close(self):
+        if not self._file.closed:
+            self.finalize()
+            self._file.close()
+
+
 class AudioRecorder:
-    """Handles server-side real-time audio recording."""
+    """Handles server-side real-time audio recording of one capture session at a time."""
+    
+    # Device auto-detection probes the inputs; it runs once per process
+    _detected_device: Optional[str] = None
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", device_name: Optional[str] = None,
+                 input_stream_factory: Optional[Callable[[], Any]] = None):
         """
         Initialize the audio recorder.
         
         Args:
             output_dir: Directory to save recorded audio files
+            device_name: Input device (PyAudio device name, or the ffmpeg input:
+                         DirectShow name, avfoundation index or PulseAudio source);
+                         auto-detected if None
+            input_stream_factory: Returns a PyAudio-style input stream (`read(frames,
+                                  exception_on_overflow)`, `stop_stream()`, `close()`)
+                                  to record from instead of a device
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
@@ -68,8 +211,16 @@ class AudioRecorder:
         self.chunk_size = 1024
         self.audio_format = pyaudio.paInt16 if PYAUDIO_AVAILABLE else None
         
-        # Auto-detect best audio device
-        self.device_name = self._detect_audio_device()
+        # Capture source: a supplied input stream, or a device (auto-detected if not given)
+        self.input_stream_factory = input_stream_factory
+        self.recording_method = "stream" if input_stream_factory else RECORDING_METHOD
+        self.device_override = device_name
+        if input_stream_factory:
+            self.device_name = device_name or "input stream"
+        else:
+            if not device_name and AudioRecorder._detected_device is None:
+                AudioRecorder._detected_device = self._detect_audio_device()
+            self.device_name = device_name or AudioRecorder._detected_device
         
         # PyAudio instance
         self.audio = None
@@ -77,16 +228,32 @@ class AudioRecorder:
         
         # Subprocess recording
         self.ffmpeg_process = None
+        self.stderr_thread = None
+        self.ffmpeg_errors = deque(maxlen=20)  # last stderr lines of the ffmpeg process
+        
+        # Live segments: rolling WAV files handed to `on_segment` while recording
+        self.segment_min_seconds = float(os.getenv("LIVE_SEGMENT_MIN_SECONDS", "30"))
+        self.segment_max_seconds = float(os.getenv("LIVE_SEGMENT_MAX_SECONDS", "60"))
+        self.on_segment = None
+        self.segmenter = None
+        self.segment_count = 0
+        
+        # Seconds of audio between WAV header updates of the file being recorded
+        self.finalize_seconds = float(os.getenv("RECORDING_FINALIZE_SECONDS", "5"))
         
-        logger.info(f"AudioRecorder initialized with method: {RECORDING_METHOD}")
+        logger.info(f"AudioRecorder initialized with method: {self.recording_method}")
         logger.info(f"Using audio device: {self.device_name}")
     
-    async def start_recording(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+    async def start_recording(self, session_id: Optional[str] = None,
+                              on_segment: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Start audio recording.
         
         Args:
             session_id: Optional session identifier
+            on_segment: Called (from the capture thread) with the path of each rolling
+                        segment WAV, cut every 30-60 s at a pause; the last one is
+                        emitted before stop_recording returns
             
         Returns:
             Dict with session_id and status
@@ -106,9 +273,13 @@ class AudioRecorder:
         timestamp = int(time.time())
         filename = f"recording_{session_id}_{timestamp}.wav"
         self.current_file_path = self.output_dir / filename
+        self.on_segment = on_segment
+        self.segmenter = SilenceSegmenter(self.sample_rate, self.channels, self.segment_min_seconds,
+                                          self.segment_max_seconds) if on_segment else None
+        self.segment_count = 0
         
         try:
-            if RECORDING_METHOD == "pyaudio":
+            if self.recording_method in ("pyaudio", "stream"):
                 success = await self._start_pyaudio_recording()
             else:
                 success = await self._start_subprocess_recording()
@@ -151,7 +322,7 @@ class AudioRecorder:
             }
         
         try:
-            if RECORDING_METHOD == "pyaudio":
+            if self.recording_method in ("pyaudio", "stream"):
                 success = await self._stop_pyaudio_recording()
             else:
                 success = await self._stop_subprocess_recording()
@@ -174,6 +345,8 @@ class AudioRecorder:
                 self.current_session_id = None
                 current_path = self.current_file_path
                 self.current_file_path = None
+                self.on_segment = None
+                self.segmenter = None
                 
                 # Return the path for further processing
                 result["file_path"] = str(current_path)
@@ -203,24 +376,30 @@ class AudioRecorder:
             "is_recording": self.is_recording,
             "session_id": self.current_session_id,
             "file_path": str(self.current_file_path) if self.current_file_path else None,
-            "recording_method": RECORDING_METHOD,
+            "recording_method": self.recording_method,
+            "device": self.device_name,
             "pyaudio_available": PYAUDIO_AVAILABLE
         }
     
     async def _start_pyaudio_recording(self) -> bool:
-        """Start recording using PyAudio."""
+        """Start recording using PyAudio (or the supplied input stream)."""
         try:
-            self.audio = pyaudio.PyAudio()
-            
-            self.stream = self.audio.open(
-                format=self.audio_format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk_size
-            )
+            if self.input_stream_factory:
+                self.stream = self.input_stream_factory()
+            else:
+                self.audio = pyaudio.PyAudio()
+                
+                self.stream = self.audio.open(
+                    format=self.audio_format,
+                    channels=self.channels,
+                    rate=self.sample_rate,
+                    input=True,
+                    input_device_index=self._pyaudio_device_index(),
+                    frames_per_buffer=self.chunk_size
+                )
             
-            # Start recording thread
+            # Start recording thread (it runs while is_recording is set)
+            self.is_recording = True
             self.recording_thread = threading.Thread(target=self._pyaudio_recording_thread)
             self.recording_thread.daemon = True
             self.recording_thread.start()
@@ -229,6 +408,7 @@ class AudioRecorder:
             
         except Exception as e:
             logger.error(f"PyAudio recording start error: {e}")
+            self.is_recording = False
             return False
     
     async def _stop_pyaudio_recording(self) -> bool:
@@ -243,9 +423,9 @@ class AudioRecorder:
                 self.audio.terminate()
                 self.audio = None
             
-            # Wait for recording thread to finish
+            # Wait for recording thread to finish (without blocking the other sessions)
             if self.recording_thread and self.recording_thread.is_alive():
-                self.recording_thread.join(timeout=5.0)
+                await asyncio.to_thread(self.recording_thread.join, 5.0)
             
             return True
             
@@ -255,30 +435,86 @@ class AudioRecorder:
     
     def _pyaudio_recording_thread(self):
         """PyAudio recording thread function."""
-        frames = []
-        
         try:
-            while self.is_recording and self.stream:
-                try:
-                    data = self.stream.read(self.chunk_size, exception_on_overflow=False)
-                    frames.append(data)
-                except Exception as e:
-                    logger.error(f"Recording thread error: {e}")
-                    break
-            
-            # Save the recorded audio
-            if frames and self.current_file_path:
-                with wave.open(str(self.current_file_path), 'wb') as wf:
-                    wf.setnchannels(self.channels)
-                    wf.setsampwidth(self.audio.get_sample_size(self.audio_format))
-                    wf.setframerate(self.sample_rate)
-                    wf.writeframes(b''.join(frames))
-                
-                logger.info(f"Audio saved to: {self.current_file_path}")
+            writer = WavStreamWriter(self.current_file_path, self.sample_rate, self.channels, self.finalize_seconds)
+            try:
+                while self.is_recording and self.stream:
+                    try:
+                        data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+                    except Exception as e:
+                        logger.error(f"Recording thread error: {e}")
+                        break
+                    self._capture(writer, data)
+            finally:
+                self._finish_capture(writer)
             
         except Exception as e:
             logger.error(f"Recording thread error: {e}")
     
+    def _capture(self, writer: WavStreamWriter, data: bytes):
+        """Append captured PCM to the recording and the live segments."""
+        writer.write(data)
+        self._feed_segmenter(data)
+    
+    def _finish_capture(self, writer: WavStreamWriter):
+        """Complete the recording file and emit the last live segment."""
+        writer.close()
+        logger.info(f"Audio saved to: {writer.path} ({writer.seconds:.1f}s)")
+        self._flush_segmenter()
+    
+    def _feed_segmenter(self, data: bytes):
+        """Pass captured PCM to the segmenter and emit a segment when one is cut."""
+        if self.segmenter:
+            segment = self.segmenter.feed(data)
+            if segment:
+                self._emit_segment(segment)
+    
+    def _flush_segmenter(self):
+        """Emit the audio since the last cut as the final segment."""
+        if self.segmenter:
+            self._emit_segment(self.segmenter.flush())
+    
+    def _emit_segment(self, pcm: bytes):
+        """Write one segment WAV next to the recording and hand it to `on_segment`."""
+        # Whisper rejects clips under 0.1 s
+        if not self.on_segment or len(pcm) < self.sample_rate * self.channels * 2 // 10:
+            return
+        path = self.current_file_path.with_name(f"{self.current_file_path.stem}_part{self.segment_count:03d}.wav")
+        self.segment_count += 1
+        with wave.open(str(path), 'wb') as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(pcm)
+        logger.info(f"Live segment {self.segment_count}: {path} ({len(pcm) / (self.sample_rate * self.channels * 2):.1f}s)")
+        try:
+            self.on_segment(str(path))
+        except Exception as e:
+            logger.error(f"Segment callback error: {e}")
+    
+    def _ffmpeg_recording_thread(self, pcm_output):
+        """Read ffmpeg's raw PCM output until it exits and write it like the PyAudio thread does."""
+        try:
+            writer = WavStreamWriter(self.current_file_path, self.sample_rate, self.channels, self.finalize_seconds)
+            try:
+                while True:
+                    data = pcm_output.read(self.chunk_size * self.channels * 2)
+                    if not data:
+                        break
+                    self._capture(writer, data)
+            finally:
+                self._finish_capture(writer)
+        except Exception as e:
+            logger.error(f"Recording thread error: {e}")
+    
+    def _ffmpeg_stderr_thread(self, stderr):
+        """Drain ffmpeg's stderr so device warnings can never fill the pipe and stall the recording."""
+        for line in iter(stderr.readline, b''):
+            line = line.decode(errors='replace').rstrip()
+            if line:
+                self.ffmpeg_errors.append(line)
+                logger.warning(f"FFmpeg: {line}")
+    
     async def _start_subprocess_recording(self) -> bool:
         """Start recording using ffmpeg subprocess."""
         try:
@@ -291,32 +527,35 @@ class AudioRecorder:
                     '-acodec', 'pcm_s16le',
                     '-ar', str(self.sample_rate),
                     '-ac', str(self.channels),
-                    '-y',  # Overwrite output file
-                    str(self.current_file_path)
+                    '-f', 's16le',  # Raw PCM on stdout
+                    'pipe:1'
                 ]
             elif sys.platform == 'darwin':  # macOS
                 cmd = [
                     'ffmpeg',
                     '-f', 'avfoundation',
-                    '-i', ':0',  # Default audio input
+                    '-i', self.device_override or ':0',  # Default audio input
                     '-acodec', 'pcm_s16le',
                     '-ar', str(self.sample_rate),
                     '-ac', str(self.channels),
-                    '-y',
-                    str(self.current_file_path)
+                    '-f', 's16le',
+                    'pipe:1'
                 ]
             else:  # Linux
                 cmd = [
                     'ffmpeg',
                     '-f', 'pulse',
-                    '-i', 'default',  # Default audio input
+                    '-i', self.device_override or 'default',  # Default audio input
                     '-acodec', 'pcm_s16le',
                     '-ar', str(self.sample_rate),
                     '-ac', str(self.channels),
-                    '-y',
-                    str(self.current_file_path)
+                    '-f', 's16le',
+                    'pipe:1'
                 ]
             
+            # No progress output and only errors on stderr, which is drained by its own thread
+            cmd[1:1] = ['-nostats', '-loglevel', 'error']
+            
             logger.info(f"Starting FFmpeg with command: {' '.join(cmd)}")
             
             # Start ffmpeg process
@@ -328,6 +567,17 @@ class AudioRecorder:
                 creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0
             )
             
+            # The recording thread writes the WAV incrementally (and cuts the live segments),
+            # so the file stays valid even if ffmpeg is terminated
+            self.recording_thread = threading.Thread(target=self._ffmpeg_recording_thread,
+                                                     args=(self.ffmpeg_process.stdout,))
+            self.recording_thread.daemon = True
+            self.recording_thread.start()
+            self.ffmpeg_errors.clear()
+            self.stderr_thread = threading.Thread(target=self._ffmpeg_stderr_thread,
+                                                  args=(self.ffmpeg_process.stderr,), daemon=True)
+            self.stderr_thread.start()
+            
             # Give FFmpeg a moment to start
             await asyncio.sleep(1)
             
@@ -337,8 +587,9 @@ class AudioRecorder:
                 return True
             else:
                 # Process ended, check error
-                stdout, stderr = self.ffmpeg_process.communicate()
-                logger.error(f"FFmpeg failed to start: {stderr.decode() if stderr else 'Unknown error'}")
+                await asyncio.to_thread(self.stderr_thread.join, 5.0)
+                logger.error(f"FFmpeg failed to start: {' '.join(self.ffmpeg_errors) or 'Unknown error'}")
+                self.ffmpeg_process = None
                 return False
             
         except Exception as e:
@@ -369,24 +620,25 @@ class AudioRecorder:
                         self.ffmpeg_process.terminate()
                         logger.info("Terminated FFmpeg process")
                 
-                # Wait for process to finish
+                # The recording thread reads stdout until ffmpeg exits, then completes the file
+                if self.recording_thread and self.recording_thread.is_alive():
+                    await asyncio.to_thread(self.recording_thread.join, 10.0)
+                
+                # Wait for process to finish (stdout and stderr are read by their threads)
                 try:
-                    stdout, stderr = self.ffmpeg_process.communicate(timeout=5)
+                    await asyncio.to_thread(self.ffmpeg_process.wait, 5)
                     logger.info("FFmpeg process ended gracefully")
                 except subprocess.TimeoutExpired:
                     # Force terminate if it doesn't stop gracefully
                     self.ffmpeg_process.kill()
-                    stdout, stderr = self.ffmpeg_process.communicate()
+                    await asyncio.to_thread(self.ffmpeg_process.wait)
                     logger.warning("FFmpeg process killed forcefully")
-                
-                # Log any errors for debugging
-                if stderr:
-                    logger.info(f"FFmpeg stderr: {stderr.decode()[:200]}...")
+                if self.stderr_thread:
+                    await asyncio.to_thread(self.stderr_thread.join, 5.0)
+                if self.ffmpeg_process.stdin:
+                    self.ffmpeg_process.stdin.close()
                 
                 self.ffmpeg_process = None
-                
-                # Wait a moment for file to be written
-                await asyncio.sleep(1)
             
             return True
             
@@ -408,6 +660,16 @@ class AudioRecorder:
         else:
             return self._detect_ffmpeg_device()
     
+    def _pyaudio_device_index(self) -> Optional[int]:
+        """Index of the requested PyAudio input device, or None for the default."""
+        if not self.device_override:
+            return None
+        for index in range(self.audio.get_device_count()):
+            info = self.audio.get_device_info_by_index(index)
+            if info.get('maxInputChannels', 0) > 0 and info['name'] == self.device_override:
+                return index
+        raise ValueError(f"Audio input device not found: {self.device_override}")
+    
     def _detect_pyaudio_device(self) -> str:
         """Detect audio device using PyAudio."""
         try:
@@ -527,3 +789,102 @@ class AudioRecorder:
                 self.ffmpeg_process = None
             except:
                 pass
+
+
+class RecorderManager:
+    """
+    Runs independent recording sessions at once, keyed by session id.
+
+    Every session has its own AudioRecorder, bound to its own device or input
+    stream, with its own capture thread or ffmpeg process.
+    """
+    
+    def __init__(self, output_dir: str = "output", max_sessions: Optional[int] = None):
+        """
+        Initialize the recorder manager.
+        
+        Args:
+            output_dir: Directory to save recorded audio files
+            max_sessions: Maximum number of concurrent recordings (MAX_RECORDING_SESSIONS, default 8)
+        """
+        self.output_dir = output_dir
+        self.max_sessions = max_sessions or int(os.getenv("MAX_RECORDING_SESSIONS", "8"))
+        self.recorders: Dict[str, AudioRecorder] = {}
+    
+    async def start_recording(self, session_id: Optional[str] = None, device: Optional[str] = None,
+                              on_segment: Optional[Callable[[str], None]] = None,
+                              input_stream_factory: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """
+        Start a recording session.
+        
+        Args:
+            session_id: Optional session identifier (generated if None)
+            device: Input device of this session (auto-detected default if None)
+            on_segment: Live segment callback (see AudioRecorder.start_recording)
+            input_stream_factory: Record from this input stream instead of a device
+            
+        Returns:
+            Dict with session_id and status
+        """
+        session_id = session_id or str(uuid.uuid4())
+        if session_id in self.recorders:
+            return {"status": "error", "message": "Session is already recording", "session_id": session_id}
+        if len(self.recorders) >= self.max_sessions:
+            return {
+                "status": "error",
+                "message": f"Maximum of {self.max_sessions} concurrent recordings reached",
+                "session_id": session_id
+            }
+        if device and any(r.device_override == device for r in self.recorders.values()):
+            return {"status": "error", "message": f"Device in use by another session: {device}", "session_id": session_id}
+        
+        recorder = AudioRecorder(self.output_dir, device_name=device, input_stream_factory=input_stream_factory)
+        # Reserve the session while the capture starts
+        self.recorders[session_id] = recorder
+        result = await recorder.start_recording(session_id, on_segment=on_segment)
+        if result["status"] != "success":
+            del self.recorders[session_id]
+        return result
+    
+    async def stop_recording(self, session_id: str) -> Dict[str, Any]:
+        """
+        Stop a recording session.
+        
+        Returns:
+            Dict with file path and status (see AudioRecorder.stop_recording)
+        """
+        recorder = self.recorders.pop(session_id, None)
+        if not recorder:
+            return {"status": "error", "message": "No recording in progress for this session", "session_id": session_id}
+        result = await recorder.stop_recording()
+        result.setdefault("session_id", session_id)
+        return result
+    
+    async def stop_all(self):
+        """Stop every recording (e.g. on shutdown)."""
+        for session_id in list(self.recorders):
+            await self.stop_recording(session_id)
+    
+    async def get_recording_status(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the status of one session, or of all recordings if `session_id` is None.
+        
+        Returns:
+            Dict with recording status and session info
+        """
+        if session_id:
+            recorder = self.recorders.get(session_id)
+            if not recorder:
+                return {"is_recording": False, "session_id": session_id}
+            return await recorder.get_recording_status()
+        
+        sessions = [await recorder.get_recording_status() for recorder in self.recorders.values()]
+        return {
+            "is_recording": bool(sessions),
+            "session_id": sessions[0]["session_id"] if len(sessions) == 1 else None,
+            "active_recordings": len(sessions),
+            "max_sessions": self.max_sessions,
+            "sessions": sessions,
+            "recording_method": RECORDING_METHOD,
+            "pyaudio_available": PYAUDIO_AVAILABLE
+        }
@@ -0,0 +1,172 @@
+"""
+Streaming Audio Tools
+ffprobe/ffmpeg replacements for whole-file pydub operations: duration, speed
+(pitch-preserving atempo), loudness normalization, concatenation with pauses
+and background music mixing. ffmpeg streams the audio through its filters,
+so memory use does not grow with the file length.
+"""
+
+import os
+import re
+import json
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Loudness target of normalize (integrated loudness, LUFS)
+NORMALIZE_LUFS = -20.0
+
+# Format used to join narrations whose rate/layout cannot be probed (gTTS output)
+DEFAULT_SAMPLE_RATE = 24000
+DEFAULT_CHANNEL_LAYOUT = "mono"
+
+
+def ffmpeg_available() -> bool:
+    """True if both ffmpeg and ffprobe are on the PATH."""
+    return bool(shutil.which("ffmpeg") and shutil.which("ffprobe"))
+
+
+def run_ffmpeg(args: List[str]):
+    """Run ffmpeg with `args` (quiet, overwriting), raising RuntimeError on failure."""
+    result = subprocess.run(['ffmpeg', '-hide_banner', '-nostdin', '-nostats', '-loglevel', 'error', '-y', *args],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()}")
+
+
+def probe_audio(audio_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read an audio file's header with ffprobe (no decoding).
+
+    Returns:
+        {"duration", "sample_rate", "channel_layout"}, or None if it cannot be read
+    """
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format',
+             '-show_streams', '-select_streams', 'a:0', audio_path],
+            capture_output=True, text=True)
+    except FileNotFoundError:  # ffprobe not installed
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        info = json.loads(result.stdout)
+        stream = (info.get('streams') or [{}])[0]
+        duration = info.get('format', {}).get('duration', stream.get('duration'))
+        channels = int(stream.get('channels', 1))
+        return {
+            "duration": float(duration),
+            "sample_rate": int(stream.get('sample_rate', DEFAULT_SAMPLE_RATE)),
+            "channel_layout": stream.get('channel_layout') or ("mono" if channels == 1 else "stereo"),
+        }
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def atempo_filter(speed: float) -> str:
+    """
+    atempo chain for a speed multiplier.
+
+    A single atempo stage accepts 0.5-2.0 (older ffmpeg); larger changes are
+    split into stages whose product is `speed`.
+    """
+    if speed <= 0:
+        raise ValueError(f"Speed must be positive: {speed}")
+    stages = []
+    while speed > 2.0:
+        stages.append(2.0)
+        speed /= 2.0
+    while speed < 0.5:
+        stages.append(0.5)
+        speed /= 0.5
+    stages.append(speed)
+    return ",".join(f"atempo={stage:.6g}" for stage in stages)
+
+
+def speed_args(input_path: str, output_path: str, speed: float) -> List[str]:
+    """ffmpeg arguments changing tempo without changing pitch."""
+    return ['-i', input_path, '-af', atempo_filter(speed), '-vn', output_path]
+
+
+def normalize_args(input_path: str, output_path: str, sample_rate: int,
+                   target_lufs: float = NORMALIZE_LUFS) -> List[str]:
+    """
+    ffmpeg arguments normalizing loudness (single-pass EBU R128 loudnorm).
+
+    loudnorm resamples to 192 kHz internally, so the original rate is restored.
+    """
+    return ['-i', input_path, '-af', f"loudnorm=I={target_lufs:g}:TP=-1.5:LRA=11",
+            '-ar', str(sample_rate), '-vn', output_path]
+
+
+def concat_args(input_paths: List[str], output_path: str, pause_duration: float,
+                sample_rate: int = DEFAULT_SAMPLE_RATE,
+                channel_layout: str = DEFAULT_CHANNEL_LAYOUT) -> List[str]:
+    """
+    ffmpeg arguments joining files with `pause_duration` seconds of silence between them.
+
+    Inputs are converted to one rate and layout (the concat filter needs them to
+    match) and every input but the last is padded with silence.
+    """
+    args: List[str] = []
+    filters = []
+    for index, path in enumerate(input_paths):
+        args += ['-i', path]
+        chain = f"[{index}:a]aformat=sample_fmts=fltp:sample_rates={sample_rate}:channel_layouts={channel_layout}"
+        if pause_duration > 0 and index < len(input_paths) - 1:
+            chain += f",apad=pad_dur={pause_duration:g}"
+        filters.append(f"{chain}[a{index}]")
+    labels = "".join(f"[a{index}]" for index in range(len(input_paths)))
+    filters.append(f"{labels}concat=n={len(input_paths)}:v=0:a=1[out]")
+    return args + ['-filter_complex', ";".join(filters), '-map', '[out]', output_path]
+
+
+def filter_path(path: str) -> str:
+    """
+    A file path escaped for use as a filter option inside -filter_complex
+    (option-value escaping, then filtergraph escaping).
+    """
+    value = re.sub(r"([\\':])", r"\\\1", os.path.abspath(path))
+    return re.sub(r"([\\'\[\],;])", r"\\\1", value)
+
+
+def mix_args(narration_path: str, music_path: str, output_path: str, music_gain_db: float) -> List[str]:
+    """
+    ffmpeg arguments laying looped background music under a narration.
+
+    The music is read by the amovie filter, which loops it by seeking back to
+    its start, and is cut when the narration ends (amix duration=first); the
+    narration level is left unchanged. `-stream_loop -1` is not used: ffmpeg
+    6.0 deadlocks when an endless input is mixed with one that ends.
+    """
+    return ['-i', narration_path,
+            '-filter_complex',
+            f"amovie={filter_path(music_path)}:loop=0,asetpts=N/SR/TB,volume={music_gain_db:g}dB[music];"
+            f"[0:a][music]amix=inputs=2:duration=first:dropout_transition=0:normalize=0[out]",
+            '-map', '[out]', output_path]
+
+
+def replace_with(audio_path: str, make_args) -> str:
+    """
+    Rewrite `audio_path` in place: `make_args(tmp_path)` builds the ffmpeg
+    arguments writing a temporary file next to it, which then replaces it.
+    """
+    path = Path(audio_path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}_", suffix=path.suffix)
+    os.close(fd)
+    try:
+        run_ffmpeg(make_args(tmp_path))
+        os.replace(tmp_path, audio_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return audio_path
@@ -0,0 +1,215 @@
+"""
+Silence-Aware Chunked Transcription
+Splits long recordings at detected silences into bounded chunks and
+transcribes them concurrently, instead of re-encoding the whole lecture into
+one low-bitrate upload.
+"""
+
+import os
+import re
+import shutil
+import asyncio
+import tempfile
+from typing import Awaitable, Callable, List, Optional, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Whisper API upload limit
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def parse_silences(ffmpeg_log: str) -> List[Tuple[float, float]]:
+    """
+    Parse the output of ffmpeg's silencedetect filter.
+
+    Args:
+        ffmpeg_log: ffmpeg stderr
+
+    Returns:
+        List of (start, end) silences in seconds
+    """
+    silences = []
+    start = None
+    for line in ffmpeg_log.splitlines():
+        match = _SILENCE_START.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = _SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def plan_chunks(duration: float, silences: List[Tuple[float, float]], max_chunk_seconds: float,
+                min_chunk_fraction: float = 0.5) -> List[Tuple[float, float]]:
+    """
+    Choose chunk boundaries at silences.
+
+    Each chunk ends at the middle of the latest silence that keeps it within
+    `max_chunk_seconds` (and at least `min_chunk_fraction` of it long); with
+    no silence in that window the chunk is cut at `max_chunk_seconds`.
+
+    Args:
+        duration: Length of the audio in seconds
+        silences: (start, end) silences in seconds
+        max_chunk_seconds: Upper bound of a chunk's length
+        min_chunk_fraction: Shortest chunk (as a fraction of the bound) cut at a silence
+
+    Returns:
+        List of (start, end) chunks covering the whole audio
+    """
+    cut_points = sorted((start + end) / 2 for start, end in silences)
+    chunks = []
+    start = 0.0
+    while duration - start > max_chunk_seconds:
+        earliest = start + max_chunk_seconds * min_chunk_fraction
+        latest = start + max_chunk_seconds
+        candidates = [t for t in cut_points if earliest <= t <= latest]
+        end = candidates[-1] if candidates else latest
+        chunks.append((start, end))
+        start = end
+    chunks.append((start, duration))
+    return chunks
+
+
+async def transcribe_chunks(chunk_paths: List[str], transcribe_file: Callable[[str, Optional[str]], Awaitable[str]],
+                            concurrency: int = 4, prompt: Optional[str] = None, tail_chars: int = 200) -> str:
+    """
+    Transcribe chunks concurrently and stitch the text in order.
+
+    The chunks are split into `concurrency` contiguous runs that are
+    transcribed in parallel. Within a run, each chunk is prompted with the
+    tail of the previous chunk's text so wording and spelling carry across the
+    cut; the first chunk of every run gets `prompt`.
+
+    Args:
+        chunk_paths: Chunk files in playback order
+        transcribe_file: Coroutine function (path, prompt) -> text
+        concurrency: Maximum number of chunks in flight
+        prompt: Prompt for the first chunk of each run
+        tail_chars: Characters of the previous chunk's text used as the next prompt
+
+    Returns:
+        The stitched transcript
+    """
+    texts: List[str] = [""] * len(chunk_paths)
+    runs = max(1, min(concurrency, len(chunk_paths)))
+    bounds = [round(i * len(chunk_paths) / runs) for i in range(runs + 1)]
+
+    async def transcribe_run(first: int, last: int):
+        run_prompt = prompt
+        for index in range(first, last):
+            texts[index] = (await transcribe_file(chunk_paths[index], run_prompt)).strip()
+            run_prompt = texts[index][-tail_chars:] or prompt
+
+    await asyncio.gather(*(transcribe_run(bounds[i], bounds[i + 1]) for i in range(runs)))
+    return " ".join(text for text in texts if text)
+
+
+class AudioChunker:
+    """Detects silences with ffmpeg and cuts long audio into chunks for transcription."""
+
+    def __init__(self, max_chunk_seconds: Optional[float] = None, concurrency: Optional[int] = None,
+                 silence_db: float = -35.0, min_silence_seconds: float = 0.5):
+        """
+        Initialize the chunker.
+
+        Args:
+            max_chunk_seconds: Upper bound of a chunk's length (TRANSCRIBE_CHUNK_SECONDS, default 600)
+            concurrency: Chunks transcribed at once (TRANSCRIBE_CONCURRENCY, default 4)
+            silence_db: Level below which audio counts as silence
+            min_silence_seconds: Shortest pause used as a cut point
+        """
+        self.max_chunk_seconds = max_chunk_seconds or float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "600"))
+        self.concurrency = concurrency or int(os.getenv("TRANSCRIBE_CONCURRENCY", "4"))
+        self.silence_db = silence_db
+        self.min_silence_seconds = min_silence_seconds
+        self.available = bool(shutil.which("ffmpeg") and shutil.which("ffprobe"))
+
+    async def _run(self, *args: str) -> Tuple[int, str, str]:
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
+        return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+    async def duration(self, audio_path: str) -> Optional[float]:
+        """Length of the audio in seconds (ffprobe), or None if it cannot be read."""
+        code, out, _ = await self._run("ffprobe", "-v", "error", "-show_entries", "format=duration",
+                                       "-of", "default=noprint_wrappers=1:nokey=1", audio_path)
+        try:
+            return float(out.strip()) if code == 0 else None
+        except ValueError:
+            return None
+
+    async def needs_chunking(self, audio_path: str) -> bool:
+        """True if the file is over the upload limit or longer than one chunk."""
+        if not self.available or not os.path.exists(audio_path):
+            return False
+        if os.path.getsize(audio_path) > MAX_UPLOAD_BYTES:
+            return True
+        duration = await self.duration(audio_path)
+        return duration is not None and duration > self.max_chunk_seconds
+
+    async def detect_silences(self, audio_path: str) -> List[Tuple[float, float]]:
+        """Run ffmpeg's silencedetect over the file (streamed, constant memory)."""
+        _, _, log = await self._run(
+            "ffmpeg", "-hide_banner", "-nostats", "-i", audio_path,
+            "-af", f"silencedetect=noise={self.silence_db}dB:d={self.min_silence_seconds}",
+            "-f", "null", "-")
+        return parse_silences(log)
+
+    async def split(self, audio_path: str, output_dir: str) -> List[str]:
+        """
+        Cut the audio into chunks at silences.
+
+        Chunks are 16 kHz mono FLAC: lossless at the rate Whisper works at,
+        and small enough for the upload limit at the default chunk length.
+
+        Returns:
+            Chunk file paths in playback order
+        """
+        duration = await self.duration(audio_path)
+        if duration is None:
+            raise RuntimeError(f"Could not read the duration of {audio_path}")
+        chunks = plan_chunks(duration, await self.detect_silences(audio_path), self.max_chunk_seconds)
+        logger.info(f"Splitting {duration:.0f}s of audio into {len(chunks)} chunks at silences")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def extract(index: int, start: float, end: float) -> str:
+            path = os.path.join(output_dir, f"chunk_{index:04d}.flac")
+            async with semaphore:
+                code, _, err = await self._run(
+                    "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+                    "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", audio_path,
+                    "-ac", "1", "-ar", "16000", "-c:a", "flac", path)
+            if code != 0:
+                raise RuntimeError(f"ffmpeg failed to extract chunk {index}: {err.strip()}")
+            return path
+
+        return list(await asyncio.gather(*(extract(i, s, e) for i, (s, e) in enumerate(chunks))))
+
+    async def transcribe(self, audio_path: str, transcribe_file: Callable[[str, Optional[str]], Awaitable[str]],
+                         prompt: Optional[str] = None) -> str:
+        """
+        Split `audio_path` at silences and transcribe the chunks concurrently.
+
+        Args:
+            audio_path: Path to the audio file
+            transcribe_file: Coroutine function (path, prompt) -> text for one chunk
+            prompt: Optional prompt for the start of the recording
+
+        Returns:
+            The stitched transcript
+        """
+        with tempfile.TemporaryDirectory(prefix="transcribe_chunks_") as output_dir:
+            chunk_paths = await self.split(audio_path, output_dir)
+            return await transcribe_chunks(chunk_paths, transcribe_file, self.concurrency, prompt)
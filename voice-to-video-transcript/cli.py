@@ -4,7 +4,6 @@ Provides command-line access to the video generation pipeline.
 """
 
 import argparse
-import asyncio
 import os
 import sys
 from pathlib import Path
@@ -20,6 +19,8 @@ from narrator import Narrator
 from animator import VideoAnimator
 from pdf_generator import PDFGenerator
 from video_merger import VideoMerger
+from stage_graph import StageTimer, educational_video_graph
+from openai_client import run_with_clients
 
 # Load environment variables
 try:
@@ -64,41 +65,20 @@ class VoiceToVideoProcessor:
         try:
             logger.info(f"Processing audio file: {audio_path}")
             
-            # Step 1: Transcribe audio
-            logger.info("Step 1/6: Transcribing audio...")
-            transcript = await self.transcriber.transcribe(audio_path)
-            logger.info(f"Transcription complete ({len(transcript)} characters)")
-            
-            # Step 2: Generate educational script
-            logger.info("Step 2/6: Generating educational script...")
-            script_data = await self.script_generator.generate_script(transcript, topic_hint)
-            logger.info("Educational script generated")
-            
-            # Step 3: Create narration
-            logger.info("Step 3/6: Creating narration audio...")
-            narration_path = await self.narrator.create_narration(script_data['full_text'])
-            logger.info("Narration audio created")
-            
-            # Step 4: Create animation
-            logger.info("Step 4/6: Generating animations...")
+            # Transcript -> script -> narration, animation and PDF in parallel -> merge
             self.animator.quality = f"{video_quality}_quality"
-            animation_path = await self.animator.create_animation(script_data)
-            logger.info("Animations rendered")
-            
-            # Step 5: Merge video and audio
-            logger.info("Step 5/6: Combining audio and visuals...")
-            final_video_path = await self.video_merger.merge_audio_video(
-                animation_path, narration_path, output_path
+            graph = educational_video_graph(
+                self.transcriber, self.script_generator, self.narrator, self.animator, self.video_merger,
+                pdf_generator=self.pdf_generator if generate_pdf else None,
+                topic_hint=topic_hint, output_path=output_path,
             )
-            logger.info("Final video created")
-            
-            # Step 6: Generate PDF (optional)
-            pdf_path = None
-            if generate_pdf:
-                logger.info("Step 6/6: Creating PDF transcript...")
-                pdf_path = await self.pdf_generator.create_pdf(script_data)
-                logger.info("PDF transcript generated")
+            timer = StageTimer()
+            results = await graph.run({"audio_path": audio_path}, tracker=timer)
+            final_video_path = results["merge"]
+            pdf_path = results.get("pdf")
             
+            for name, duration in timer.durations.items():
+                logger.info(f"  {name:<12}{duration:8.2f}s")
             logger.info("✅ Processing complete!")
             return final_video_path, pdf_path
             
@@ -322,7 +302,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        exit_code = asyncio.run(main())
+        exit_code = run_with_clients(main())
         sys.exit(exit_code)
     except KeyboardInterrupt:
         print("\n⚠️ Operation cancelled by user")
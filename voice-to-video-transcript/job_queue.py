@@ -0,0 +1,208 @@
+"""
+Background Job Queue
+Runs long processing pipelines on a bounded pool of asyncio workers and keeps
+per-stage progress and partial results that clients can poll or subscribe to.
+"""
+
+import asyncio
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass
+class Job:
+    """A queued pipeline run with per-stage status and partial results."""
+    job_id: str
+    session_id: Optional[str] = None
+    status: str = "queued"  # "queued", "running", "completed", "error"
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _subscribers: List[asyncio.Queue] = field(default_factory=list, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "error")
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Track one pipeline stage: marks it running, then completed (with its
+        duration) or error. Exceptions are recorded and re-raised.
+
+        Args:
+            name: Stage name (e.g. "transcription")
+        """
+        start = time.time()
+        self.stages[name] = {"status": "running", "started_at": start}
+        self._notify()
+        try:
+            yield
+        except Exception as e:
+            self.stages[name].update(status="error", error=str(e), duration=round(time.time() - start, 3))
+            self._notify()
+            raise
+        self.stages[name].update(status="completed", duration=round(time.time() - start, 3))
+        self._notify()
+
+    def skip_stage(self, name: str, reason: str):
+        """Record a stage that was not run."""
+        self.stages[name] = {"status": "skipped", "reason": reason}
+        self._notify()
+
+    def update_result(self, **partial):
+        """Publish partial results (e.g. the transcript before the video is ready)."""
+        self.result.update(partial)
+        self._notify()
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Subscribe to progress updates.
+
+        Returns:
+            Queue receiving a `to_dict()` snapshot after every change; None marks the end
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait(self.to_dict())
+        if self.done:
+            queue.put_nowait(None)
+        else:
+            self._subscribers.append(queue)
+        return queue
+
+    def _notify(self):
+        snapshot = self.to_dict()
+        for queue in self._subscribers:
+            queue.put_nowait(snapshot)
+        if self.done:
+            for queue in self._subscribers:
+                queue.put_nowait(None)
+            self._subscribers.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "stages": {name: dict(info) for name, info in self.stages.items()},
+            "result": dict(self.result),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """Bounded queue of jobs processed by a fixed number of asyncio workers."""
+
+    def __init__(self, workers: int = 2, max_pending: int = 50, max_finished: int = 200):
+        """
+        Initialize the job queue.
+
+        Args:
+            workers: Number of jobs processed concurrently
+            max_pending: Maximum number of queued jobs waiting for a worker
+            max_finished: Finished jobs kept for status queries
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Start the worker tasks on the running event loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Job queue started with {self.workers} workers")
+
+    async def stop(self):
+        """Cancel the workers (running jobs are interrupted)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, func: Callable[..., Awaitable[Any]], *args, session_id: Optional[str] = None, **kwargs) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            func: Coroutine function called as `func(job, *args, **kwargs)`; its
+                  return value (a dict) becomes part of the job result
+            session_id: Session the job belongs to
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFull: If `max_pending` jobs are already waiting
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not started")
+        job = Job(job_id=uuid.uuid4().hex[:12], session_id=session_id)
+        try:
+            self._queue.put_nowait((job, func, args, kwargs))
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"{self.max_pending} jobs are already waiting") from None
+        self.jobs[job.job_id] = job
+        self._prune()
+        logger.info(f"Queued job {job.job_id} (session {session_id}, {self._queue.qsize()} waiting)")
+        return job
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        return self.jobs.get(job_id) if job_id else None
+
+    def stats(self) -> Dict[str, int]:
+        counts = {"queued": 0, "running": 0, "completed": 0, "error": 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        counts["workers"] = self.workers
+        return counts
+
+    async def _worker(self, index: int):
+        while True:
+            job, func, args, kwargs = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            job._notify()
+            try:
+                result = await func(job, *args, **kwargs)
+                if isinstance(result, dict):
+                    job.result.update(result)
+                job.status = "completed"
+            except asyncio.CancelledError:
+                job.status, job.error = "error", "cancelled"
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.job_id} failed: {e}")
+                job.status, job.error = "error", str(e)
+            finally:
+                job.finished_at = time.time()
+                job._notify()
+                self._queue.task_done()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond `max_finished`."""
+        finished = [job for job in self.jobs.values() if job.done]
+        for job in sorted(finished, key=lambda j: j.created_at)[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job.job_id]
@@ -0,0 +1,101 @@
+"""
+Live Transcription
+Transcribes the rolling audio segments a recording emits while it is still in
+progress, so the transcript is (nearly) complete when the recording stops.
+"""
+
+import os
+import asyncio
+from typing import List, Optional
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LiveTranscriber:
+    """
+    Transcribes recording segments in arrival order in a background task.
+
+    Each segment is prompted with the tail of the previous segment's text, so
+    wording carries across the cuts. `submit` may be called from any thread
+    (the recorder's capture thread); create the transcriber on the event loop
+    that should run the transcriptions.
+    """
+
+    def __init__(self, transcriber, language: Optional[str] = None, prompt: Optional[str] = None,
+                 tail_chars: int = 200, delete_segments: bool = True):
+        """
+        Initialize the live transcriber and start its worker task.
+
+        Args:
+            transcriber: Object with `async transcribe(path, language=None, prompt=None)`
+                         (AudioTranscriber or AudioTranscriberPy313); also used as the
+                         fallback for the full recording
+            language: Language code - auto-detected if None
+            prompt: Prompt for the first segment
+            tail_chars: Characters of the previous segment's text used as the next prompt
+            delete_segments: Remove segment files once transcribed
+        """
+        self.transcriber = transcriber
+        self.language = language
+        self.prompt = prompt
+        self.tail_chars = tail_chars
+        self.delete_segments = delete_segments
+
+        self.texts: List[str] = []
+        self.failed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    @property
+    def transcript(self) -> str:
+        """Transcript of the segments transcribed so far."""
+        return " ".join(text for text in self.texts if text)
+
+    def submit(self, segment_path: str):
+        """Queue a finished segment (thread-safe)."""
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, segment_path)
+
+    async def _run(self):
+        prompt = self.prompt
+        while True:
+            segment_path = await self._queue.get()
+            if segment_path is None:
+                break
+            try:
+                text = (await self.transcriber.transcribe(segment_path, self.language, prompt)).strip()
+                self.texts.append(text)
+                prompt = text[-self.tail_chars:] or prompt
+                logger.info(f"Live transcription: segment {len(self.texts)} done ({len(text)} characters)")
+            except Exception as e:
+                # A gap would corrupt the transcript; finish() falls back to the full recording
+                logger.error(f"Live transcription of {segment_path} failed: {e}")
+                self.failed = True
+            finally:
+                if self.delete_segments and os.path.exists(segment_path):
+                    os.unlink(segment_path)
+
+    async def finish(self) -> Optional[str]:
+        """
+        Wait for the queued segments and stop the worker.
+
+        Returns:
+            The stitched transcript, or None if a segment failed
+        """
+        self._queue.put_nowait(None)
+        await self._worker
+        return None if self.failed else self.transcript
+
+    async def transcribe(self, audio_path: str, language: Optional[str] = None, prompt: Optional[str] = None) -> str:
+        """
+        Transcriber interface for the pipeline: the live transcript, or a full
+        transcription of `audio_path` if live transcription failed.
+        """
+        transcript = await self.finish()
+        if transcript is None:
+            logger.warning("Live transcript incomplete - transcribing the full recording")
+            return await self.transcriber.transcribe(audio_path, language or self.language, prompt or self.prompt)
+        return transcript
@@ -5,10 +5,10 @@ This module uses an LLM to generate Manim animation code based on scene text.
 """
 
 import os
-import openai
 from typing import Optional
+from openai_client import get_async_client
 
-def generate_manim_code(scene_text: str, api_key: Optional[str] = None) -> str:
+async def generate_manim_code(scene_text: str, api_key: Optional[str] = None) -> str:
     """
     Generates Manim scene code from text using an LLM.
 
@@ -40,8 +40,6 @@ def generate_manim_code(scene_text: str, api_key: Optional[str] = None) -> str:
     self.wait(2)'''
 
     try:
-        openai.api_key = api_key
-        
         prompt = f"""
         You are an expert Manim programmer. Your task is to generate the Python code for the `construct` method of a Manim `Scene` to create a compelling, 3Blue1Brown-style educational animation.
 
@@ -81,7 +79,7 @@ def generate_manim_code(scene_text: str, api_key: Optional[str] = None) -> str:
         Now, generate the `construct` method for the provided text.
         """
 
-        response = openai.ChatCompletion.create(
+        response = await get_async_client(api_key).chat.completions.create(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are a Manim programming expert."},
@@ -89,7 +87,7 @@ def generate_manim_code(scene_text: str, api_key: Optional[str] = None) -> str:
             ]
         )
         
-        generated_code = response.choices[0].message['content']
+        generated_code = response.choices[0].message.content
         
         # Clean up the response to ensure it's valid Python code
         if "```python" in generated_code:
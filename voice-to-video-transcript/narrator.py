@@ -5,14 +5,12 @@ Converts educational scripts into natural-sounding narration audio.
 
 import os
 import asyncio
-import tempfile
 from pathlib import Path
 from typing import Optional, List, Union
 import logging
-from gtts import gTTS
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
 import re
+import audio_tools
+from sentence_tts import SentenceNarrator, TTSProvider
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,19 +19,24 @@ logger = logging.getLogger(__name__)
 class Narrator:
     """Handles text-to-speech conversion for educational content."""
     
-    def __init__(self, default_language: str = "en", default_speed: float = 1.0):
+    def __init__(self, default_language: str = "en", default_speed: float = 1.0,
+                 tts_provider: Optional[TTSProvider] = None):
         """
         Initialize the narrator.
         
         Args:
             default_language: Default language code (e.g., 'en', 'es', 'fr')
             default_speed: Default speech speed multiplier
+            tts_provider: TTS backend (TTS_PROVIDER, default gTTS)
         """
         self.default_language = default_language
         self.default_speed = default_speed
         self.output_dir = Path("output")
         self.output_dir.mkdir(exist_ok=True)
         
+        # Sentence units are synthesized concurrently and cached individually
+        self.sentence_narrator = SentenceNarrator(tts_provider, adjust_speed=self._change_speed)
+        
         # Supported languages
         self.supported_languages = {
             'en': 'English',
@@ -74,17 +77,13 @@ class Narrator:
             
             # Generate output path if not provided
             if not output_path:
-                output_path = self.output_dir / f"narration_{hash(text) % 100000}.mp3"
+                output_path = self.output_dir / f"narration_{hash(text) % 100000}{self.sentence_narrator.extension}"
             
-            # Create narration using gTTS
-            narration_path = await self._create_gtts_narration(
-                cleaned_text, language, str(output_path)
+            # Synthesize sentence units in parallel (speed is adjusted per unit) and join them
+            narration_path = await self.sentence_narrator.narrate(
+                cleaned_text, language, speed, str(output_path)
             )
             
-            # Adjust speed if needed
-            if speed != 1.0:
-                narration_path = self._adjust_speed(narration_path, speed)
-            
             logger.info(f"Narration created successfully: {narration_path}")
             return narration_path
             
@@ -162,38 +161,6 @@ class Narrator:
         
         return text
     
-    async def _create_gtts_narration(self, text: str, language: str, output_path: str) -> str:
-        """
-        Create narration using Google Text-to-Speech.
-        
-        Args:
-            text: Text to convert
-            language: Language code
-            output_path: Output file path
-            
-        Returns:
-            Path to the generated audio file
-        """
-        try:
-            # Create gTTS object
-            tts = gTTS(text=text, lang=language, slow=False)
-            
-            # Save to temporary file first
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp_file:
-                temp_path = tmp_file.name
-            
-            # Generate audio
-            tts.save(temp_path)
-            
-            # Move to final location
-            os.rename(temp_path, output_path)
-            
-            return output_path
-            
-        except Exception as e:
-            logger.error(f"Error with gTTS: {e}")
-            raise
-    
     def _adjust_speed(self, audio_path: str, speed: float) -> str:
         """
         Adjust the speed of audio without changing pitch.
@@ -203,37 +170,24 @@ class Narrator:
             speed: Speed multiplier (1.0 = normal, >1.0 = faster, <1.0 = slower)
             
         Returns:
-            Path to speed-adjusted audio file
+            Path to speed-adjusted audio file (the original if adjustment fails)
         """
         try:
-            # Load audio
-            audio = AudioSegment.from_file(audio_path)
-            
-            # Adjust speed by changing frame rate
-            # This method changes both speed and pitch
-            new_sample_rate = int(audio.frame_rate * speed)
-            speed_adjusted = audio._spawn(audio.raw_data, overrides={"frame_rate": new_sample_rate})
-            
-            # Normalize back to original sample rate to maintain pitch
-            speed_adjusted = speed_adjusted.set_frame_rate(audio.frame_rate)
-            
-            # Create new output path
-            path = Path(audio_path)
-            speed_adjusted_path = path.parent / f"{path.stem}_speed_{speed}{path.suffix}"
-            
-            # Export adjusted audio
-            speed_adjusted.export(str(speed_adjusted_path), format="mp3")
-            
-            # Replace original file
-            os.replace(str(speed_adjusted_path), audio_path)
-            
-            logger.info(f"Audio speed adjusted to {speed}x")
-            return audio_path
-            
+            return self._change_speed(audio_path, speed)
         except Exception as e:
             logger.error(f"Error adjusting audio speed: {e}")
             return audio_path  # Return original if adjustment fails
     
+    def _change_speed(self, audio_path: str, speed: float) -> str:
+        """Same as `_adjust_speed`, but raises when the speed cannot be changed."""
+        # ffmpeg's atempo filter time-stretches the stream, keeping the pitch
+        audio_tools.replace_with(
+            audio_path, lambda tmp_path: audio_tools.speed_args(audio_path, tmp_path, speed)
+        )
+        
+        logger.info(f"Audio speed adjusted to {speed}x")
+        return audio_path
+    
     def create_section_narrations(self, script_data: dict, language: Optional[str] = None) -> List[str]:
         """
         Create separate narration files for each script section.
@@ -296,22 +250,23 @@ class Narrator:
             Path to combined narration file
         """
         try:
-            combined_audio = AudioSegment.empty()
-            pause = AudioSegment.silent(duration=int(pause_duration * 1000))
-            
+            existing_paths = []
             for path in narration_paths:
                 if os.path.exists(path):
-                    audio = AudioSegment.from_file(path)
-                    combined_audio += audio + pause
+                    existing_paths.append(path)
                 else:
                     logger.warning(f"Narration file not found: {path}")
             
-            # Remove final pause
-            if len(combined_audio) > pause_duration * 1000:
-                combined_audio = combined_audio[:-int(pause_duration * 1000)]
+            if not existing_paths:
+                raise ValueError("No narration files to combine")
             
-            # Export combined audio
-            combined_audio.export(output_path, format="mp3")
+            # Join in the first narration's format, with a pause after every file but the last
+            info = audio_tools.probe_audio(existing_paths[0]) or {}
+            audio_tools.run_ffmpeg(audio_tools.concat_args(
+                existing_paths, output_path, pause_duration,
+                sample_rate=info.get("sample_rate", audio_tools.DEFAULT_SAMPLE_RATE),
+                channel_layout=info.get("channel_layout", audio_tools.DEFAULT_CHANNEL_LAYOUT)
+            ))
             
             logger.info(f"Combined narration saved to: {output_path}")
             return output_path
@@ -331,8 +286,11 @@ class Narrator:
             Duration in seconds
         """
         try:
-            audio = AudioSegment.from_file(audio_path)
-            return len(audio) / 1000.0  # Convert milliseconds to seconds
+            # ffprobe reads the container header instead of decoding the file
+            info = audio_tools.probe_audio(audio_path)
+            if info is None:
+                raise RuntimeError(f"ffprobe could not read {audio_path}")
+            return info["duration"]
         except Exception as e:
             logger.error(f"Error getting audio duration: {e}")
             return 0.0
@@ -348,13 +306,13 @@ class Narrator:
             Path to normalized audio file
         """
         try:
-            audio = AudioSegment.from_file(audio_path)
-            
-            # Normalize to -20 dBFS
-            normalized_audio = audio.normalize().apply_gain(-20 - audio.dBFS)
+            info = audio_tools.probe_audio(audio_path) or {}
+            sample_rate = info.get("sample_rate", audio_tools.DEFAULT_SAMPLE_RATE)
             
-            # Export normalized audio
-            normalized_audio.export(audio_path, format="mp3")
+            # Normalize to -20 LUFS (EBU R128 loudnorm)
+            audio_tools.replace_with(
+                audio_path, lambda tmp_path: audio_tools.normalize_args(audio_path, tmp_path, sample_rate)
+            )
             
             logger.info("Audio normalized successfully")
             return audio_path
@@ -376,38 +334,26 @@ class Narrator:
         Returns:
             Path to audio with background music
         """
+        mixed_path = None
         try:
             if not os.path.exists(music_path):
                 logger.warning(f"Background music file not found: {music_path}")
                 return narration_path
             
-            # Load audio files
-            narration = AudioSegment.from_file(narration_path)
-            music = AudioSegment.from_file(music_path)
-            
-            # Adjust music volume
-            music = music + (20 * music_volume - 20)  # Convert to dB
-            
-            # Loop music to match narration length if needed
-            if len(music) < len(narration):
-                loops_needed = len(narration) // len(music) + 1
-                music = music * loops_needed
-            
-            # Trim music to narration length
-            music = music[:len(narration)]
-            
-            # Mix narration and music
-            mixed_audio = narration.overlay(music)
-            
-            # Export mixed audio
-            mixed_path = narration_path.replace('.mp3', '_with_music.mp3')
-            mixed_audio.export(mixed_path, format="mp3")
+            # Music is looped, lowered and cut at the end of the narration
+            path = Path(narration_path)
+            mixed_path = str(path.with_name(f"{path.stem}_with_music{path.suffix}"))
+            audio_tools.run_ffmpeg(audio_tools.mix_args(
+                narration_path, music_path, mixed_path, music_gain_db=20 * music_volume - 20
+            ))
             
             logger.info(f"Background music added: {mixed_path}")
             return mixed_path
             
         except Exception as e:
             logger.error(f"Error adding background music: {e}")
+            if mixed_path and os.path.exists(mixed_path):
+                os.unlink(mixed_path)  # partial output
             return narration_path
 
 # Example usage
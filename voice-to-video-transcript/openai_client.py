@@ -0,0 +1,96 @@
+"""
+Shared Async OpenAI Client
+One pooled, keep-alive AsyncOpenAI client per process for the transcriber,
+script generator and Manim code generator, so API calls never block the
+event loop and reuse their HTTPS connections.
+"""
+
+import os
+import asyncio
+from typing import Any, Awaitable, Optional, Dict, Tuple
+import httpx
+import openai
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Connection pool shared by all OpenAI calls of the process
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+REQUEST_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "600"))
+
+# (event loop, api_key, base_url) -> client. httpx connections belong to the
+# loop that opened them, so each loop (asyncio.run() in the CLI, Streamlit or a
+# blocking pipeline stage) gets its own pool. run_with_clients closes a loop's
+# clients before the loop ends; entries of loops closed without it are dropped.
+_clients: Dict[Tuple[asyncio.AbstractEventLoop, Optional[str], Optional[str]], openai.AsyncOpenAI] = {}
+
+
+def get_async_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> openai.AsyncOpenAI:
+    """
+    Get the process-wide AsyncOpenAI client for the running event loop.
+
+    Args:
+        api_key: OpenAI API key (will use OPENAI_API_KEY if not provided)
+        base_url: API base URL (will use OPENAI_BASE_URL or the OpenAI default if not provided)
+
+    Returns:
+        A pooled AsyncOpenAI client
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    loop = asyncio.get_running_loop()
+    key = (loop, api_key, base_url)
+
+    cached = _clients.get(key)
+    if cached:
+        return cached
+
+    # Loops closed without run_with_clients: their connections cannot be closed
+    # from another loop, so only release the clients
+    for stale in [k for k in _clients if k[0].is_closed()]:
+        logger.debug("Dropping the OpenAI client of a closed event loop")
+        del _clients[stale]
+
+    client = openai.AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=REQUEST_TIMEOUT,
+        http_client=openai.DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=REQUEST_TIMEOUT,
+        ),
+    )
+    _clients[key] = client
+    logger.info(f"Created pooled AsyncOpenAI client (max {MAX_CONNECTIONS} connections)")
+    return client
+
+
+async def close_async_clients():
+    """Close the clients created on the running event loop (call on application shutdown)."""
+    loop = asyncio.get_running_loop()
+    for key, client in list(_clients.items()):
+        if key[0] is loop:
+            del _clients[key]
+            await client.close()
+
+
+def run_with_clients(coro: Awaitable[Any]) -> Any:
+    """
+    asyncio.run() that closes the OpenAI clients created on its loop before
+    the loop ends, so short-lived loops do not leave connection pools behind.
+    """
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close_async_clients()
+
+    return asyncio.run(main())
@@ -0,0 +1,261 @@
+"""
+Content-Addressed Result Cache
+Keeps transcripts, generated scripts and narration audio on disk, keyed by a
+hash of their inputs, so re-running or retrying a session does not repeat
+paid or slow calls.
+"""
+
+import os
+import copy
+import json
+import shutil
+import asyncio
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "cache")
+CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "512"))
+CACHE_ENABLED = os.getenv("RESULT_CACHE", "1") != "0"
+
+
+def file_digest(path: str, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's content, read in blocks (constant memory)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_digest(text: str) -> str:
+    """SHA-256 of a string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    JSON values (or files, e.g. audio) on disk under `<directory>/<kind>/<key[:2]>/<key><suffix>`.
+
+    Writes are atomic (temporary file + rename). Reading an entry refreshes its
+    modification time, and when the cache grows past `max_bytes` the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Size cap (RESULT_CACHE_MAX_MB, default 512 MB)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else int(CACHE_MAX_MB * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        # (kind, key) -> future of a get_or_compute() computation in progress
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.evictions = 0
+        self.size_bytes = sum(path.stat().st_size for path in self._entries())
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Key for a combination of inputs (hashes, model names, options)."""
+        return text_digest(json.dumps(parts, sort_keys=True, default=str))
+
+    def _path(self, kind: str, key: str, suffix: str = ".json") -> Path:
+        return self.directory / kind / key[:2] / f"{key}{suffix}"
+
+    def _entries(self):
+        return (path for path in self.directory.glob("*/*/*") if path.suffix != ".tmp")
+
+    def _count(self, kind: str, event: str):
+        with self._lock:
+            counters = self._counters.setdefault(kind, {"hits": 0, "misses": 0, "writes": 0})
+            counters[event] += 1
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """
+        Look up a value.
+
+        Args:
+            kind: Kind of result (e.g. "transcripts")
+            key: Key from `make_key`
+
+        Returns:
+            The cached value, or None
+        """
+        path = self._path(kind, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # most recently used
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._count(kind, "misses")
+            return None
+        self._count(kind, "hits")
+        return value
+
+    def put(self, kind: str, key: str, value: Any):
+        """Store a JSON-serializable value, evicting old entries if over the cap."""
+        data = json.dumps(value).encode("utf-8")
+        self._store(kind, key, ".json", lambda f: f.write(data))
+
+    def get_file(self, kind: str, key: str, suffix: str) -> Optional[Path]:
+        """
+        Look up a cached file.
+
+        Returns:
+            Path of the cached file (copy or link it before use: it may be evicted), or None
+        """
+        path = self._path(kind, key, suffix)
+        try:
+            os.utime(path)  # most recently used
+        except FileNotFoundError:
+            self._count(kind, "misses")
+            return None
+        self._count(kind, "hits")
+        return path
+
+    def put_file(self, kind: str, key: str, source_path: str, suffix: str):
+        """Store a copy of a file, evicting old entries if over the cap."""
+        def copy(f):
+            with open(source_path, "rb") as source:
+                shutil.copyfileobj(source, f)
+        self._store(kind, key, suffix, copy)
+
+    def _store(self, kind: str, key: str, suffix: str, write: Callable[[Any], None]):
+        """Write an entry atomically (temporary file + rename)."""
+        path = self._path(kind, key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            size = os.path.getsize(tmp_path)
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self.size_bytes += size - previous
+        self._count(kind, "writes")
+        if self.size_bytes > self.max_bytes:
+            self._evict()
+
+    async def get_or_compute(self, kind: str, key: str, compute: Callable[[], Awaitable[Any]],
+                             cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Return the cached value, or await `compute()` and cache its result.
+
+        Concurrent calls for the same entry (on the same event loop) share one
+        `compute()` instead of each paying for it.
+
+        Args:
+            kind: Kind of result
+            key: Key from `make_key`
+            compute: Coroutine function producing the value on a miss
+            cacheable: Returns False for values that must not be stored (e.g. fallbacks)
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            value = self.get(kind, key)
+            if value is not None:
+                logger.info(f"Result cache hit ({kind} {key[:12]})")
+                return value
+
+            with self._lock:
+                pending = self._pending.get((kind, key))
+                if pending is None or pending.get_loop() is not loop:
+                    pending = None
+                    future = self._pending[(kind, key)] = loop.create_future()
+            if pending is None:
+                break
+
+            logger.info(f"Result cache: waiting for the {kind} {key[:12]} already being computed")
+            try:
+                return copy.deepcopy(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The computing call was cancelled: try again (and compute if still missing)
+
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved: no warning when nobody was waiting
+            raise
+        finally:
+            with self._lock:
+                if self._pending.get((kind, key)) is future:
+                    del self._pending[(kind, key)]
+
+        # Waiters get the value before the write, which must not fail the computation
+        future.set_result(value)
+        try:
+            if cacheable is None or cacheable(value):
+                self.put(kind, key, value)
+            else:
+                logger.info(f"Result not cached ({kind} {key[:12]})")
+        except Exception as e:
+            logger.error(f"Result cache write failed ({kind} {key[:12]}): {e}")
+        return value
+
+    def _evict(self):
+        """Remove least recently used entries until the cache is under its cap."""
+        with self._lock:
+            entries = []
+            for path in self._entries():
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            self.size_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if self.size_bytes <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                self.size_bytes -= size
+                self.evictions += 1
+            logger.info(f"Result cache evicted down to {self.size_bytes} bytes")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/write counters per kind, evictions and size."""
+        with self._lock:
+            return {
+                "kinds": {kind: dict(counters) for kind, counters in self._counters.items()},
+                "evictions": self.evictions,
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """The process-wide cache (RESULT_CACHE_DIR), or None if disabled with RESULT_CACHE=0."""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
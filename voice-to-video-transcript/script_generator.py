@@ -10,13 +10,17 @@ import re
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 import openai
-from openai import OpenAI
+from openai_client import get_async_client
+from result_cache import ResultCache, get_result_cache, text_digest
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Part of the script cache key: bump when the prompts change so cached scripts are regenerated
+PROMPT_VERSION = 1
+
 @dataclass
 class ScriptSection:
     """Represents a section of the educational script."""
@@ -43,20 +47,22 @@ class EducationalScript:
 class ScriptGenerator:
     """Generates structured educational scripts from raw transcripts."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo",
+                 cache: Optional[ResultCache] = None):
         """
         Initialize the script generator.
         
         Args:
             api_key: OpenAI API key
             model: Model to use (gpt-4, gpt-3.5-turbo, etc.)
+            cache: Script cache (defaults to the process-wide result cache)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key is required")
         
-        self.client = OpenAI(api_key=self.api_key)
         self.model = model
+        self.cache = cache if cache is not None else get_result_cache()
         
         # Check if model supports json_object response format
         self.supports_json_format = model in ["gpt-4", "gpt-4-turbo", "gpt-4-1106-preview", "gpt-3.5-turbo-1106"]
@@ -75,11 +81,19 @@ Key requirements:
 
 Output format should be valid JSON with the specified structure."""
     
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        """Shared pooled async client (see openai_client.py)."""
+        return get_async_client(self.api_key)
+    
     async def generate_script(self, transcript: str, topic_hint: str = "", 
                             target_duration: Optional[float] = None) -> Dict[str, Any]:
         """
         Generate a structured educational script from a transcript.
         
+        Scripts are cached by transcript, topic hint, target duration, model
+        and prompt version.
+        
         Args:
             transcript: Raw transcript text
             topic_hint: Optional hint about the topic
@@ -88,6 +102,18 @@ Output format should be valid JSON with the specified structure."""
         Returns:
             Dictionary containing the structured script
         """
+        if not self.cache:
+            return await self._generate_script(transcript, topic_hint, target_duration)
+        
+        key = ResultCache.make_key(text_digest(transcript), topic_hint, target_duration, self.model, PROMPT_VERSION)
+        # A fallback script (unparseable response) is returned but never cached, so a retry calls the model again
+        return await self.cache.get_or_compute("scripts", key,
+                                               lambda: self._generate_script(transcript, topic_hint, target_duration),
+                                               cacheable=lambda script: not script.get("fallback"))
+    
+    async def _generate_script(self, transcript: str, topic_hint: str,
+                               target_duration: Optional[float]) -> Dict[str, Any]:
+        """Generate a script without the cache."""
         try:
             logger.info(f"Generating educational script for transcript of length {len(transcript)}")
             
@@ -182,7 +208,7 @@ Make sure the script is engaging, educational, and well-structured for video pro
             if self.supports_json_format:
                 params["response_format"] = {"type": "json_object"}
             
-            response = self.client.chat.completions.create(**params)
+            response = await self.client.chat.completions.create(**params)
             
             return response.choices[0].message.content
             
@@ -226,7 +252,8 @@ Make sure the script is engaging, educational, and well-structured for video pro
                 "total_duration": 120.0,
                 "keywords": ["education", "learning"],
                 "difficulty_level": "intermediate",
-                "subject_area": "general"
+                "subject_area": "general",
+                "fallback": True  # not a parsed response: not cached
             }
     
     def _enhance_script(self, script_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -295,7 +322,7 @@ Make sure the script is engaging, educational, and well-structured for video pro
         
         return ' '.join(full_text)
     
-    def improve_script(self, script_data: Dict[str, Any], feedback: str) -> Dict[str, Any]:
+    async def improve_script(self, script_data: Dict[str, Any], feedback: str) -> Dict[str, Any]:
         """
         Improve an existing script based on feedback.
         
@@ -317,7 +344,7 @@ FEEDBACK:
 
 Please provide the improved version in the same JSON format, addressing the feedback while maintaining the educational quality and structure."""
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": self.system_prompt},
@@ -0,0 +1,260 @@
+"""
+Sentence-Level Narration
+Splits narration text into sentence units, synthesizes them concurrently
+through a pluggable TTS provider with a per-unit audio cache, and joins the
+units without re-encoding.
+"""
+
+import os
+import re
+import math
+import wave
+import shutil
+import asyncio
+import tempfile
+import subprocess
+from array import array
+from typing import Callable, List, Optional
+import logging
+from result_cache import ResultCache, get_result_cache, text_digest
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_units(text: str, max_chars: int = 200) -> List[str]:
+    """
+    Split text into narration units of whole sentences.
+
+    Consecutive sentences are grouped while the unit stays within
+    `max_chars`; a longer sentence is a unit on its own.
+
+    Args:
+        text: Cleaned narration text
+        max_chars: Preferred maximum unit length
+
+    Returns:
+        Units in reading order
+    """
+    units: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            units.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        units.append(current)
+    return units
+
+
+class TTSProvider:
+    """Text-to-speech backend: synthesizes one unit into an audio file (blocking)."""
+
+    name = "base"
+    extension = ".mp3"
+
+    def synthesize(self, text: str, language: str, output_path: str):
+        raise NotImplementedError
+
+
+class GTTSProvider(TTSProvider):
+    """Google Text-to-Speech (MP3)."""
+
+    name = "gtts"
+    extension = ".mp3"
+
+    def synthesize(self, text: str, language: str, output_path: str):
+        from gtts import gTTS
+        gTTS(text=text, lang=language, slow=False).save(output_path)
+
+
+class OfflineTTSProvider(TTSProvider):
+    """
+    Local stand-in for tests and offline runs: a tone per unit (16-bit mono
+    WAV), `seconds_per_char` long, pitched by the text so units differ.
+    """
+
+    name = "offline"
+    extension = ".wav"
+
+    def __init__(self, sample_rate: int = 16000, seconds_per_char: float = 0.01):
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+
+    def synthesize(self, text: str, language: str, output_path: str):
+        frequency = 200 + int(text_digest(text)[:4], 16) % 600
+        frames = max(1, int(len(text) * self.seconds_per_char * self.sample_rate))
+        samples = array('h', (int(3000 * math.sin(2 * math.pi * frequency * i / self.sample_rate))
+                              for i in range(frames)))
+        with wave.open(output_path, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(samples.tobytes())
+
+
+TTS_PROVIDERS = {"gtts": GTTSProvider, "offline": OfflineTTSProvider}
+
+
+def get_tts_provider(name: Optional[str] = None) -> TTSProvider:
+    """Provider by name (TTS_PROVIDER, default "gtts")."""
+    name = name or os.getenv("TTS_PROVIDER", "gtts")
+    if name not in TTS_PROVIDERS:
+        raise ValueError(f"Unknown TTS provider: {name} (available: {', '.join(TTS_PROVIDERS)})")
+    return TTS_PROVIDERS[name]()
+
+
+def concat_audio(paths: List[str], output_path: str):
+    """
+    Join audio files of the same format without re-encoding.
+
+    Uses ffmpeg's concat demuxer with stream copy. Without ffmpeg, MP3 units
+    are concatenated byte for byte, as gTTS does for its own multi-part
+    requests (the frames are not parsed), and WAV units by copying their
+    samples.
+
+    Args:
+        paths: Audio files in playback order
+        output_path: Joined file
+    """
+    if shutil.which("ffmpeg"):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                listing.write(f"file '{escaped}'\n")
+        try:
+            result = subprocess.run(
+                ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-f', 'concat', '-safe', '0',
+                 '-i', listing.name, '-c', 'copy', output_path],
+                capture_output=True, text=True)
+        finally:
+            os.unlink(listing.name)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg concat failed: {result.stderr.strip()}")
+    elif output_path.endswith(".mp3"):
+        with open(output_path, "wb") as out:
+            for path in paths:
+                with open(path, "rb") as unit:
+                    shutil.copyfileobj(unit, out)
+    elif output_path.endswith(".wav"):
+        with wave.open(output_path, "wb") as out:
+            for index, path in enumerate(paths):
+                with wave.open(path, "rb") as unit:
+                    if index == 0:
+                        out.setparams(unit.getparams())
+                    while True:
+                        frames = unit.readframes(65536)
+                        if not frames:
+                            break
+                        out.writeframes(frames)
+    else:
+        raise RuntimeError("ffmpeg is required to join narration units")
+
+
+class SentenceNarrator:
+    """Narrates text as concurrently synthesized, cached sentence units."""
+
+    def __init__(self, provider: Optional[TTSProvider] = None, cache: Optional[ResultCache] = None,
+                 concurrency: Optional[int] = None, max_unit_chars: Optional[int] = None,
+                 retries: int = 2, adjust_speed: Optional[Callable[[str, float], str]] = None):
+        """
+        Initialize the sentence narrator.
+
+        Args:
+            provider: TTS provider (TTS_PROVIDER, default gTTS)
+            cache: Unit audio cache (defaults to the process-wide result cache)
+            concurrency: Units synthesized at once (TTS_CONCURRENCY, default 4)
+            max_unit_chars: Preferred maximum unit length (TTS_UNIT_CHARS, default 200)
+            retries: Extra attempts for a failed unit
+            adjust_speed: Function (path, speed) -> path changing a unit's speed in place
+                (raises on failure; the unit is then used at normal speed and not cached)
+        """
+        self.provider = provider or get_tts_provider()
+        self.cache = cache if cache is not None else get_result_cache()
+        self.concurrency = concurrency or int(os.getenv("TTS_CONCURRENCY", "4"))
+        self.max_unit_chars = max_unit_chars or int(os.getenv("TTS_UNIT_CHARS", "200"))
+        self.retries = retries
+        self.adjust_speed = adjust_speed
+
+    @property
+    def extension(self) -> str:
+        return self.provider.extension
+
+    async def narrate(self, text: str, language: str, speed: float, output_path: str) -> str:
+        """
+        Synthesize `text` into `output_path`.
+
+        Args:
+            text: Cleaned narration text
+            language: Language code
+            speed: Speech speed multiplier
+            output_path: Output file (with the provider's extension)
+
+        Returns:
+            Path to the narration file
+        """
+        units = split_units(text, self.max_unit_chars)
+        if not units:
+            raise ValueError("No text to narrate")
+        logger.info(f"Narrating {len(units)} units with {self.provider.name} ({self.concurrency} at a time)")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with tempfile.TemporaryDirectory(prefix="narration_") as work_dir:
+            # Let every unit finish (and be cached) before reporting a failure,
+            # so a retry only synthesizes the units that failed
+            paths = await asyncio.gather(*(
+                self._unit_audio(index, unit, language, speed, work_dir, semaphore)
+                for index, unit in enumerate(units)), return_exceptions=True)
+            for result in paths:
+                if isinstance(result, BaseException):
+                    raise result
+            if len(paths) == 1:
+                shutil.move(paths[0], output_path)
+            else:
+                await asyncio.to_thread(concat_audio, paths, output_path)
+        return output_path
+
+    async def _unit_audio(self, index: int, text: str, language: str, speed: float,
+                          work_dir: str, semaphore: asyncio.Semaphore) -> str:
+        """Audio file of one unit, from the cache or synthesized."""
+        path = os.path.join(work_dir, f"unit_{index:04d}{self.extension}")
+        key = ResultCache.make_key(text_digest(text), language, speed, self.provider.name)
+        if self.cache:
+            cached = self.cache.get_file("narration", key, self.extension)
+            if cached:
+                try:
+                    shutil.copyfile(cached, path)
+                    return path
+                except FileNotFoundError:
+                    pass  # evicted since the lookup: synthesize it again
+
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    await asyncio.to_thread(self.provider.synthesize, text, language, path)
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        raise RuntimeError(f"Narration unit {index} failed: {e}") from e
+                    logger.warning(f"Narration unit {index} failed ({e}), retrying")
+                    await asyncio.sleep(0.5 * (attempt + 1))
+            # Only audio at the requested speed is cached (the key includes the speed)
+            cacheable = speed == 1.0
+            if speed != 1.0 and self.adjust_speed:
+                try:
+                    path = await asyncio.to_thread(self.adjust_speed, path, speed)
+                    cacheable = True
+                except Exception as e:
+                    logger.warning(f"Narration unit {index} kept at normal speed ({e})")
+
+        if self.cache and cacheable:
+            self.cache.put_file("narration", key, path, self.extension)
+        return path
@@ -0,0 +1,211 @@
+"""
+Stage Graph Executor
+Runs pipeline stages as a dependency graph: every stage starts as soon as the
+stages it depends on have finished, so independent stages (narration,
+animation and PDF all need only the script) run concurrently.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+import logging
+from openai_client import run_with_clients
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """One step of a pipeline."""
+    name: str
+    func: Callable[..., Awaitable[Any]]  # called with its dependencies' results as keyword arguments
+    deps: Tuple[str, ...] = ()
+    blocking: bool = False   # does blocking work inside async code: run it on a worker thread
+    optional: bool = False   # on failure, skip its dependents instead of failing the whole run
+
+
+class StageTimer:
+    """Default progress tracker: logs and records the duration of every stage."""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.skipped: Dict[str, str] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        logger.info(f"Stage '{name}' started")
+        try:
+            yield
+        finally:
+            self.durations[name] = time.perf_counter() - start
+            logger.info(f"Stage '{name}' finished in {self.durations[name]:.2f}s")
+
+    def skip_stage(self, name: str, reason: str):
+        self.skipped[name] = reason
+        logger.warning(f"Stage '{name}' skipped: {reason}")
+
+
+class StageGraph:
+    """A set of stages and their dependencies, executed concurrently where possible."""
+
+    def __init__(self, stages: Iterable[Stage], inputs: Iterable[str] = ()):
+        """
+        Initialize the graph.
+
+        Args:
+            stages: The stages
+            inputs: Names of the values passed to `run` that stages may depend on
+
+        Raises:
+            ValueError: On unknown dependencies or cycles
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        self.inputs = set(inputs)
+        for stage in self.stages.values():
+            unknown = [d for d in stage.deps if d not in self.stages and d not in self.inputs]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {unknown}")
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done or name in self.inputs:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def run(self, inputs: Optional[Dict[str, Any]] = None, tracker=None,
+                  on_result: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """
+        Execute the graph.
+
+        Args:
+            inputs: Initial values (see `inputs` in the constructor)
+            tracker: Progress tracker with `stage(name)` (a context manager) and
+                     `skip_stage(name, reason)`, e.g. a `job_queue.Job`; defaults to a StageTimer
+            on_result: Called with (stage name, result) as soon as a stage finishes
+
+        Returns:
+            Results of the completed stages, by stage name (plus the inputs)
+
+        Raises:
+            Exception: The first failure of a non-optional stage
+        """
+        tracker = tracker or StageTimer()
+        results: Dict[str, Any] = dict(inputs or {})
+        missing = self.inputs - set(results)
+        if missing:
+            raise ValueError(f"Missing graph inputs: {sorted(missing)}")
+
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(stage: Stage):
+            # Wait for the dependencies; a skipped or failed one skips this stage
+            for dep in stage.deps:
+                if dep in tasks and not await tasks[dep]:
+                    tracker.skip_stage(stage.name, f"'{dep}' did not complete")
+                    return False
+            kwargs = {dep: results[dep] for dep in stage.deps}
+            try:
+                with tracker.stage(stage.name):
+                    if stage.blocking:
+                        result = await asyncio.to_thread(lambda: run_with_clients(stage.func(**kwargs)))
+                    else:
+                        result = await stage.func(**kwargs)
+            except Exception as e:
+                if not stage.optional:
+                    raise
+                logger.warning(f"Optional stage '{stage.name}' failed: {e}")
+                return False
+            results[stage.name] = result
+            if on_result:
+                on_result(stage.name, result)
+            return True
+
+        start = time.perf_counter()
+        for name in self.order:
+            tasks[name] = asyncio.create_task(execute(self.stages[name]))
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        logger.info(f"Stage graph finished in {time.perf_counter() - start:.2f}s")
+        return results
+
+
+def educational_video_graph(transcriber, script_generator, narrator=None, animator=None, merger=None,
+                            pdf_generator=None, topic_hint: str = "", output_path: Optional[str] = None,
+                            optional_outputs: bool = False) -> StageGraph:
+    """
+    The voice-to-video pipeline: transcript -> script -> (narration | animation | pdf) -> merge.
+
+    Components passed as None are left out of the graph (merge needs narrator,
+    animator and merger). Run it with `inputs={"audio_path": ...}`.
+
+    Args:
+        transcriber: AudioTranscriber (or the Python 3.13 variant)
+        script_generator: ScriptGenerator
+        narrator: Narrator, optional
+        animator: VideoAnimator, optional
+        merger: VideoMerger, optional
+        pdf_generator: PDFGenerator, optional
+        topic_hint: Topic hint for the script
+        output_path: Path of the final video (generated if None)
+        optional_outputs: Let narration/animation/merge/pdf fail without failing the run
+
+    Returns:
+        The stage graph; results are keyed "transcript", "script", "narration",
+        "animation", "merge" (final video) and "pdf"
+    """
+    async def transcript(audio_path):
+        return await transcriber.transcribe(audio_path)
+
+    async def script(transcript):
+        return await script_generator.generate_script(transcript, topic_hint)
+
+    stages = [
+        Stage("transcript", transcript, ("audio_path",)),
+        Stage("script", script, ("transcript",)),
+    ]
+
+    if narrator:
+        async def narration(script):
+            return await narrator.create_narration(script['full_text'])
+        stages.append(Stage("narration", narration, ("script",), blocking=True, optional=optional_outputs))
+
+    if animator:
+        async def animation(script):
+            return await animator.create_animation(script)
+        stages.append(Stage("animation", animation, ("script",), blocking=True, optional=optional_outputs))
+
+    if pdf_generator:
+        async def pdf(script):
+            return await pdf_generator.create_pdf(script)
+        stages.append(Stage("pdf", pdf, ("script",), blocking=True, optional=optional_outputs))
+
+    if narrator and animator and merger:
+        async def merge(animation, narration):
+            return await merger.merge_audio_video(animation, narration, output_path)
+        stages.append(Stage("merge", merge, ("animation", "narration"), blocking=True, optional=optional_outputs))
+
+    return StageGraph(stages, inputs=("audio_path",))
@@ -0,0 +1,200 @@
+"""
+Tests for incremental recording to disk and concurrent sessions (audio_recorder.py).
+"""
+
+import asyncio
+import io
+import os
+import sys
+import time
+import tracemalloc
+import wave
+from collections import deque
+
+from audio_recorder import AudioRecorder, RecorderManager, WavStreamWriter
+
+RATE = 8000
+CHUNK = 1024
+
+
+def read_wav(path):
+    with wave.open(str(path)) as wf:
+        return wf.getnchannels(), wf.getframerate(), wf.readframes(wf.getnframes())
+
+
+def test_partial_file_is_valid_after_each_finalization(tmp_path):
+    path = tmp_path / "lecture.wav"
+    writer = WavStreamWriter(path, RATE, finalize_seconds=1.0)
+
+    writer.write(b"\x01\x00" * RATE)       # 1 s: header finalized
+    writer.write(b"\x02\x00" * (RATE // 2))  # not yet
+    # A crash now leaves a valid file with everything up to the last finalization
+    assert read_wav(path) == (1, RATE, b"\x01\x00" * RATE)
+
+    writer.close()
+    assert read_wav(path) == (1, RATE, b"\x01\x00" * RATE + b"\x02\x00" * (RATE // 2))
+    assert writer.seconds == 1.5
+
+
+class FileDevice:
+    """PyAudio-style input stream reading PCM from a file; stops the recorder at the end."""
+
+    def __init__(self, path, recorder):
+        self.file = open(path, "rb")
+        self.recorder = recorder
+
+    def read(self, frames, exception_on_overflow=True):
+        data = self.file.read(frames * 2)
+        if len(data) < frames * 2:
+            self.recorder.is_recording = False
+        return data
+
+
+def make_recorder(tmp_path):
+    recorder = AudioRecorder.__new__(AudioRecorder)
+    recorder.sample_rate, recorder.channels, recorder.chunk_size = RATE, 1, CHUNK
+    recorder.finalize_seconds = 5.0
+    recorder.current_file_path = tmp_path / "recording.wav"
+    recorder.segmenter = recorder.on_segment = None
+    return recorder
+
+
+def test_pyaudio_thread_memory_does_not_grow_with_length(tmp_path):
+    # 20 minutes of audio from a file-backed device
+    source = tmp_path / "device.pcm"
+    pcm = bytes(range(256)) * (RATE * 2 * 60 // 256)
+    with open(source, "wb") as f:
+        for _ in range(20):
+            f.write(pcm)
+
+    recorder = make_recorder(tmp_path)
+    recorder.is_recording = True
+    recorder.stream = FileDevice(source, recorder)
+
+    tracemalloc.start()
+    recorder._pyaudio_recording_thread()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    recorder.stream.file.close()
+
+    assert peak < 1024 * 1024  # the audio itself is 19 MB
+    channels, rate, frames = read_wav(recorder.current_file_path)
+    assert (channels, rate, len(frames)) == (1, RATE, 20 * len(pcm))
+    assert frames[:len(pcm)] == pcm
+
+
+def test_ffmpeg_output_is_written_the_same_way(tmp_path):
+    recorder = make_recorder(tmp_path)
+    pcm = b"\x10\x00\x20\x00" * (3 * RATE)
+
+    recorder._ffmpeg_recording_thread(io.BytesIO(pcm))
+
+    assert read_wav(recorder.current_file_path) == (1, RATE, pcm)
+
+
+FAKE_FFMPEG = """#!{python}
+import sys
+# Far more warnings than a pipe buffer holds, before any audio
+for i in range(3000):
+    sys.stderr.write(f"[pulse @ 0x55d0] underrun {{i}}: buffer too small, dropping samples\\n")
+sys.stderr.flush()
+sys.stdout.buffer.write(b"\\x10\\x00" * {frames})
+sys.stdout.flush()
+sys.stdin.readline()  # 'q' to stop
+"""
+
+
+def test_ffmpeg_stderr_is_drained_while_recording(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    ffmpeg = bin_dir / "ffmpeg"
+    ffmpeg.write_text(FAKE_FFMPEG.format(python=sys.executable, frames=RATE))
+    ffmpeg.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    recorder = make_recorder(tmp_path)
+    recorder.device_override, recorder.device_name = None, "default"
+    recorder.ffmpeg_process = recorder.recording_thread = recorder.stderr_thread = None
+    recorder.ffmpeg_errors = deque(maxlen=20)
+
+    async def scenario():
+        assert await recorder._start_subprocess_recording()
+        # The audio after the warnings reaches the file while ffmpeg is still running
+        assert os.path.getsize(recorder.current_file_path) > 44
+        return await recorder._stop_subprocess_recording()
+
+    assert asyncio.run(scenario())
+    assert read_wav(recorder.current_file_path) == (1, RATE, b"\x10\x00" * RATE)
+    assert recorder.ffmpeg_errors[-1].startswith("[pulse @ 0x55d0] underrun 2999")
+
+
+class LoopingFileDevice:
+    """Input stream that plays a PCM file in a loop at (roughly) real time until closed."""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+
+    def read(self, frames, exception_on_overflow=True):
+        if self.file.closed:
+            raise IOError("Stream closed")
+        time.sleep(frames / RATE / 20)
+        data = self.file.read(frames * 2)
+        if len(data) < frames * 2:
+            self.file.seek(0)
+            data += self.file.read(frames * 2 - len(data))
+        return data
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        self.file.close()
+
+
+def fake_device(tmp_path, name, sample):
+    path = tmp_path / f"{name}.pcm"
+    path.write_bytes(sample * RATE)
+    return lambda: LoopingFileDevice(path)
+
+
+def test_manager_records_sessions_independently(tmp_path):
+    # Every fake device produces a constant, distinct sample value
+    samples = {"room-a": b"\x01\x00", "room-b": b"\x02\x00", "room-c": b"\x03\x00"}
+    manager = RecorderManager(output_dir=str(tmp_path / "out"), max_sessions=3)
+
+    async def scenario():
+        for room, sample in samples.items():
+            result = await manager.start_recording(f"session-{room}", device=room,
+                                                   input_stream_factory=fake_device(tmp_path, room, sample))
+            assert result["status"] == "success"
+
+        # Session ids and devices are exclusive, and the number of sessions is bounded
+        assert (await manager.start_recording("session-room-a"))["message"] == "Session is already recording"
+        manager.max_sessions = 4
+        busy = await manager.start_recording("other", device="room-b", input_stream_factory=lambda: None)
+        assert busy["message"] == "Device in use by another session: room-b"
+        manager.max_sessions = 3
+        assert "Maximum of 3" in (await manager.start_recording("fourth"))["message"]
+
+        status = await manager.get_recording_status()
+        assert status["active_recordings"] == 3
+        assert {s["device"] for s in status["sessions"]} == set(samples)
+
+        await asyncio.sleep(0.2)
+        first = await manager.stop_recording("session-room-b")
+        assert (await manager.get_recording_status("session-room-b"))["is_recording"] is False
+        assert (await manager.get_recording_status("session-room-a"))["is_recording"] is True
+        await asyncio.sleep(0.1)
+        rest = [await manager.stop_recording(f"session-{room}") for room in ("room-c", "room-a")]
+        return [first] + rest
+
+    results = asyncio.run(scenario())
+
+    assert manager.recorders == {}
+    for room, result in zip(("room-b", "room-c", "room-a"), results):
+        assert result["status"] == "success"
+        assert result["session_id"] == f"session-{room}"
+        channels, rate, frames = read_wav(result["file_path"])
+        # Each file holds only its own device's audio
+        assert len(frames) > 0
+        assert set(frames[i:i + 2] for i in range(0, len(frames), 2)) == {samples[room]}
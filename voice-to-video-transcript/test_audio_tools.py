@@ -0,0 +1,83 @@
+"""
+Tests for the ffmpeg audio tools (audio_tools.py) and the Narrator operations built on them.
+"""
+
+import math
+import shutil
+
+import pytest
+
+import audio_tools
+from narrator import Narrator
+from sentence_tts import OfflineTTSProvider
+
+needs_ffmpeg = pytest.mark.skipif(not audio_tools.ffmpeg_available(), reason="ffmpeg not installed")
+
+
+def test_atempo_is_chained_outside_a_single_stage_range():
+    assert audio_tools.atempo_filter(1.25) == "atempo=1.25"
+    assert audio_tools.atempo_filter(3.0) == "atempo=2,atempo=1.5"
+    assert audio_tools.atempo_filter(0.3) == "atempo=0.5,atempo=0.6"
+    stages = audio_tools.atempo_filter(10.0).split(",")
+    assert math.isclose(math.prod(float(stage.split("=")[1]) for stage in stages), 10.0)
+    with pytest.raises(ValueError):
+        audio_tools.atempo_filter(0)
+
+
+def test_concat_pads_all_but_the_last_input_and_mix_loops_the_music():
+    args = audio_tools.concat_args(["a.mp3", "b.mp3", "c.mp3"], "out.mp3", 1.0, 24000, "mono")
+    graph = args[args.index("-filter_complex") + 1]
+    assert graph.count("apad=pad_dur=1") == 2 and "[2:a]aformat" in graph and "[a2]" in graph
+    assert graph.endswith("[a0][a1][a2]concat=n=3:v=0:a=1[out]")
+
+    args = audio_tools.mix_args("narration.mp3", "/music/it's: a [mix], v1;2.mp3", "mixed.mp3", -18)
+    # Only the narration is an input; the music is looped inside the graph, its path escaped
+    assert args[:2] == ["-i", "narration.mp3"] and args.count("-i") == 1
+    graph = args[args.index("-filter_complex") + 1]
+    assert graph.startswith(r"amovie=/music/it\\\'s\\: a \[mix\]\, v1\;2.mp3:loop=0,")
+    assert "volume=-18dB" in graph and "duration=first" in graph
+
+
+def tone(path, text, seconds):
+    OfflineTTSProvider(seconds_per_char=seconds / len(text)).synthesize(text, "en", str(path))
+    return str(path)
+
+
+@needs_ffmpeg
+def test_narration_operations_keep_the_expected_lengths(tmp_path):
+    narrator = Narrator()
+    first = tone(tmp_path / "first.wav", "First section.", 1.0)
+    second = tone(tmp_path / "second.wav", "Second section.", 2.0)
+    assert narrator.get_audio_duration(first) == pytest.approx(1.0, abs=0.01)
+
+    # Same length as the pydub version: the files plus a pause between them, none at the end
+    combined = narrator.combine_narrations([first, str(tmp_path / "missing.wav"), second],
+                                           str(tmp_path / "combined.wav"), pause_duration=0.5)
+    assert narrator.get_audio_duration(combined) == pytest.approx(3.5, abs=0.05)
+
+    shutil.copyfile(second, tmp_path / "fast.wav")
+    narrator._adjust_speed(str(tmp_path / "fast.wav"), 2.0)
+    assert narrator.get_audio_duration(str(tmp_path / "fast.wav")) == pytest.approx(1.0, abs=0.05)
+
+    narrator.normalize_audio(combined)
+    info = audio_tools.probe_audio(combined)
+    assert info["sample_rate"] == 16000
+    assert info["duration"] == pytest.approx(3.5, abs=0.05)
+
+    # Short music is looped under the whole narration and cut at its end
+    music = tone(tmp_path / "it's: [music], v1;2.wav", "Music.", 0.3)
+    mixed = narrator.add_background_music(combined, music)
+    assert mixed != combined
+    assert narrator.get_audio_duration(mixed) == pytest.approx(3.5, abs=0.05)
+
+
+def test_failures_leave_the_original_audio(tmp_path):
+    narrator = Narrator()
+    path = tone(tmp_path / "narration.wav", "Narration.", 0.5)
+    original = (tmp_path / "narration.wav").read_bytes()
+
+    assert narrator.get_audio_duration(str(tmp_path / "missing.wav")) == 0.0
+    assert narrator._adjust_speed(str(tmp_path / "missing.wav"), 1.5) == str(tmp_path / "missing.wav")
+    assert narrator.add_background_music(path, str(tmp_path / "missing.wav")) == path
+    assert (tmp_path / "narration.wav").read_bytes() == original
+    assert [p.name for p in tmp_path.iterdir()] == ["narration.wav"]  # no temporary files
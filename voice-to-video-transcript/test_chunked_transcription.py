@@ -0,0 +1,97 @@
+"""
+Tests for silence-aware chunked transcription (chunked_transcription.py).
+"""
+
+import asyncio
+from chunked_transcription import parse_silences, plan_chunks, transcribe_chunks
+
+FFMPEG_LOG = """
+[silencedetect @ 0x55d1] silence_start: -0.01
+[silencedetect @ 0x55d1] silence_end: 1.2 | silence_duration: 1.21
+size=N/A time=00:20:00.00 bitrate=N/A speed= 900x
+[silencedetect @ 0x55d1] silence_start: 530.5
+[silencedetect @ 0x55d1] silence_end: 531.5 | silence_duration: 1
+[silencedetect @ 0x55d1] silence_start: 1020
+[silencedetect @ 0x55d1] silence_end: 1021 | silence_duration: 1
+"""
+
+
+def test_parse_silences():
+    assert parse_silences(FFMPEG_LOG) == [(0.0, 1.2), (530.5, 531.5), (1020.0, 1021.0)]
+
+
+def test_chunks_are_cut_at_silences_and_bounded():
+    chunks = plan_chunks(1500.0, parse_silences(FFMPEG_LOG), max_chunk_seconds=600)
+    # 531.0 and 1020.5 are silences; the 1131-1500 stretch has none and is left whole
+    assert chunks == [(0.0, 531.0), (531.0, 1020.5), (1020.5, 1500.0)]
+
+    # Without usable silences, chunks are cut at the bound
+    assert plan_chunks(1300.0, [], max_chunk_seconds=600) == [(0.0, 600.0), (600.0, 1200.0), (1200.0, 1300.0)]
+    assert plan_chunks(300.0, [], max_chunk_seconds=600) == [(0.0, 300.0)]
+
+
+def test_chunks_run_concurrently_in_order_with_tail_prompts():
+    in_flight = 0
+    peak = 0
+    prompts = {}
+
+    async def transcribe_file(path, prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        prompts[path] = prompt
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return f" words of {path} "
+
+    paths = [f"chunk{i}" for i in range(6)]
+    transcript = asyncio.run(transcribe_chunks(paths, transcribe_file, concurrency=3, prompt="Calculus", tail_chars=8))
+
+    assert transcript == " ".join(f"words of chunk{i}" for i in range(6))
+    assert peak == 3
+    # Runs [0, 1], [2, 3], [4, 5]: the first chunk of a run gets the prompt, the next the previous tail
+    assert prompts == {"chunk0": "Calculus", "chunk1": "f chunk0", "chunk2": "Calculus",
+                       "chunk3": "f chunk2", "chunk4": "Calculus", "chunk5": "f chunk4"}
+
+
+def test_unchunked_audio_is_prepared_off_the_event_loop():
+    import threading
+    import time
+    from transcriber import AudioTranscriber
+
+    transcriber = AudioTranscriber(api_key="test")
+    transcriber.cache = None
+    prepared_in = []
+    ticks = 0
+
+    async def short_audio(path):
+        return False
+
+    def prepare_audio(path):
+        prepared_in.append(threading.current_thread())
+        time.sleep(0.2)  # stands in for a slow pydub decode/re-encode
+        return path
+
+    async def transcribe_file(path, language, prompt):
+        return " text "
+
+    transcriber.chunker.needs_chunking = short_audio
+    transcriber._prepare_audio = prepare_audio
+    transcriber._transcribe_file = transcribe_file
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def main():
+        beat = asyncio.create_task(heartbeat())
+        try:
+            return await transcriber.transcribe("lecture.wav")
+        finally:
+            beat.cancel()
+
+    assert asyncio.run(main()) == "text"
+    assert prepared_in and prepared_in[0] is not threading.main_thread()
+    assert ticks >= 5
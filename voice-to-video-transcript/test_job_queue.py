@@ -0,0 +1,72 @@
+"""
+Tests for the background job queue (job_queue.py).
+"""
+
+import asyncio
+import pytest
+from job_queue import JobQueue, JobQueueFull
+
+
+def test_workers_bound_concurrency_and_queue_is_bounded():
+    running = 0
+    peak = 0
+
+    async def work(job, seconds):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(seconds)
+        running -= 1
+        return {"slept": seconds}
+
+    async def scenario():
+        queue = JobQueue(workers=2, max_pending=3)
+        await queue.start()
+        jobs = [queue.submit(work, 0.05) for _ in range(3)]
+        with pytest.raises(JobQueueFull):
+            queue.submit(work, 0.05)
+
+        await asyncio.sleep(0.01)
+        jobs += [queue.submit(work, 0.05) for _ in range(2)]
+        while not all(job.done for job in jobs):
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return jobs, queue.stats()
+
+    jobs, stats = asyncio.run(scenario())
+    assert peak == 2
+    assert all(job.status == "completed" and job.result == {"slept": 0.05} for job in jobs)
+    assert stats["completed"] == 5
+
+
+def test_stage_progress_partial_results_and_failure():
+    async def pipeline(job):
+        with job.stage("transcription"):
+            await asyncio.sleep(0.01)
+        job.update_result(transcript="Hello class")
+        job.skip_stage("narration", "Narrator not available")
+        with job.stage("pdf"):
+            raise RuntimeError("render failed")
+
+    async def scenario():
+        queue = JobQueue(workers=1)
+        await queue.start()
+        job = queue.submit(pipeline, session_id="s1")
+        updates = job.subscribe()
+        snapshots = []
+        while (snapshot := await updates.get()) is not None:
+            snapshots.append(snapshot)
+        await queue.stop()
+        return job, snapshots
+
+    job, snapshots = asyncio.run(scenario())
+    assert job.status == "error" and job.error == "render failed"
+    assert job.stages["transcription"]["status"] == "completed"
+    assert job.stages["transcription"]["duration"] >= 0.01
+    assert job.stages["narration"]["status"] == "skipped"
+    assert job.stages["pdf"]["status"] == "error"
+    assert job.result == {"transcript": "Hello class"}
+
+    # Subscribers see every step, starting from the queued state
+    assert snapshots[0]["status"] == "queued" and snapshots[-1]["status"] == "error"
+    assert any(s["result"].get("transcript") and "pdf" not in s["stages"] for s in snapshots)
@@ -0,0 +1,118 @@
+"""
+Tests for rolling recording segments (audio_recorder.SilenceSegmenter) and
+transcription while recording (live_transcription.py).
+"""
+
+import asyncio
+import math
+import os
+import threading
+import wave
+from array import array
+
+from audio_recorder import AudioRecorder, SilenceSegmenter
+from live_transcription import LiveTranscriber
+
+RATE = 8000
+CHUNK = 800  # 0.1 s
+
+
+def tone(seconds):
+    samples = array('h', (int(8000 * math.sin(2 * math.pi * 440 * i / RATE)) for i in range(int(seconds * RATE))))
+    return samples.tobytes()
+
+
+def silence(seconds):
+    return bytes(2 * int(seconds * RATE))
+
+
+def feed(segmenter, pcm):
+    cuts = []
+    for offset in range(0, len(pcm), 2 * CHUNK):
+        segment = segmenter.feed(pcm[offset:offset + 2 * CHUNK])
+        if segment:
+            cuts.append(len(segment) / (2 * RATE))
+    return cuts
+
+
+def test_segments_end_in_pauses_and_are_bounded():
+    segmenter = SilenceSegmenter(RATE, min_seconds=3, max_seconds=6, min_silence_seconds=0.3)
+
+    # The pause at 2 s is too early; the one at 4 s ends the segment once 0.3 s of it have passed
+    pcm = tone(2) + silence(0.5) + tone(1.5) + silence(0.5) + tone(1)
+    assert feed(segmenter, pcm) == [4.3]
+
+    # No pause at all: cut at the bound
+    segmenter.flush()
+    assert feed(segmenter, tone(13)) == [6.0, 6.0]
+    assert len(segmenter.flush()) / (2 * RATE) == 1.0
+
+
+class FakeTranscriber:
+    """Transcribes a segment into its duration; records prompts and full-file fallbacks."""
+
+    def __init__(self, fail_on=None):
+        self.prompts = []
+        self.full_files = []
+        self.fail_on = fail_on
+
+    async def transcribe(self, audio_path, language=None, prompt=None):
+        if audio_path.endswith("lecture.wav"):
+            self.full_files.append(audio_path)
+            return "full transcript"
+        with wave.open(audio_path) as wf:
+            seconds = wf.getnframes() / wf.getframerate()
+        self.prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        if len(self.prompts) == self.fail_on:
+            raise RuntimeError("API error")
+        return f" segment of {seconds:.1f}s "
+
+
+def record(tmp_path, transcriber):
+    """Capture tone/pause audio on a thread (like PyAudio) while `transcriber` works live."""
+    recorder = AudioRecorder.__new__(AudioRecorder)
+    recorder.sample_rate, recorder.channels = RATE, 1
+    recorder.current_file_path = tmp_path / "recording_abc.wav"
+    recorder.segment_count = 0
+    recorder.segmenter = SilenceSegmenter(RATE, min_seconds=3, max_seconds=6)
+
+    async def scenario():
+        live = LiveTranscriber(transcriber, prompt="Calculus", tail_chars=6)
+        recorder.on_segment = live.submit
+        pcm = (tone(3.5) + silence(0.5)) * 3 + tone(1)
+
+        def capture():
+            for offset in range(0, len(pcm), 2 * CHUNK):
+                recorder._feed_segmenter(pcm[offset:offset + 2 * CHUNK])
+            recorder._flush_segmenter()
+
+        thread = threading.Thread(target=capture)
+        thread.start()
+        while thread.is_alive():
+            await asyncio.sleep(0.01)
+        return live, await live.transcribe(str(tmp_path / "lecture.wav"))
+
+    return asyncio.run(scenario())
+
+
+def test_transcript_is_built_while_recording(tmp_path):
+    transcriber = FakeTranscriber()
+    live, transcript = record(tmp_path, transcriber)
+
+    # Cuts 0.3 s into each pause; the rest of the pause starts the next segment
+    assert transcript == "segment of 3.8s segment of 4.0s segment of 4.0s segment of 1.2s"
+    # Each segment is prompted with the tail of the previous one
+    assert transcriber.prompts == ["Calculus", "f 3.8s", "f 4.0s", "f 4.0s"]
+    assert transcriber.full_files == []
+    # Transcribed segments are removed
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_segment_falls_back_to_full_recording(tmp_path):
+    transcriber = FakeTranscriber(fail_on=2)
+    live, transcript = record(tmp_path, transcriber)
+
+    assert live.failed
+    assert transcript == "full transcript"
+    assert transcriber.full_files == [str(tmp_path / "lecture.wav")]
@@ -0,0 +1,128 @@
+"""
+Tests for the shared async OpenAI client (openai_client.py), against a local
+stub of the OpenAI API.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+from fastapi import FastAPI
+import result_cache
+import openai_client
+from openai_client import get_async_client, run_with_clients
+from script_generator import ScriptGenerator
+from transcriber_py313 import AudioTranscriberPy313
+
+STUB_DELAY = 1.0
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers transcription and chat requests after STUB_DELAY seconds."""
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        StubOpenAIHandler.connections.add(self.client_address)
+        time.sleep(STUB_DELAY)
+        if self.path.endswith("/audio/transcriptions"):
+            body = {"text": "Today we cover derivatives."}
+        else:
+            content = json.dumps({"title": "Derivatives", "sections": [], "full_text": "Derivatives."})
+            body = {"id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}]}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_openai(monkeypatch, tmp_path):
+    # Every test talks to the stub: no results from earlier runs
+    monkeypatch.setattr(result_cache, "_cache", result_cache.ResultCache(str(tmp_path / "cache")))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubOpenAIHandler.connections = set()
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    yield
+    server.shutdown()
+
+
+@pytest.fixture
+def lecture_wav(tmp_path):
+    path = tmp_path / "lecture.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x00\x00" * 16000)
+    return str(path)
+
+
+def test_requests_are_served_while_transcription_is_in_flight(stub_openai, lecture_wav):
+    app = FastAPI()
+    transcriber = AudioTranscriberPy313()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.post("/transcribe")
+    async def transcribe():
+        return {"transcript": await transcriber.transcribe(lecture_wav)}
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+            transcription = asyncio.create_task(client.post("/transcribe"))
+            await asyncio.sleep(0.1)
+
+            start = time.perf_counter()
+            health = [await client.get("/health") for _ in range(20)]
+            health_elapsed = time.perf_counter() - start
+
+            assert not transcription.done()
+            assert all(r.status_code == 200 for r in health)
+            assert health_elapsed < STUB_DELAY / 2
+            assert (await transcription).json() == {"transcript": "Today we cover derivatives."}
+
+    asyncio.run(scenario())
+
+
+def test_modules_share_one_pooled_client(stub_openai):
+    async def scenario():
+        generator = ScriptGenerator()
+        assert generator.client is AudioTranscriberPy313().client is get_async_client()
+        for _ in range(3):
+            assert json.loads(await generator._call_openai("Explain derivatives"))["title"] == "Derivatives"
+
+    asyncio.run(scenario())
+    # Keep-alive: the sequential calls reuse one connection
+    assert len(StubOpenAIHandler.connections) == 1
+
+
+def test_each_event_loop_gets_its_own_client_closed_with_the_loop(stub_openai):
+    async def use_client():
+        client = get_async_client()
+        assert client is get_async_client()
+        await client.chat.completions.create(model="stub", messages=[{"role": "user", "content": "Hi"}])
+        return client
+
+    # Like the blocking pipeline stages: one short-lived loop per call
+    first = run_with_clients(use_client())
+    second = run_with_clients(use_client())
+    assert first is not second
+    assert first.is_closed() and second.is_closed()
+    assert not openai_client._clients
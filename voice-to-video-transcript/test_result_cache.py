@@ -0,0 +1,163 @@
+"""
+Tests for the content-addressed result cache (result_cache.py) and its use by
+the transcriber and script generator.
+"""
+
+import asyncio
+import os
+import time
+
+from result_cache import ResultCache
+from script_generator import ScriptGenerator
+from transcriber_py313 import AudioTranscriberPy313
+
+
+def test_hits_misses_and_atomic_entries(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = ResultCache.make_key("abc123", "whisper-1", "en", None)
+
+    assert cache.get("transcripts", key) is None
+    cache.put("transcripts", key, "Today we cover derivatives.")
+    assert cache.get("transcripts", key) == "Today we cover derivatives."
+    assert key != ResultCache.make_key("abc123", "whisper-1", "fr", None)
+
+    assert cache.stats()["kinds"] == {"transcripts": {"hits": 1, "misses": 1, "writes": 1}}
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert files == [f"{key}.json"]  # no temporary files left behind
+    # A new instance (another process, a restart) sees the entry
+    assert ResultCache(str(tmp_path)).get("transcripts", key) == "Today we cover derivatives."
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    value = "x" * 100
+    cache = ResultCache(str(tmp_path), max_bytes=250)
+    cache.put("scripts", "aa", value)
+    cache.put("scripts", "bb", value)
+    past = time.time() - 100
+    for index, key in enumerate(("aa", "bb")):
+        os.utime(tmp_path / "scripts" / key[:2] / f"{key}.json", (past + index, past + index))
+
+    assert cache.get("scripts", "aa") == value  # "aa" is now the most recently used
+    cache.put("scripts", "cc", value)
+
+    assert cache.get("scripts", "bb") is None
+    assert cache.get("scripts", "aa") == value
+    assert cache.get("scripts", "cc") == value
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size_bytes"] <= 250
+
+
+def test_transcripts_are_cached_by_audio_content(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    transcriber = AudioTranscriberPy313(api_key="test-key", cache=cache)
+    calls = []
+
+    async def transcribe(audio_path, language, prompt):
+        calls.append((os.path.basename(audio_path), language))
+        return "Today we cover derivatives."
+
+    transcriber._transcribe = transcribe
+    for name in ("lecture.wav", "copy.wav"):
+        (tmp_path / name).write_bytes(b"RIFF same audio")
+    (tmp_path / "other.wav").write_bytes(b"RIFF other audio")
+
+    async def scenario():
+        return [await transcriber.transcribe(str(tmp_path / "lecture.wav")),
+                await transcriber.transcribe(str(tmp_path / "copy.wav")),
+                await transcriber.transcribe(str(tmp_path / "lecture.wav"), language="en"),
+                await transcriber.transcribe(str(tmp_path / "other.wav"))]
+
+    assert asyncio.run(scenario()) == ["Today we cover derivatives."] * 4
+    # The copy has the same content; the language and the other file are new inputs
+    assert calls == [("lecture.wav", None), ("lecture.wav", "en"), ("other.wav", None)]
+
+
+def test_scripts_are_cached_by_transcript_and_options(tmp_path):
+    generator = ScriptGenerator(api_key="test-key", cache=ResultCache(str(tmp_path)))
+    prompts = []
+
+    async def call_openai(prompt):
+        prompts.append(prompt)
+        return '{"title": "Derivatives", "sections": [], "full_text": "Derivatives."}'
+
+    generator._call_openai = call_openai
+
+    async def scenario():
+        first = await generator.generate_script("Today we cover derivatives.", "Calculus")
+        again = await generator.generate_script("Today we cover derivatives.", "Calculus")
+        await generator.generate_script("Today we cover derivatives.", "Physics")
+        generator.model = "gpt-4"
+        await generator.generate_script("Today we cover derivatives.", "Calculus")
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert again == first and first["title"] == "Derivatives"
+    assert len(prompts) == 3
+
+
+def test_fallback_scripts_are_not_cached(tmp_path):
+    generator = ScriptGenerator(api_key="test-key", cache=ResultCache(str(tmp_path)))
+    responses = ["Sorry, I cannot produce JSON right now.",
+                 '{"title": "Derivatives", "sections": [], "full_text": "Derivatives."}']
+
+    async def call_openai(prompt):
+        return responses.pop(0)
+
+    generator._call_openai = call_openai
+
+    async def scenario():
+        return [await generator.generate_script("Today we cover derivatives.", "Calculus") for _ in range(3)]
+
+    broken, retried, cached = asyncio.run(scenario())
+    assert broken["fallback"] and broken["title"] == "Educational Content"
+    # The retry called the model again, and only its parsed script was cached
+    assert retried["title"] == cached["title"] == "Derivatives" and not responses
+
+
+def test_concurrent_misses_share_one_computation(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"text": "Today we cover derivatives."}
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        raise RuntimeError("API error")
+
+    async def scenario():
+        values = await asyncio.gather(*(cache.get_or_compute("transcripts", "k", compute) for _ in range(3)))
+        errors = await asyncio.gather(*(cache.get_or_compute("transcripts", "f", failing) for _ in range(2)),
+                                      return_exceptions=True)
+        return values, errors
+
+    values, errors = asyncio.run(scenario())
+    assert values == [{"text": "Today we cover derivatives."}] * 3
+    assert values[0] is not values[1]  # every caller gets its own copy
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert len(calls) == 2 and cache.get("transcripts", "f") is None
+
+
+def test_failed_cache_write_still_returns_the_value_to_every_caller(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+
+    def put(kind, key, value):
+        raise OSError("No space left on device")
+
+    cache.put = put
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"text": "Today we cover derivatives."}
+
+    async def scenario():
+        return await asyncio.wait_for(asyncio.gather(
+            *(cache.get_or_compute("transcripts", "k", compute) for _ in range(2))), timeout=5)
+
+    assert asyncio.run(scenario()) == [{"text": "Today we cover derivatives."}] * 2
+    assert len(calls) == 1
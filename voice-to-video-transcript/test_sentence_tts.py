@@ -0,0 +1,156 @@
+"""
+Tests for sentence-level narration (sentence_tts.py) with the offline TTS provider.
+"""
+
+import asyncio
+import shutil
+import time
+import wave
+
+import pytest
+
+from result_cache import ResultCache
+from sentence_tts import OfflineTTSProvider, SentenceNarrator, concat_audio, split_units
+
+TEXT = ("Linear regression fits a line to data. The slope is m. The intercept is b! "
+        "Why does least squares work? It minimizes the squared residuals.")
+
+
+def test_units_are_whole_sentences_within_the_bound():
+    assert split_units(TEXT, max_chars=60) == [
+        "Linear regression fits a line to data. The slope is m.",
+        "The intercept is b! Why does least squares work?",
+        "It minimizes the squared residuals.",
+    ]
+    # A sentence longer than the bound is kept whole
+    assert split_units("A very long sentence without a break. Short.", max_chars=10) == [
+        "A very long sentence without a break.", "Short."]
+
+
+class RecordingProvider(OfflineTTSProvider):
+    """Offline provider that is slow, tracks concurrency and can fail on chosen units."""
+
+    def __init__(self, failures=None):
+        super().__init__()
+        self.calls = []
+        self.in_flight = self.peak = 0
+        self.failures = dict(failures or {})
+
+    def synthesize(self, text, language, output_path):
+        self.calls.append(text)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(0.05)
+            if self.failures.get(text, 0) > 0:
+                self.failures[text] -= 1
+                raise ConnectionError("TTS service unavailable")
+            super().synthesize(text, language, output_path)
+        finally:
+            self.in_flight -= 1
+
+
+def narrate(narrator, output_path, text=TEXT):
+    return asyncio.run(narrator.narrate(text, "en", 1.0, str(output_path)))
+
+
+def frames(path):
+    with wave.open(str(path)) as wf:
+        return wf.readframes(wf.getnframes())
+
+
+def test_units_are_synthesized_concurrently_in_order(tmp_path):
+    provider = RecordingProvider()
+    narrator = SentenceNarrator(provider, cache=ResultCache(str(tmp_path / "cache")),
+                                concurrency=2, max_unit_chars=20)
+    units = split_units(TEXT, 20)
+    assert len(units) == 5
+
+    narrate(narrator, tmp_path / "narration.wav")
+
+    assert provider.peak == 2
+    # The joined narration is the units in reading order
+    expected = b""
+    for index, unit in enumerate(units):
+        OfflineTTSProvider().synthesize(unit, "en", str(tmp_path / f"{index}.wav"))
+        expected += frames(tmp_path / f"{index}.wav")
+    assert frames(tmp_path / "narration.wav") == expected
+
+
+def test_units_are_cached_and_failures_retried(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    units = split_units(TEXT, 60)
+    # The second unit fails once (retried), the third fails every time
+    provider = RecordingProvider(failures={units[1]: 1, units[2]: 10})
+    narrator = SentenceNarrator(provider, cache=cache, max_unit_chars=60, retries=1)
+
+    with pytest.raises(RuntimeError, match="Narration unit 2 failed"):
+        narrate(narrator, tmp_path / "first.wav")
+    assert provider.calls.count(units[1]) == 2
+
+    # Only the failed unit is synthesized again; the others come from the cache
+    provider.failures.clear()
+    provider.calls.clear()
+    narrate(narrator, tmp_path / "second.wav")
+    assert provider.calls == [units[2]]
+    assert cache.stats()["kinds"]["narration"]["hits"] == 2
+
+    # A different speed is a different unit
+    provider.calls.clear()
+    asyncio.run(narrator.narrate(TEXT, "en", 1.25, str(tmp_path / "fast.wav")))
+    assert len(provider.calls) == 3
+
+
+def test_units_are_cached_only_at_the_requested_speed(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    provider = RecordingProvider()
+
+    def broken_speed(path, speed):
+        raise RuntimeError("ffmpeg not installed")
+
+    # The speed change fails, then is not configured: the units are used but never cached
+    for adjust_speed in (broken_speed, None):
+        narrator = SentenceNarrator(provider, cache=cache, max_unit_chars=60, adjust_speed=adjust_speed)
+        asyncio.run(narrator.narrate(TEXT, "en", 1.25, str(tmp_path / "fast.wav")))
+    assert len(provider.calls) == 2 * len(split_units(TEXT, 60))
+    assert cache.stats()["kinds"]["narration"].get("writes", 0) == 0
+
+    provider.calls.clear()
+    narrator = SentenceNarrator(provider, cache=cache, max_unit_chars=60, adjust_speed=lambda path, speed: path)
+    for _ in range(2):
+        asyncio.run(narrator.narrate(TEXT, "en", 1.25, str(tmp_path / "fast.wav")))
+    assert len(provider.calls) == len(split_units(TEXT, 60))
+
+
+class EvictingCache(ResultCache):
+    """Evicts every cached unit right after looking it up, like a concurrent eviction."""
+
+    def get_file(self, kind, key, suffix):
+        path = super().get_file(kind, key, suffix)
+        if path:
+            path.unlink()
+        return path
+
+
+def test_unit_evicted_after_lookup_is_synthesized_again(tmp_path):
+    cache = EvictingCache(str(tmp_path / "cache"))
+    provider = RecordingProvider()
+    narrator = SentenceNarrator(provider, cache=cache, max_unit_chars=60)
+
+    narrate(narrator, tmp_path / "first.wav")
+    provider.calls.clear()
+    narrate(narrator, tmp_path / "second.wav")
+    assert provider.calls == split_units(TEXT, 60)
+    assert (tmp_path / "second.wav").read_bytes() == (tmp_path / "first.wav").read_bytes()
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="ffmpeg not installed")
+def test_ffmpeg_concat_copies_the_units(tmp_path):
+    paths = []
+    for index, text in enumerate(("First unit.", "Second unit.")):
+        paths.append(str(tmp_path / f"unit{index}.wav"))
+        OfflineTTSProvider().synthesize(text, "en", paths[-1])
+
+    concat_audio(paths, str(tmp_path / "joined.wav"))
+
+    assert frames(tmp_path / "joined.wav") == frames(paths[0]) + frames(paths[1])
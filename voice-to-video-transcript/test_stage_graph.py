@@ -0,0 +1,104 @@
+"""
+Tests for the stage graph executor (stage_graph.py).
+"""
+
+import asyncio
+import time
+import pytest
+from stage_graph import Stage, StageGraph, StageTimer, educational_video_graph
+
+DELAY = 0.2
+
+
+class FakeComponents:
+    """Pipeline components whose output stages block for DELAY seconds like gTTS, Manim, reportlab and MoviePy."""
+
+    async def transcribe(self, audio_path):
+        return f"transcript of {audio_path}"
+
+    async def generate_script(self, transcript, topic_hint):
+        return {"title": topic_hint, "full_text": transcript}
+
+    async def create_narration(self, text):
+        time.sleep(DELAY)
+        return "narration.mp3"
+
+    async def create_animation(self, script_data):
+        time.sleep(DELAY)
+        return "animation.mp4"
+
+    async def create_pdf(self, script_data):
+        time.sleep(DELAY)
+        return "transcript.pdf"
+
+    async def merge_audio_video(self, video_path, audio_path, output_path=None):
+        time.sleep(DELAY)
+        return output_path or f"{video_path}+{audio_path}"
+
+
+def test_independent_stages_run_concurrently():
+    fake = FakeComponents()
+    graph = educational_video_graph(fake, fake, fake, fake, fake, fake, topic_hint="Derivatives",
+                                    output_path="final.mp4")
+    timer = StageTimer()
+    finished = []
+
+    ticks = []
+
+    async def scenario():
+        # The event loop keeps serving other work while the stages block
+        async def heartbeat():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            return await graph.run({"audio_path": "lecture.wav"}, tracker=timer,
+                                   on_result=lambda name, _: finished.append(name))
+        finally:
+            beat.cancel()
+
+    start = time.perf_counter()
+    results = asyncio.run(scenario())
+    elapsed = time.perf_counter() - start
+
+    assert results["script"] == {"title": "Derivatives", "full_text": "transcript of lecture.wav"}
+    assert results["merge"] == "final.mp4" and results["pdf"] == "transcript.pdf"
+    # Narration, animation and PDF overlap instead of taking 3 * DELAY, then the merge runs
+    assert elapsed < 3 * DELAY
+    assert all(timer.durations[name] >= DELAY for name in ("narration", "animation", "pdf", "merge"))
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < DELAY / 2
+    assert finished.index("merge") > max(finished.index("narration"), finished.index("animation"))
+
+
+def test_optional_failure_skips_dependents_and_required_failure_raises():
+    async def ok():
+        return 1
+
+    async def broken(a):
+        raise RuntimeError("render failed")
+
+    async def after(**_):
+        return 2
+
+    timer = StageTimer()
+    graph = StageGraph([Stage("a", ok), Stage("b", broken, ("a",), optional=True),
+                        Stage("c", after, ("b",)), Stage("d", after, ("a",))])
+    results = asyncio.run(graph.run(tracker=timer))
+    assert results == {"a": 1, "d": 2}
+    assert set(timer.skipped) == {"c"}
+
+    required = StageGraph([Stage("a", ok), Stage("b", broken, ("a",)), Stage("c", after, ("b",))])
+    with pytest.raises(RuntimeError, match="render failed"):
+        asyncio.run(required.run())
+
+
+def test_invalid_graphs_are_rejected():
+    async def noop(**_):
+        return None
+
+    with pytest.raises(ValueError, match="unknown"):
+        StageGraph([Stage("a", noop, ("missing",))])
+    with pytest.raises(ValueError, match="cycle"):
+        StageGraph([Stage("a", noop, ("b",)), Stage("b", noop, ("a",))])
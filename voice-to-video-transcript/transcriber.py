@@ -11,6 +11,9 @@ from pathlib import Path
 import aiofiles
 import openai
 from pydub import AudioSegment
+from openai_client import get_async_client
+from chunked_transcription import AudioChunker
+from result_cache import ResultCache, file_digest, get_result_cache
 import logging
 
 # Configure logging
@@ -20,23 +23,31 @@ logger = logging.getLogger(__name__)
 class AudioTranscriber:
     """Handles audio transcription using OpenAI Whisper API."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[ResultCache] = None):
         """
         Initialize the transcriber.
         
         Args:
             api_key: OpenAI API key (will use environment variable if not provided)
+            cache: Transcript cache (defaults to the process-wide result cache)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass it directly.")
         
-        # Initialize OpenAI client
-        openai.api_key = self.api_key
-        self.client = openai.OpenAI(api_key=self.api_key)
-        
         # Supported audio formats
         self.supported_formats = {'.mp3', '.mp4', '.wav', '.m4a', '.ogg', '.flac', '.webm'}
+        
+        # Splits long recordings at silences for concurrent transcription (needs ffmpeg)
+        self.chunker = AudioChunker()
+        
+        self.model = "whisper-1"
+        self.cache = cache if cache is not None else get_result_cache()
+    
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        """Shared pooled async client (see openai_client.py)."""
+        return get_async_client(self.api_key)
     
     def _prepare_audio(self, audio_path: str) -> str:
         """
@@ -133,6 +144,10 @@ class AudioTranscriber:
         """
         Transcribe audio file to text using OpenAI Whisper.
         
+        Recordings over the upload limit or longer than one chunk are split at
+        silences and the chunks are transcribed concurrently. Results are cached
+        by audio content, model, language and prompt.
+        
         Args:
             audio_path: Path to the audio file
             language: Language code (e.g., 'en', 'es', 'fr') - auto-detected if None
@@ -141,39 +156,32 @@ class AudioTranscriber:
         Returns:
             Transcribed text
         """
+        if not self.cache:
+            return await self._transcribe(audio_path, language, prompt)
+        
+        # Hash the audio off the event loop: recordings can be hundreds of MB
+        key = ResultCache.make_key(await asyncio.to_thread(file_digest, audio_path), self.model, language, prompt)
+        return await self.cache.get_or_compute("transcripts", key,
+                                               lambda: self._transcribe(audio_path, language, prompt))
+    
+    async def _transcribe(self, audio_path: str, language: Optional[str], prompt: Optional[str]) -> str:
+        """Transcribe without the cache."""
         try:
-            # Prepare audio file
-            prepared_audio_path = self._prepare_audio(audio_path)
-            
-            logger.info(f"Starting transcription of: {prepared_audio_path}")
-            
-            # Prepare transcription parameters
-            transcription_params = {
-                "model": "whisper-1",
-                "response_format": "text",
-                "temperature": 0.0  # Lower temperature for more consistent output
-            }
-            
-            # Add optional parameters
-            if language:
-                transcription_params["language"] = language
-            if prompt:
-                transcription_params["prompt"] = prompt
-            
-            # Read audio file
-            with open(prepared_audio_path, "rb") as audio_file:
-                # Make API call
-                response = self.client.audio.transcriptions.create(
-                    file=audio_file,
-                    **transcription_params
+            if await self.chunker.needs_chunking(audio_path):
+                logger.info(f"Starting chunked transcription of: {audio_path}")
+                transcript = await self.chunker.transcribe(
+                    audio_path,
+                    lambda chunk_path, chunk_prompt: self._transcribe_file(chunk_path, language, chunk_prompt),
+                    prompt
                 )
+                logger.info(f"Transcription completed. Length: {len(transcript)} characters")
+                return transcript.strip()
             
-            # Extract transcribed text
-            if isinstance(response, str):
-                transcript = response
-            else:
-                transcript = response.text if hasattr(response, 'text') else str(response)
+            # Convert/compress off the event loop: pydub decodes the whole file
+            prepared_audio_path = await asyncio.to_thread(self._prepare_audio, audio_path)
             
+            logger.info(f"Starting transcription of: {prepared_audio_path}")
+            transcript = await self._transcribe_file(prepared_audio_path, language, prompt)
             logger.info(f"Transcription completed. Length: {len(transcript)} characters")
             
             # Clean up temporary files if they were created
@@ -186,7 +194,45 @@ class AudioTranscriber:
             logger.error(f"Error during transcription: {e}")
             raise
     
-    def transcribe_with_timestamps(self, audio_path: str, language: Optional[str] = None) -> dict:
+    async def _transcribe_file(self, audio_path: str, language: Optional[str] = None, prompt: Optional[str] = None) -> str:
+        """
+        Send one file (at most 25MB) to the Whisper API.
+        
+        Args:
+            audio_path: Path to the audio file
+            language: Language code - auto-detected if None
+            prompt: Optional prompt to guide transcription
+            
+        Returns:
+            Transcribed text
+        """
+        # Prepare transcription parameters
+        transcription_params = {
+            "model": self.model,
+            "response_format": "text",
+            "temperature": 0.0  # Lower temperature for more consistent output
+        }
+        
+        # Add optional parameters
+        if language:
+            transcription_params["language"] = language
+        if prompt:
+            transcription_params["prompt"] = prompt
+        
+        # Read audio file
+        with open(audio_path, "rb") as audio_file:
+            # Make API call (awaited, so the event loop keeps serving other requests)
+            response = await self.client.audio.transcriptions.create(
+                file=audio_file,
+                **transcription_params
+            )
+        
+        # Extract transcribed text
+        if isinstance(response, str):
+            return response
+        return response.text if hasattr(response, 'text') else str(response)
+    
+    async def transcribe_with_timestamps(self, audio_path: str, language: Optional[str] = None) -> dict:
         """
         Transcribe audio with word-level timestamps.
         
@@ -198,13 +244,13 @@ class AudioTranscriber:
             Dict containing transcript with timestamps
         """
         try:
-            prepared_audio_path = self._prepare_audio(audio_path)
+            prepared_audio_path = await asyncio.to_thread(self._prepare_audio, audio_path)
             
             logger.info(f"Starting transcription with timestamps: {prepared_audio_path}")
             
             # Prepare parameters for detailed response
             transcription_params = {
-                "model": "whisper-1",
+                "model": self.model,
                 "response_format": "verbose_json",
                 "temperature": 0.0,
                 "timestamp_granularities": ["word"]
@@ -215,7 +261,7 @@ class AudioTranscriber:
             
             # Read audio file and transcribe
             with open(prepared_audio_path, "rb") as audio_file:
-                response = self.client.audio.transcriptions.create(
+                response = await self.client.audio.transcriptions.create(
                     file=audio_file,
                     **transcription_params
                 )
@@ -271,7 +317,7 @@ if __name__ == "__main__":
                 print(f"Transcript: {transcript}")
                 
                 print("\nTesting transcription with timestamps...")
-                detailed_result = transcriber.transcribe_with_timestamps(test_audio)
+                detailed_result = await transcriber.transcribe_with_timestamps(test_audio)
                 print(f"Detailed result keys: {detailed_result.keys() if isinstance(detailed_result, dict) else 'Not a dict'}")
             else:
                 print(f"Test audio file {test_audio} not found. Skipping test.")
@@ -12,6 +12,9 @@ from typing import Optional
 from pathlib import Path
 import logging
 import openai
+from openai_client import get_async_client
+from chunked_transcription import AudioChunker
+from result_cache import ResultCache, file_digest, get_result_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,21 +23,18 @@ logger = logging.getLogger(__name__)
 class AudioTranscriberPy313:
     """Handles audio transcription using OpenAI Whisper API without pydub."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[ResultCache] = None):
         """
         Initialize the transcriber.
         
         Args:
             api_key: OpenAI API key (will use environment variable if not provided)
+            cache: Transcript cache (defaults to the process-wide result cache)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass it directly.")
         
-        # Initialize OpenAI client
-        openai.api_key = self.api_key
-        self.client = openai.OpenAI(api_key=self.api_key)
-        
         # Supported audio formats
         self.supported_formats = {'.mp3', '.mp4', '.wav', '.m4a', '.ogg', '.flac', '.webm'}
         
@@ -45,6 +45,17 @@ class AudioTranscriberPy313:
         except (subprocess.SubprocessError, FileNotFoundError):
             self.ffmpeg_available = False
             logger.warning("ffmpeg not found. Some audio processing features may be limited.")
+        
+        # Splits long recordings at silences for concurrent transcription (needs ffmpeg)
+        self.chunker = AudioChunker()
+        
+        self.model = "whisper-1"
+        self.cache = cache if cache is not None else get_result_cache()
+    
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        """Shared pooled async client (see openai_client.py)."""
+        return get_async_client(self.api_key)
     
     def _prepare_audio(self, audio_path: str) -> str:
         """
@@ -148,35 +159,65 @@ class AudioTranscriberPy313:
             logger.error(f"Error converting audio to WAV: {e}")
             return audio_path
     
-    async def transcribe(self, audio_path: str) -> str:
+    async def transcribe(self, audio_path: str, language: Optional[str] = None, prompt: Optional[str] = None) -> str:
         """
         Transcribe audio file to text.
         
+        Recordings over the upload limit or longer than one chunk are split at
+        silences and the chunks are transcribed concurrently. Results are cached
+        by audio content, model, language and prompt.
+        
         Args:
             audio_path: Path to the audio file
+            language: Language code - auto-detected if None
+            prompt: Optional prompt to guide transcription
             
         Returns:
             Transcription text
         """
+        if not self.cache:
+            return await self._transcribe(audio_path, language, prompt)
+        
+        # Hash the audio off the event loop: recordings can be hundreds of MB
+        key = ResultCache.make_key(await asyncio.to_thread(file_digest, audio_path), self.model, language, prompt)
+        return await self.cache.get_or_compute("transcripts", key,
+                                               lambda: self._transcribe(audio_path, language, prompt))
+    
+    async def _transcribe(self, audio_path: str, language: Optional[str], prompt: Optional[str]) -> str:
+        """Transcribe without the cache."""
         try:
-            # Prepare audio for transcription
-            prepared_audio = self._prepare_audio(audio_path)
+            if await self.chunker.needs_chunking(audio_path):
+                logger.info(f"Transcribing audio file in chunks: {audio_path}")
+                return await self.chunker.transcribe(
+                    audio_path,
+                    lambda chunk_path, chunk_prompt: self._transcribe_file(chunk_path, language, chunk_prompt),
+                    prompt
+                )
+            
+            # Convert/compress off the event loop: pydub decodes the whole file
+            prepared_audio = await asyncio.to_thread(self._prepare_audio, audio_path)
             logger.info(f"Transcribing audio file: {prepared_audio}")
             
-            # Open and transcribe using OpenAI API
-            with open(prepared_audio, "rb") as audio_file:
-                transcription = await asyncio.to_thread(
-                    self.client.audio.transcriptions.create,
-                    file=audio_file,
-                    model="whisper-1"
-                )
+            transcription = await self._transcribe_file(prepared_audio, language, prompt)
             
             # Clean up temporary file if created
             if prepared_audio != audio_path and os.path.exists(prepared_audio):
                 os.unlink(prepared_audio)
             
-            return transcription.text
+            return transcription
             
         except Exception as e:
             logger.error(f"Error in transcription: {e}")
             raise
+    
+    async def _transcribe_file(self, audio_path: str, language: Optional[str] = None, prompt: Optional[str] = None) -> str:
+        """Send one file (at most 25MB) to the Whisper API."""
+        params = {"model": self.model}
+        if language:
+            params["language"] = language
+        if prompt:
+            params["prompt"] = prompt
+        
+        with open(audio_path, "rb") as audio_file:
+            transcription = await self.client.audio.transcriptions.create(file=audio_file, **params)
+        return transcription.text
@@ -163,15 +163,17 @@ class VideoMerger:
             # Set audio to video
             final_video = video_clip.with_audio(audio_clip)
             
-            # Write final video
+            # Write final video (with a temporary audio file of its own, so
+            # concurrent merges do not overwrite each other's)
             logger.info("Writing final video file...")
-            final_video.write_videofile(
-                output_path,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
-            )
+            with tempfile.TemporaryDirectory(prefix="merge_") as work_dir:
+                final_video.write_videofile(
+                    output_path,
+                    codec='libx264',
+                    audio_codec='aac',
+                    temp_audiofile=os.path.join(work_dir, 'temp-audio.m4a'),
+                    remove_temp=True
+                )
             
             # Close clips to free memory
             video_clip.close()